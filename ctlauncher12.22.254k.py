@@ -4,10 +4,17 @@ CAT'S MC LAUNCHER 0.2 HDR - Auto-Download on Play
 TLauncher-Style • Offline Mode • Full Auto-Install
 Samsoft / Team Flames 2025
 """
+import time
+STARTUP_T0 = time.perf_counter()  # startup report baseline, before the heavy imports
+
 import tkinter as tk
 from tkinter import ttk, messagebox
+import asyncio
 import json
 import urllib.request
+import urllib.parse
+import urllib.error
+import http.client
 import shutil
 import subprocess
 import zipfile
@@ -18,8 +25,13 @@ import os
 import platform
 import hashlib
 import random
+import re
+import shlex
+import uuid
 from pathlib import Path
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 
 # ============================================================
 # CONFIG
@@ -31,6 +43,43 @@ WIDTH, HEIGHT = 900, 620
 VERSION_MANIFEST_URL = "https://piston-meta.mojang.com/mc/game/version_manifest_v2.json"
 RESOURCES_URL = "https://resources.download.minecraft.net"
 
+# Seconds a cached version manifest is trusted before it is revalidated
+MANIFEST_TTL = 10 * 60
+
+# Download/hash buffer size - memory per transfer stays constant regardless of file size
+CHUNK_SIZE = 64 * 1024
+
+# Attempts per file; interrupted transfers resume from their .part file
+DOWNLOAD_RETRIES = 3
+
+# Library/repair transfers in flight at once on the download event loop
+DOWNLOAD_WORKERS = 8
+
+# 'asyncio' runs a phase's transfers concurrently on one event loop, 'serial' fetches them one by one
+DOWNLOAD_BACKEND = 'asyncio'
+
+# Idle keep-alive connections kept per host
+HTTP_POOL_SIZE = 8
+
+# Pre-launch check of the client jar and libraries: 'quick' compares sizes, 'full' hashes everything
+LAUNCH_VERIFY = 'quick'
+
+# Download progress reaches the UI at most this many times a second
+PROGRESS_HZ = 20
+
+# Chrome-trace files of recent installs/launches kept under MC_DIR/logs/traces
+TRACE_KEEP = 20
+
+# Target for process start -> first drawn window, in milliseconds
+STARTUP_BUDGET_MS = 200
+
+# Java used to launch the game
+JAVA_BIN = "java"
+
+# JVM performance profiles; 'auto' picks one from the heap size and the Java version
+JVM_PROFILES = ('auto', 'g1-low-latency', 'zgc', 'shenandoah', 'default')
+JVM_PROFILE = 'auto'
+
 # Colors
 COLORS = {
     'bg_dark': '#1e1e2e',
@@ -46,62 +95,709 @@ COLORS = {
 
 # Minecraft directory
 MC_DIR = Path.home() / "Library" / "Application Support" / "minecraft" if platform.system() == "Darwin" else Path.home() / ".minecraft"
+MC_DIR = Path(os.environ.get('CTLAUNCHER_GAME_DIR') or MC_DIR)
+
+# Host-wide SHA-1-addressed store that game dirs hardlink libraries/assets from; '' disables it
+SHARED_STORE = os.environ.get('CTLAUNCHER_STORE', str(Path.home() / '.ctlauncher' / 'store'))
+
+# LAN mirror base URL (ctlauncherhdrv1.py mirror on another host); unset fetches from Mojang directly
+MIRROR = os.environ.get('CTLAUNCHER_MIRROR') or None
+# Hosts a mirror caches; skins and anything else always go direct
+MIRROR_HOSTS = ('launchermeta.mojang.com', 'piston-meta.mojang.com', 'piston-data.mojang.com',
+                'launcher.mojang.com', 'libraries.minecraft.net', 'resources.download.minecraft.net')
 
 # SSL context
 SSL_CONTEXT = ssl.create_default_context()
 SSL_CONTEXT.check_hostname = False
 SSL_CONTEXT.verify_mode = ssl.CERT_NONE
 
+# ============================================================
+# HTTP CONNECTION POOL
+# ============================================================
+class ConnectionPool:
+    REDIRECTS = (301, 302, 303, 307, 308)
+
+    def __init__(self, maxsize, timeout=30, context=None, mirror=None):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.context = context
+        self.mirror = mirror
+        self.lock = threading.Lock()
+        self.idle = {}
+        self.opened = 0
+        self.reused = 0
+
+    def _connect(self, key, timeout):
+        scheme, host, port = key
+        if scheme == 'https':
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self.context)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _acquire(self, key):
+        with self.lock:
+            conns = self.idle.get(key)
+            if conns:
+                return conns.pop()
+        return None
+
+    def _release(self, key, conn):
+        with self.lock:
+            conns = self.idle.setdefault(key, [])
+            if len(conns) < self.maxsize:
+                conns.append(conn)
+                return
+        conn.close()
+
+    def _request(self, key, path, headers, timeout):
+        # Retry once on a fresh connection if a kept-alive one went stale
+        conn = self._acquire(key)
+        if conn is not None:
+            try:
+                conn.timeout = timeout
+                if conn.sock:
+                    conn.sock.settimeout(timeout)
+                conn.request('GET', path, headers=headers)
+                resp = conn.getresponse()
+                with self.lock:
+                    self.reused += 1
+                return conn, resp
+            except (http.client.HTTPException, ConnectionError, OSError):
+                conn.close()
+
+        conn = self._connect(key, timeout)
+        try:
+            conn.request('GET', path, headers=headers)
+            resp = conn.getresponse()
+        except Exception:
+            conn.close()
+            raise
+        with self.lock:
+            self.opened += 1
+        return conn, resp
+
+    # url as served by the LAN mirror, when one is set and caches that host
+    def rewrite(self, url):
+        parts = urllib.parse.urlsplit(url)
+        if not self.mirror or parts.hostname not in MIRROR_HOSTS:
+            return url
+        return f'{self.mirror.rstrip("/")}/{parts.netloc}{parts.path}' + (f'?{parts.query}' if parts.query else '')
+
+    @contextmanager
+    def open(self, url, timeout=None, headers=None):
+        timeout = timeout or self.timeout
+        url = self.rewrite(url)
+        parts = urllib.parse.urlsplit(url)
+
+        # Proxied hosts go through urllib, which knows how to talk to the proxy
+        if parts.scheme in urllib.request.getproxies() and not urllib.request.proxy_bypass(parts.hostname):
+            req = urllib.request.Request(url, headers=headers or {})
+            with urllib.request.urlopen(req, timeout=timeout, context=self.context) as resp:
+                yield resp
+            return
+
+        for _ in range(5):
+            key = (parts.scheme, parts.hostname, parts.port)
+            path = parts.path or '/'
+            if parts.query:
+                path += '?' + parts.query
+            request_headers = {'User-Agent': 'CatMCLauncher/0.2', 'Accept-Encoding': 'identity'}
+            request_headers.update(headers or {})
+
+            conn, resp = self._request(key, path, request_headers, timeout)
+            if resp.status in self.REDIRECTS and resp.getheader('Location'):
+                resp.read()
+                if resp.will_close:
+                    conn.close()
+                else:
+                    self._release(key, conn)
+                url = urllib.parse.urljoin(url, resp.getheader('Location'))
+                parts = urllib.parse.urlsplit(url)
+                continue
+            if resp.status >= 400:
+                conn.close()
+                raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, None)
+
+            try:
+                yield resp
+            except BaseException:
+                conn.close()
+                raise
+            # Only a fully consumed response leaves the connection reusable
+            if resp.isclosed() and not resp.will_close:
+                self._release(key, conn)
+            else:
+                conn.close()
+            return
+
+        raise urllib.error.URLError(f'Too many redirects: {url}')
+
+    # Connection counts from the asyncio downloader, which keeps its own sockets
+    def add_stats(self, opened, reused):
+        with self.lock:
+            self.opened += opened
+            self.reused += reused
+
+    def stats(self):
+        with self.lock:
+            return {'opened': self.opened, 'reused': self.reused}
+
+    def requests(self):
+        with self.lock:
+            return self.opened + self.reused
+
+HTTP_POOL = ConnectionPool(HTTP_POOL_SIZE, context=SSL_CONTEXT, mirror=MIRROR)
+
+# ============================================================
+# MANIFEST CACHE
+# ============================================================
+class ManifestCache:
+    def __init__(self, cache_dir, url=VERSION_MANIFEST_URL, ttl=MANIFEST_TTL):
+        self.data_path = Path(cache_dir) / 'version_manifest_v2.json'
+        self.meta_path = Path(cache_dir) / 'version_manifest_v2.meta.json'
+        self.url = url
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.data = None
+        self.meta = {}
+
+    def _load(self):
+        try:
+            with open(self.data_path) as f:
+                self.data = json.load(f)
+            with open(self.meta_path) as f:
+                self.meta = json.load(f)
+        except (OSError, ValueError):
+            self.meta = {}
+
+    def _save(self, body=None):
+        self.data_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so a crash never leaves a half-written cache
+        for path, content in ((self.data_path, body), (self.meta_path, json.dumps(self.meta).encode())):
+            if content is None:
+                continue
+            tmp = path.with_suffix('.tmp')
+            tmp.write_bytes(content)
+            os.replace(tmp, path)
+
+    # Whatever is on disk, never the network; None before the first successful fetch
+    def cached(self):
+        with self.lock:
+            if self.data is None:
+                self._load()
+            return self.data
+
+    def get(self, timeout=30, force=False):
+        with self.lock:
+            if self.data is None:
+                self._load()
+            age = time.time() - self.meta.get('fetched_at', 0)
+            if self.data is not None and age < self.ttl and not force:
+                return self.data
+
+            headers = {}
+            if self.data is not None:
+                if self.meta.get('etag'):
+                    headers['If-None-Match'] = self.meta['etag']
+                if self.meta.get('last_modified'):
+                    headers['If-Modified-Since'] = self.meta['last_modified']
+
+            try:
+                with HTTP_POOL.open(self.url, timeout=timeout, headers=headers) as resp:
+                    body = resp.read()
+                    if resp.status == 304:
+                        self.meta['fetched_at'] = time.time()
+                        self._save()
+                        return self.data
+                    data = json.loads(body.decode())
+                    self.meta = {
+                        'etag': resp.headers.get('ETag'),
+                        'last_modified': resp.headers.get('Last-Modified'),
+                        'fetched_at': time.time(),
+                    }
+                self.data = data
+                self._save(body)
+                return self.data
+            except (OSError, ValueError, http.client.HTTPException) as e:
+                # Offline: keep working from whatever we cached last
+                if self.data is not None:
+                    print(f"Manifest refresh failed, using cached copy: {e}")
+                    return self.data
+                raise
+
+# ============================================================
+# INTEGRITY INDEX
+# ============================================================
+def sha1_file(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# (running sha1, byte count) of a partial download, so it can be resumed where it stopped
+def hash_part(part_path):
+    digest = hashlib.sha1()
+    offset = 0
+    try:
+        with open(part_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+                offset += len(chunk)
+    except FileNotFoundError:
+        pass
+    return digest, offset
+
+# path -> [size, mtime_ns, sha1]; unchanged files are verified by stat alone
+class IntegrityIndex:
+    def __init__(self, index_path, root):
+        self.index_path = Path(index_path)
+        self.root = Path(root)
+        self.lock = threading.Lock()
+        self.dirty = False
+        try:
+            with open(self.index_path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def _key(self, path):
+        path = Path(path)
+        try:
+            return str(path.relative_to(self.root))
+        except ValueError:
+            return str(path)
+
+    def record(self, path, sha1):
+        st = os.stat(path)
+        with self.lock:
+            self.entries[self._key(path)] = [st.st_size, st.st_mtime_ns, sha1]
+            self.dirty = True
+
+    # rehash ignores the remembered hash, to catch corruption that kept size and mtime
+    def verify(self, path, sha1, rehash=False):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+
+        key = self._key(path)
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns and not rehash:
+            return entry[2] == sha1
+
+        actual = sha1_file(path)
+        with self.lock:
+            self.entries[key] = [st.st_size, st.st_mtime_ns, actual]
+            self.dirty = True
+        return actual == sha1
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.index_path.with_suffix('.tmp')
+            with open(tmp, 'w') as f:
+                json.dump(self.entries, f, separators=(',', ':'))
+            os.replace(tmp, self.index_path)
+            self.dirty = False
+
+# ============================================================
+# SHARED CONTENT STORE
+# ============================================================
+def clone_file(src, dst):
+    # Hardlink, then reflink (same filesystem, copy-on-write), then a plain copy
+    try:
+        os.link(src, dst)
+        return
+    except OSError:
+        pass
+    try:
+        import fcntl
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            fcntl.ioctl(fdst.fileno(), 0x40049409, fsrc.fileno())  # FICLONE
+        return
+    except (ImportError, OSError):
+        pass
+    shutil.copyfile(src, dst)
+
+# sha1[:2]/sha1 -> one copy of each library jar / asset object for every game dir on the host
+class ContentStore:
+    def __init__(self, root):
+        self.root = Path(root).expanduser() if root else None
+
+    def object_path(self, sha1):
+        return self.root / sha1[:2] / sha1
+
+    def fetch(self, sha1, dest):
+        if not self.root or not sha1:
+            return False
+        src = self.object_path(sha1)
+        if not src.is_file():
+            return False
+        tmp = dest.with_name(dest.name + '.link')
+        try:
+            if tmp.exists():
+                tmp.unlink()
+            clone_file(src, tmp)
+            os.replace(tmp, dest)
+        except OSError:
+            if tmp.exists():
+                tmp.unlink()
+            return False
+        return True
+
+    def add(self, sha1, path):
+        if not self.root or not sha1:
+            return
+        target = self.object_path(sha1)
+        if target.exists():
+            return
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            # Link only - copying into the store would double disk use
+            os.link(path, target)
+        except OSError:
+            pass
+
+# One lock per destination file, so two installs sharing a game dir never write the same .part
+_PATH_LOCKS = {}
+_PATH_LOCKS_GUARD = threading.Lock()
+
+def path_lock(path):
+    with _PATH_LOCKS_GUARD:
+        return _PATH_LOCKS.setdefault(str(path), threading.Lock())
+
+# ============================================================
+# TRACING
+# ============================================================
+# Install/launch spans as Chrome-trace events - open the saved file in chrome://tracing or Perfetto
+class Tracer:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.events = []
+            self.threads = {}
+            self.lanes = {}
+            self.origin = time.perf_counter()
+
+    # A finished span from start to end (perf_counter seconds) on the calling thread's track;
+    # lane names a track for work not tied to one OS thread, like the asyncio downloads
+    def add(self, name, start, end, cat='phase', lane=None, **args):
+        with self.lock:
+            if lane is None:
+                tid, lane = threading.get_native_id(), threading.current_thread().name
+            else:
+                tid = self.lanes.setdefault(lane, len(self.lanes) + 1)
+            if tid not in self.threads:
+                self.threads[tid] = {'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid,
+                                     'args': {'name': lane}}
+            self.events.append({
+                'name': name, 'cat': cat, 'ph': 'X', 'pid': os.getpid(), 'tid': tid,
+                'ts': round((start - self.origin) * 1e6), 'dur': round((end - start) * 1e6), 'args': args,
+            })
+
+    # The yielded dict becomes the span's args (bytes, requests, ...)
+    @contextmanager
+    def span(self, name, cat='phase', lane=None, **args):
+        start = time.perf_counter()
+        try:
+            yield args
+        except BaseException as e:
+            args['error'] = repr(e)
+            raise
+        finally:
+            self.add(name, start, time.perf_counter(), cat, lane, **args)
+
+    def save(self, label):
+        with self.lock:
+            if not self.events:
+                return None
+            trace = {'traceEvents': list(self.threads.values()) + self.events, 'displayTimeUnit': 'ms'}
+        trace_dir = MC_DIR / 'logs' / 'traces'
+        safe = ''.join(c if c.isalnum() or c in '.-_' else '_' for c in label)
+        path = trace_dir / f"{time.strftime('%Y%m%d-%H%M%S')}-{safe}.json"
+        try:
+            trace_dir.mkdir(parents=True, exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(trace, f, separators=(',', ':'))
+            for old in sorted(trace_dir.glob('*.json'))[:-TRACE_KEEP]:
+                old.unlink()
+        except OSError as e:
+            print(f"Could not write trace: {e}")
+            return None
+        return path
+
+TRACER = Tracer()
+
+# ============================================================
+# PROGRESS
+# ============================================================
+# Bytes/files across all transfers of a phase; one ticker thread hands callback(snapshot)
+# a coalesced update at most PROGRESS_HZ times a second, and only when something changed
+class ProgressTracker:
+    RATE_WINDOW = 3.0  # seconds of history behind the throughput figure
+
+    def __init__(self, callback=None, hz=PROGRESS_HZ):
+        self.callback = callback
+        self.interval = 1.0 / hz
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.ticker = None
+        self.received = 0
+        self._reset(None, 0, 0)
+
+    def _reset(self, label, files, total_bytes):
+        self.label = label
+        self.files_total = files
+        self.files_done = 0
+        self.bytes_total = total_bytes
+        self.bytes_done = 0
+        self.in_flight = {}
+        self.samples = deque([(time.monotonic(), self.received)])
+        self.last = None
+
+    def begin(self, label, files, total_bytes=0):
+        with self.lock:
+            self._reset(label, files, total_bytes)
+        if self.callback and self.ticker is None:
+            self.stopped.clear()
+            self.ticker = threading.Thread(target=self._tick, daemon=True)
+            self.ticker.start()
+
+    def add_bytes(self, key, count):
+        with self.lock:
+            self.in_flight[key] = self.in_flight.get(key, 0) + count
+            self.bytes_done += count
+            self.received += count
+
+    # The transfer for key restarted from zero
+    def rewind(self, key):
+        with self.lock:
+            self.bytes_done -= self.in_flight.pop(key, 0)
+
+    # Bytes a file already had on disk (resumed, linked, verified) count as done too
+    def file_done(self, key, size=None):
+        with self.lock:
+            counted = self.in_flight.pop(key, 0)
+            self.files_done += 1
+            if size:
+                self.bytes_done += size - counted
+
+    def end(self):
+        if self.ticker is not None:
+            self.stopped.set()
+            self.ticker.join()
+            self.ticker = None
+        self._publish()
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self.lock:
+            self.samples.append((now, self.received))
+            while len(self.samples) > 2 and now - self.samples[0][0] > self.RATE_WINDOW:
+                self.samples.popleft()
+            since, received = self.samples[0]
+            rate = (self.received - received) / (now - since) if now > since else 0.0
+            if self.bytes_total:
+                percent = min(100, int(self.bytes_done * 100 / self.bytes_total))
+            else:
+                percent = int(self.files_done * 100 / self.files_total) if self.files_total else 0
+            remaining = max(0, self.bytes_total - self.bytes_done)
+            return {
+                'label': self.label,
+                'files_done': self.files_done,
+                'files_total': self.files_total,
+                'bytes_done': self.bytes_done,
+                'bytes_total': self.bytes_total,
+                'percent': percent,
+                'rate': int(rate),
+                'eta': round(remaining / rate, 1) if rate and remaining else None,
+            }
+
+    def _publish(self):
+        if not self.callback:
+            return
+        snap = self.snapshot()
+        state = (snap['label'], snap['files_done'], snap['bytes_done'])
+        if state == self.last:
+            return
+        self.last = state
+        self.callback(snap)
+
+    def _tick(self):
+        while not self.stopped.wait(self.interval):
+            self._publish()
+
+# "Libraries 12/40 - 3.2 MB/s - ETA 5s"
+def format_progress(snap):
+    text = f"{snap['label']} {snap['files_done']}/{snap['files_total']}"
+    if snap['rate']:
+        text += f" - {snap['rate'] / 1e6:.1f} MB/s"
+    if snap['eta'] is not None:
+        text += f" - ETA {int(snap['eta'])}s"
+    return text
+
 # ============================================================
 # DOWNLOAD MANAGER
 # ============================================================
 class DownloadManager:
-    def __init__(self, mc_dir, status_callback=None, progress_callback=None):
+    def __init__(self, mc_dir, status_callback=None, progress_callback=None, manifest_cache=None, store=None):
         self.mc_dir = Path(mc_dir)
+        # One cache per game dir, shared by the version list and installs
+        self.manifest_cache = manifest_cache or ManifestCache(self.mc_dir / 'cache')
+        self.integrity = IntegrityIndex(self.mc_dir / 'cache' / 'integrity.json', self.mc_dir)
+        self.store = store or ContentStore(SHARED_STORE)
         self.status_callback = status_callback or (lambda x: print(x))
         self.progress_callback = progress_callback or (lambda x: None)
         self.cancelled = False
+        # Per-chunk/per-file progress is coalesced here and mapped onto the current stage's range
+        self.progress = ProgressTracker(self._report_progress)
+        self.stage = (0, 100)
+        self.phase = None
+
+    def _report_progress(self, snap):
+        low, high = self.stage
+        self.status_callback(format_progress(snap))
+        self.progress_callback(low + (high - low) * snap['percent'] // 100)
+
+    # Download (url, dest, sha1, size) jobs as a single progress phase; returns the ones that failed
+    def download_all(self, jobs, label, stage):
+        self.stage = stage
+        self.progress.begin(label, len(jobs), sum(size or 0 for _, _, _, size in jobs))
+        try:
+            # Proxied setups stay on urllib, which knows how to talk to the proxy
+            if DOWNLOAD_BACKEND == 'asyncio' and len(jobs) > 1 and not urllib.request.getproxies():
+                return AsyncDownloader(self).run(jobs)
+            failed = []
+            for url, dest, sha1, size in jobs:
+                if self.cancelled:
+                    break
+                if not self.download_file(url, dest, sha1):
+                    failed.append((url, dest, sha1, size))
+                self.progress.file_done(dest, size)
+            return failed
+        finally:
+            self.progress.end()
+
+    # Ends the running pipeline phase's trace span (with the bytes and requests it cost) and starts the next
+    def _phase(self, name=None):
+        now = time.perf_counter()
+        if self.phase:
+            label, start, received, requests = self.phase
+            TRACER.add(label, start, now, bytes=self.progress.received - received,
+                       requests=HTTP_POOL.requests() - requests)
+        self.phase = (name, now, self.progress.received, HTTP_POOL.requests()) if name else None
 
     def download_file(self, url, dest_path, expected_hash=None):
         dest_path = Path(dest_path)
-        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        with path_lock(dest_path), TRACER.span(dest_path.name, 'file', url=url) as span:
+            return self._download_file(url, dest_path, expected_hash, span)
 
-        if dest_path.exists() and expected_hash:
-            with open(dest_path, 'rb') as f:
-                file_hash = hashlib.sha1(f.read()).hexdigest()
-            if file_hash == expected_hash:
-                return True
+    # Already verified on disk, or linked in from the shared store
+    def _local_copy(self, dest_path, expected_hash, span):
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
 
-        try:
-            with urllib.request.urlopen(url, timeout=30, context=SSL_CONTEXT) as response:
-                data = response.read()
+        if expected_hash and self.integrity.verify(dest_path, expected_hash):
+            self.store.add(expected_hash, dest_path)
+            span['source'] = 'verified'
+            return True
 
-            if expected_hash:
-                file_hash = hashlib.sha1(data).hexdigest()
-                if file_hash != expected_hash:
-                    return False
+        # Another game dir on this host already downloaded it
+        if self.store.fetch(expected_hash, dest_path) and self.integrity.verify(dest_path, expected_hash):
+            span['source'] = 'store'
+            return True
+        return False
 
-            with open(dest_path, 'wb') as f:
-                f.write(data)
+    # Moves a finished .part into place, or drops it if its hash is wrong
+    def _commit_part(self, url, part_path, dest_path, expected_hash, digest):
+        if expected_hash and digest != expected_hash:
+            part_path.unlink()
+            self.status_callback(f"Hash mismatch: {url}")
+            return False
+        os.replace(part_path, dest_path)
+        self.integrity.record(dest_path, digest)
+        self.store.add(digest, dest_path)
+        return True
 
+    def _download_file(self, url, dest_path, expected_hash, span):
+        if self._local_copy(dest_path, expected_hash, span):
             return True
-        except Exception as e:
-            self.status_callback(f"Download failed: {url} → {e}")
-            return False
+        span.update(source='network', requests=0, bytes=0)
+
+        # Bytes land in a .part file that survives failures and is resumed with a Range request
+        part_path = dest_path.with_name(dest_path.name + '.part')
+        for attempt in range(DOWNLOAD_RETRIES):
+            try:
+                # Hash while streaming to disk instead of buffering the whole body
+                digest, offset = hash_part(part_path)
+
+                # A finished part whose rename was interrupted needs no request at all
+                if not (offset and expected_hash and digest.hexdigest() == expected_hash):
+                    headers = {'Range': f'bytes={offset}-'} if offset else {}
+                    span['requests'] += 1
+                    with HTTP_POOL.open(url, timeout=30, headers=headers) as response:
+                        if offset and response.status != 206:
+                            # Server ignored the range and sent the whole file
+                            digest = hashlib.sha1()
+                            offset = 0
+                            self.progress.rewind(dest_path)
+                        with open(part_path, 'ab' if offset else 'wb') as f:
+                            for chunk in iter(lambda: response.read(CHUNK_SIZE), b''):
+                                digest.update(chunk)
+                                f.write(chunk)
+                                self.progress.add_bytes(dest_path, len(chunk))
+                                span['bytes'] += len(chunk)
+
+                if self._commit_part(url, part_path, dest_path, expected_hash, digest.hexdigest()):
+                    return True
+                # A resumed file may have had a bad prefix; one more clean attempt
+                if offset and attempt < DOWNLOAD_RETRIES - 1:
+                    continue
+                return False
+            except urllib.error.HTTPError as e:
+                if e.code == 416:
+                    part_path.unlink(missing_ok=True)
+                    continue
+                self.status_callback(f"Download failed: {url} → {e}")
+                return False
+            except Exception as e:
+                self.status_callback(f"Download failed: {url} → {e}")
+                time.sleep(attempt + 1)
+
+        return False
 
     def get_version_manifest(self):
         try:
-            with urllib.request.urlopen(VERSION_MANIFEST_URL, timeout=30, context=SSL_CONTEXT) as resp:
-                return json.loads(resp.read().decode())
+            return self.manifest_cache.get()
         except Exception as e:
             self.status_callback(f"Manifest fetch failed: {e}")
             return None
 
     def download_version(self, version_id):
+        try:
+            with TRACER.span('download_version', version=version_id) as span:
+                try:
+                    return self._download_version(version_id)
+                finally:
+                    # Connection reuse goes in the trace rather than on stdout
+                    stats = HTTP_POOL.stats()
+                    span.update(connections_opened=stats['opened'], connections_reused=stats['reused'])
+        finally:
+            self._phase(None)
+            # Persist hashes even if the install failed part way through
+            self.integrity.save()
+
+    def _download_version(self, version_id):
         self.cancelled = False
         self.status_callback(f"Fetching {version_id} info...")
         self.progress_callback(5)
 
+        self._phase('manifest')
         manifest = self.get_version_manifest()
         if not manifest:
             return False
@@ -122,9 +818,10 @@ class DownloadManager:
 
         self.status_callback(f"Downloading {version_id}.json...")
         self.progress_callback(10)
+        self._phase('version_json')
 
         try:
-            with urllib.request.urlopen(version_url, timeout=30, context=SSL_CONTEXT) as resp:
+            with HTTP_POOL.open(version_url, timeout=30) as resp:
                 version_data = json.loads(resp.read().decode())
             with open(json_path, 'w') as f:
                 json.dump(version_data, f, indent=2)
@@ -138,28 +835,64 @@ class DownloadManager:
         # Client JAR
         self.status_callback(f"Downloading {version_id}.jar...")
         self.progress_callback(15)
+        self._phase('client_jar')
         if 'downloads' in version_data and 'client' in version_data['downloads']:
             client = version_data['downloads']['client']
-            jar_url = client.get('url')
-            jar_hash = client.get('sha1')
             jar_path = version_dir / f"{version_id}.jar"
-            if not self.download_file(jar_url, jar_path, jar_hash):
+            job = (client.get('url'), jar_path, client.get('sha1'), client.get('size'))
+            if self.download_all([job], f"{version_id}.jar", (15, 20)):
                 self.status_callback("Client JAR download failed!")
                 return False
 
         # Libraries & Natives
         self.status_callback("Downloading libraries...")
+        self._phase('libraries')
         libraries = version_data.get('libraries', [])
-        total_libs = len(libraries)
 
-        os_name = 'osx' if platform.system() == 'Darwin' else platform.system().lower()
+        jobs, native_jobs = self._library_jobs(libraries)
 
-        for i, lib in enumerate(libraries):
-            if self.cancelled:
-                return False
-            progress = 20 + int((i / total_libs) * 40)
-            self.progress_callback(progress)
+        failed = self.download_all(jobs, "Libraries", (20, 60))
+        if self.cancelled:
+            return False
+        if failed:
+            self.status_callback(f"{len(failed)} libraries failed to download: "
+                                 + ', '.join(Path(job[1]).name for job in failed[:5]))
+            return False
+        natives = [(job[1], job[2]) for job in native_jobs]
+
+        # Natives (only jars that changed since the last extraction)
+        self._phase('natives')
+        if natives:
+            natives_dir = version_dir / 'natives'
+            natives_dir.mkdir(parents=True, exist_ok=True)
+            self._extract_natives(natives, natives_dir)
+
+        # Asset index
+        self.status_callback("Downloading asset index...")
+        self.progress_callback(65)
+        self._phase('asset_index')
+        if 'assetIndex' in version_data:
+            asset_index = version_data['assetIndex']
+            index_url = asset_index.get('url')
+            index_id = asset_index.get('id')
+            index_hash = asset_index.get('sha1')
+            if index_url:
+                index_path = self.mc_dir / 'assets' / 'indexes' / f'{index_id}.json'
+                if not self.download_file(index_url, index_path, index_hash):
+                    return False
 
+        self._phase(None)
+        self.status_callback(f"{version_id} ready!")
+        self.progress_callback(100)
+        return True
+
+    # (url, path, sha1, size) for every library/natives jar this OS needs, plus the natives subset
+    def _library_jobs(self, libraries):
+        os_name = 'osx' if platform.system() == 'Darwin' else platform.system().lower()
+        jobs = []
+        native_jobs = []
+
+        for lib in libraries:
             if not self._should_use_library(lib, os_name):
                 continue
 
@@ -169,10 +902,8 @@ class DownloadManager:
                     artifact = downloads['artifact']
                     url = artifact.get('url')
                     path = artifact.get('path')
-                    sha1 = artifact.get('sha1')
                     if url and path:
-                        dest = self.mc_dir / 'libraries' / path
-                        self.download_file(url, dest, sha1)
+                        jobs.append((url, self.mc_dir / 'libraries' / path, artifact.get('sha1'), artifact.get('size')))
 
                 if 'classifiers' in downloads and 'natives' in lib:
                     native_key = lib['natives'].get(os_name, '')
@@ -180,34 +911,124 @@ class DownloadManager:
                         native = downloads['classifiers'][native_key]
                         url = native.get('url')
                         path = native.get('path')
-                        sha1 = native.get('sha1')
                         if url and path:
-                            dest = self.mc_dir / 'libraries' / path
-                            self.download_file(url, dest, sha1)
-                            # Extract natives
-                            natives_dir = version_dir / 'natives'
-                            natives_dir.mkdir(parents=True, exist_ok=True)
-                            with zipfile.ZipFile(dest, 'r') as z:
-                                for file in z.namelist():
-                                    if file.endswith((".so", ".dylib", ".jnilib")):
-                                        z.extract(file, natives_dir)
+                            job = (url, self.mc_dir / 'libraries' / path, native.get('sha1'), native.get('size'))
+                            jobs.append(job)
+                            native_jobs.append(job)
+        return jobs, native_jobs
 
-        # Asset index
-        self.status_callback("Downloading asset index...")
-        self.progress_callback(65)
-        if 'assetIndex' in version_data:
-            asset_index = version_data['assetIndex']
-            index_url = asset_index.get('url')
-            index_id = asset_index.get('id')
-            index_hash = asset_index.get('sha1')
-            if index_url:
-                index_path = self.mc_dir / 'assets' / 'indexes' / f'{index_id}.json'
-                if not self.download_file(index_url, index_path, index_hash):
+    # Pre-launch check of the client jar and libraries against the version JSON: sizes only ('quick'),
+    # or SHA-1 of everything on all cores ('full'). Broken/missing files are re-downloaded in one batch;
+    # whatever stays broken raises here instead of as a ClassNotFoundException after a JVM start
+    def check_classpath(self, version_id, mode=LAUNCH_VERIFY):
+        version_dir = self.mc_dir / 'versions' / version_id
+        with open(version_dir / f'{version_id}.json') as f:
+            version_data = json.load(f)
+        files = self._library_jobs(version_data.get('libraries', []))[0]
+        client = version_data.get('downloads', {}).get('client')
+        if client:
+            files.insert(0, (client.get('url'), version_dir / f'{version_id}.jar', client.get('sha1'), client.get('size')))
+        full = mode == 'full'
+
+        def intact(job):
+            _, path, sha1, size = job
+            try:
+                if size is not None and os.stat(path).st_size != size:
                     return False
+            except OSError:
+                return False
+            return not (full and sha1) or self.integrity.verify(path, sha1, rehash=True)
 
-        self.status_callback(f"{version_id} ready!")
-        self.progress_callback(100)
-        return True
+        with TRACER.span('verify_classpath', mode=mode, files=len(files)) as span:
+            if full:
+                self.status_callback(f"Verifying {len(files)} files...")
+                # hashlib drops the GIL while hashing, so threads spread over the cores
+                with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as pool:
+                    results = list(pool.map(intact, files))
+            else:
+                results = [intact(job) for job in files]
+            broken = [job for job, ok in zip(files, results) if not ok]
+            span['broken'] = len(broken)
+        if not broken:
+            return
+        with TRACER.span('repair_classpath', files=len(broken)):
+            failed = self.download_all(broken, "Repairs", (0, 100))
+        self.integrity.save()
+        # The extracted natives came from the broken jar, so a repaired natives jar is unpacked again
+        repaired = {str(job[1]) for job in broken} - {str(job[1]) for job in failed}
+        natives = [(job[1], job[2]) for job in self._library_jobs(version_data.get('libraries', []))[1]
+                   if str(job[1]) in repaired]
+        if natives:
+            (version_dir / 'natives').mkdir(parents=True, exist_ok=True)
+            self._extract_natives(natives, version_dir / 'natives', force=repaired)
+        if failed:
+            raise RuntimeError(f"{len(failed)} game files are missing or corrupt and could not be re-downloaded: "
+                               + ', '.join(Path(job[1]).name for job in failed[:5]))
+
+    # force: jar paths (str) to extract again even if their manifest entry matches, e.g. just repaired
+    def _extract_natives(self, natives, natives_dir, force=()):
+        # .extracted.json maps each natives jar to the hash it was extracted from and its files
+        manifest_path = natives_dir / '.extracted.json'
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+
+        changed = []
+        for jar_path, sha1 in natives:
+            # Jars without a hash in the version JSON are always re-extracted
+            entry = manifest.get(str(jar_path))
+            if (str(jar_path) not in force and sha1 and entry and entry['sha1'] == sha1
+                    and all((natives_dir / name).exists() for name in entry['files'])):
+                continue
+            changed.append((jar_path, sha1))
+        if not changed:
+            return
+
+        root = natives_dir.resolve()
+
+        # Files a jar's previous version produced may not exist in the new one, so clear them first
+        for jar_path, _ in changed:
+            for name in manifest.pop(str(jar_path), {}).get('files', []):
+                try:
+                    (natives_dir / name).unlink()
+                except OSError:
+                    pass
+
+        def extract(jar_path):
+            files = []
+            try:
+                with zipfile.ZipFile(jar_path, 'r') as z:
+                    for info in z.infolist():
+                        if not info.filename.endswith((".so", ".dylib", ".jnilib")):
+                            continue
+                        target = (natives_dir / info.filename).resolve()
+                        if root not in target.parents:
+                            continue
+                        target.parent.mkdir(parents=True, exist_ok=True)
+                        # 1 MB copy buffer instead of zipfile's small default
+                        with z.open(info) as src, open(target, 'wb') as dst:
+                            shutil.copyfileobj(src, dst, 1024 * 1024)
+                        files.append(info.filename)
+            except (zipfile.BadZipFile, OSError) as e:
+                self.status_callback(f"Natives extraction failed for {jar_path.name}: {e}")
+                return None
+            return files
+
+        self.status_callback(f"Extracting natives ({len(changed)} jars)...")
+        with ThreadPoolExecutor(max_workers=min(len(changed), os.cpu_count() or 1)) as pool:
+            results = list(pool.map(extract, [jar_path for jar_path, _ in changed]))
+
+        for (jar_path, sha1), files in zip(changed, results):
+            # A failed jar stays out of the manifest so the next run tries it again
+            if files is not None:
+                manifest[str(jar_path)] = {'sha1': sha1, 'files': files}
+
+        tmp = manifest_path.with_suffix('.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp, manifest_path)
 
     def _should_use_library(self, lib_data, os_name):
         if 'rules' not in lib_data:
@@ -220,6 +1041,354 @@ class DownloadManager:
                     return action == 'allow'
         return True
 
+# ============================================================
+# ASYNC DOWNLOADS
+# ============================================================
+# Runs a phase's transfers on one asyncio event loop, bounded by a semaphore instead of one OS
+# thread each. Status/progress still go through the manager's callbacks, which the GUI posts to Tk.
+class AsyncDownloader:
+    WRITE_BATCH = 1024 * 1024  # body bytes gathered on the loop before one write+hash on the executor
+
+    def __init__(self, manager, concurrency=DOWNLOAD_WORKERS, timeout=30):
+        self.manager = manager
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.idle = {}
+        self.opened = 0
+        self.reused = 0
+        self.executor = None
+
+    # (url, dest, sha1, size) jobs -> the ones that failed; jobs left when cancelled are skipped
+    def run(self, jobs):
+        return asyncio.run(self._run(jobs))
+
+    async def _run(self, jobs):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        lanes = list(range(self.concurrency, 0, -1))
+        failed = []
+
+        async def worker(job):
+            url, dest, sha1, size = job
+            dest = Path(dest)
+            async with semaphore:
+                if self.manager.cancelled:
+                    return
+                # One trace track per slot keeps the per-file spans from overlapping
+                lane = lanes.pop()
+                try:
+                    with TRACER.span(dest.name, 'file', lane=f'async download {lane}', url=url) as span:
+                        ok = await self._download(url, dest, sha1, span)
+                finally:
+                    lanes.append(lane)
+            if not ok:
+                failed.append(job)
+            self.manager.progress.file_done(dest, size)
+
+        # Hashing, disk writes and lock waits run here, one thread per slot
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='async-download-io')
+        try:
+            await asyncio.gather(*(worker(job) for job in jobs))
+        finally:
+            self.executor.shutdown(wait=False)
+            for conns in self.idle.values():
+                for _, writer in conns:
+                    writer.close()
+            self.idle.clear()
+            HTTP_POOL.add_stats(self.opened, self.reused)
+        return failed
+
+    def _blocking(self, fn, *args):
+        return asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    # Same steps and error handling as DownloadManager._download_file, with the transfer on the loop
+    async def _download(self, url, dest_path, expected_hash, span):
+        manager = self.manager
+        # Shares the per-file lock with download_file; a contended one is waited for off the loop
+        lock = path_lock(dest_path)
+        if not lock.acquire(blocking=False):
+            acquiring = self._blocking(lock.acquire)
+            try:
+                await asyncio.shield(acquiring)
+            except asyncio.CancelledError:
+                # The executor thread still takes the lock; hand it straight back
+                acquiring.add_done_callback(lambda _: lock.release())
+                raise
+        try:
+            if await self._blocking(manager._local_copy, dest_path, expected_hash, span):
+                return True
+            span.update(source='network', requests=0, bytes=0)
+
+            part_path = dest_path.with_name(dest_path.name + '.part')
+            for attempt in range(DOWNLOAD_RETRIES):
+                try:
+                    digest, offset = await self._blocking(hash_part, part_path)
+                    if not (offset and expected_hash and digest.hexdigest() == expected_hash):
+                        span['requests'] += 1
+                        digest, offset = await self._fetch(url, part_path, dest_path, digest, offset, span)
+
+                    if await self._blocking(manager._commit_part, url, part_path, dest_path,
+                                            expected_hash, digest.hexdigest()):
+                        return True
+                    if offset and attempt < DOWNLOAD_RETRIES - 1:
+                        continue
+                    return False
+                except urllib.error.HTTPError as e:
+                    if e.code == 416:
+                        part_path.unlink(missing_ok=True)
+                        continue
+                    manager.status_callback(f"Download failed: {url} → {e}")
+                    return False
+                except Exception as e:
+                    manager.status_callback(f"Download failed: {url} → {e}")
+                    await asyncio.sleep(attempt + 1)
+            return False
+        finally:
+            lock.release()
+
+    async def _connect(self, key):
+        conns = self.idle.get(key)
+        if conns:
+            return conns.pop(), True
+        scheme, host, port = key
+        https = scheme == 'https'
+        conn = await asyncio.wait_for(
+            asyncio.open_connection(host, port or (443 if https else 80), ssl=SSL_CONTEXT if https else None),
+            self.timeout)
+        self.opened += 1
+        return conn, False
+
+    # GET url onto the end of part_path over a kept-alive connection; returns the part's (sha1, offset)
+    async def _fetch(self, url, part_path, key, digest, offset, span):
+        url = HTTP_POOL.rewrite(url)
+        for _ in range(5):
+            parts = urllib.parse.urlsplit(url)
+            host = (parts.scheme, parts.hostname, parts.port)
+            path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+            range_line = f'Range: bytes={offset}-\r\n' if offset else ''
+            request = (f'GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\nUser-Agent: CatMCLauncher/0.2\r\n'
+                       f'Accept-Encoding: identity\r\n{range_line}\r\n').encode()
+
+            # A kept-alive connection may have been closed by the server; retry once on a fresh one
+            for attempt in range(2):
+                (reader, writer), reused = await self._connect(host)
+                try:
+                    writer.write(request)
+                    await writer.drain()
+                    status_line = await asyncio.wait_for(reader.readline(), self.timeout)
+                    if not status_line:
+                        raise ConnectionResetError('connection closed before response')
+                    break
+                except (OSError, asyncio.IncompleteReadError):
+                    writer.close()
+                    if not reused or attempt:
+                        raise
+            if reused:
+                self.reused += 1
+
+            try:
+                _, status, *reason = status_line.decode('latin-1').split(None, 2)
+                status = int(status)
+                headers = {}
+                while True:
+                    line = await asyncio.wait_for(reader.readline(), self.timeout)
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                if status >= 400:
+                    writer.close()
+                    raise urllib.error.HTTPError(url, status, ''.join(reason).strip(), None, None)
+                if status in ConnectionPool.REDIRECTS and 'location' in headers:
+                    keep_alive = await self._read_body(reader, headers, None)
+                else:
+                    if offset and status != 206:
+                        # Server ignored the range and sent the whole file
+                        digest = hashlib.sha1()
+                        offset = 0
+                        self.manager.progress.rewind(key)
+                    keep_alive = await self._save_body(reader, headers, part_path, key, digest, offset, span)
+            except BaseException:
+                writer.close()
+                raise
+
+            if keep_alive and headers.get('connection', '').lower() != 'close':
+                self.idle.setdefault(host, []).append((reader, writer))
+            else:
+                writer.close()
+
+            if status in ConnectionPool.REDIRECTS and 'location' in headers:
+                url = urllib.parse.urljoin(url, headers['location'])
+                continue
+            return digest, offset
+
+        raise urllib.error.URLError(f'Too many redirects: {url}')
+
+    # Appends the body to part_path, updating digest; disk writes and hashing go to the executor in WRITE_BATCH blocks
+    async def _save_body(self, reader, headers, part_path, key, digest, offset, span):
+        f = await self._blocking(open, part_path, 'ab' if offset else 'wb')
+        pending = bytearray()
+
+        def write(data):
+            digest.update(data)
+            f.write(data)
+
+        async def flush():
+            if pending:
+                data = bytes(pending)
+                pending.clear()
+                await self._blocking(write, data)
+
+        async def consume(chunk):
+            pending.extend(chunk)
+            self.manager.progress.add_bytes(key, len(chunk))
+            span['bytes'] += len(chunk)
+            if len(pending) >= self.WRITE_BATCH:
+                await flush()
+
+        try:
+            return await self._read_body(reader, headers, consume)
+        finally:
+            # Whatever arrived is still a valid prefix to resume from
+            try:
+                await flush()
+            finally:
+                await self._blocking(f.close)
+
+    # Feeds a response body to the async consume(chunk) (or drops it); returns whether the connection is reusable
+    async def _read_body(self, reader, headers, consume):
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                size_line = await asyncio.wait_for(reader.readline(), self.timeout)
+                chunk_size = int(size_line.split(b';')[0].strip() or b'0', 16)
+                if chunk_size == 0:
+                    # Skip trailers up to the terminating blank line
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    return True
+                chunk = await asyncio.wait_for(reader.readexactly(chunk_size), self.timeout)
+                await reader.readexactly(2)
+                if consume:
+                    await consume(chunk)
+
+        if 'content-length' in headers:
+            remaining = int(headers['content-length'])
+            while remaining:
+                chunk = await asyncio.wait_for(reader.read(min(remaining, CHUNK_SIZE)), self.timeout)
+                if not chunk:
+                    raise asyncio.IncompleteReadError(b'', remaining)
+                if consume:
+                    await consume(chunk)
+                remaining -= len(chunk)
+            return True
+
+        # No length: the body runs until the server closes the connection
+        while True:
+            chunk = await asyncio.wait_for(reader.read(CHUNK_SIZE), self.timeout)
+            if not chunk:
+                return False
+            if consume:
+                await consume(chunk)
+
+# ============================================================
+# JVM TUNING
+# ============================================================
+JAVA_PROBES = {}
+
+# Feature release of a Java executable (8, 17, 21...), 0 if it won't run; probed once per process
+def java_major(java):
+    key = (java, 'major')
+    if key not in JAVA_PROBES:
+        try:
+            out = subprocess.run([java, '-version'], capture_output=True, text=True, timeout=15).stderr
+        except (OSError, subprocess.SubprocessError):
+            out = ''
+        # 'openjdk version "17.0.9"', 'java version "1.8.0_392"'
+        match = re.search(r'version "(?:1\.)?(\d+)', out)
+        JAVA_PROBES[key] = int(match.group(1)) if match else 0
+    return JAVA_PROBES[key]
+
+# Whether java starts with flags, e.g. a GC that only some builds include
+def java_accepts(java, *flags):
+    key = (java, flags)
+    if key not in JAVA_PROBES:
+        try:
+            JAVA_PROBES[key] = subprocess.run([java, *flags, '-version'], capture_output=True, timeout=15).returncode == 0
+        except (OSError, subprocess.SubprocessError):
+            JAVA_PROBES[key] = False
+    return JAVA_PROBES[key]
+
+def shenandoah_flags(major):
+    # Shenandoah is experimental before JDK 15 and missing from Oracle's builds entirely
+    return ('-XX:+UnlockExperimentalVMOptions', '-XX:+UseShenandoahGC') if major < 15 else ('-XX:+UseShenandoahGC',)
+
+# The profile that will actually be used with this heap and Java, falling back to G1
+def resolve_jvm_profile(profile, ram_gb, java):
+    major = java_major(java)
+    if profile == 'auto':
+        # Generational ZGC (21+) keeps pauses sub-millisecond once the heap is big enough to matter
+        return 'zgc' if major >= 21 and ram_gb >= 8 else 'g1-low-latency'
+    if profile == 'zgc' and major < 15:
+        return 'g1-low-latency'
+    if profile == 'shenandoah' and not java_accepts(java, *shenandoah_flags(major)):
+        return 'g1-low-latency'
+    return profile if profile in JVM_PROFILES else 'default'
+
+# Heap and GC flags for a profile, sized from the heap and the machine's cores
+def jvm_tuning_args(profile, ram_gb, java):
+    profile = resolve_jvm_profile(profile, ram_gb, java)
+    if profile == 'default':
+        return [f'-Xmx{ram_gb}G', '-Xms1G']
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+    major = java_major(java)
+    # Fixed, pre-touched heap: no resize pauses and no page faults on first use mid-game
+    args = [f'-Xms{ram_gb}G', f'-Xmx{ram_gb}G', '-XX:+AlwaysPreTouch', '-XX:+DisableExplicitGC',
+            '-XX:+PerfDisableSharedMem', f'-XX:ParallelGCThreads={cpus}']
+    if profile == 'zgc':
+        args.append('-XX:+UseZGC')
+        if 21 <= major < 23:
+            args.append('-XX:+ZGenerational')  # the default from 23 on
+        return args
+    args.append(f'-XX:ConcGCThreads={max(1, cpus // 4)}')
+    if profile == 'shenandoah':
+        return args + list(shenandoah_flags(major))
+    # Low-pause G1 (after Aikar's flags): big young gen, early mixed collections, short pause target
+    large = ram_gb >= 12
+    return args + [
+        '-XX:+UseG1GC', '-XX:+ParallelRefProcEnabled', '-XX:MaxGCPauseMillis=50',
+        '-XX:+UnlockExperimentalVMOptions',
+        f'-XX:G1NewSizePercent={40 if large else 30}', f'-XX:G1MaxNewSizePercent={50 if large else 40}',
+        f'-XX:G1HeapRegionSize={16 if large else 8}M', f'-XX:G1ReservePercent={15 if large else 20}',
+        '-XX:G1HeapWastePercent=5', '-XX:G1MixedGCCountTarget=4',
+        f'-XX:InitiatingHeapOccupancyPercent={20 if large else 15}',
+        '-XX:G1MixedGCLiveThresholdPercent=90', '-XX:G1RSetUpdatingPauseTimePercent=5',
+        '-XX:SurvivorRatio=32', '-XX:MaxTenuringThreshold=1',
+    ]
+
+def format_command(args):
+    return subprocess.list2cmdline(args) if sys.platform == 'win32' else shlex.join(args)
+
+# ============================================================
+# STARTUP TIMING
+# ============================================================
+STARTUP_MARKS = {}
+
+def startup_mark(name):
+    STARTUP_MARKS[name] = round((time.perf_counter() - STARTUP_T0) * 1000, 1)
+
+# Printed and appended to cache/startup.jsonl so time-to-first-window can be tracked
+def report_startup():
+    window_ms = STARTUP_MARKS.get('first_window', 0)
+    verdict = 'OK' if window_ms <= STARTUP_BUDGET_MS else f'over the {STARTUP_BUDGET_MS} ms budget'
+    print('Startup: ' + ', '.join(f'{name} {ms} ms' for name, ms in STARTUP_MARKS.items()) + f' ({verdict})')
+    try:
+        log_path = MC_DIR / 'cache' / 'startup.jsonl'
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(log_path, 'a') as f:
+            f.write(json.dumps({'at': round(time.time()), **STARTUP_MARKS}) + '\n')
+    except OSError:
+        pass
+
 # ============================================================
 # LAUNCHER GUI
 # ============================================================
@@ -268,6 +1437,21 @@ class CatMCLauncher:
         self.ram_label.pack()
         self.ram_scale.config(command=self.update_ram_label)
 
+        # JVM profile + the flags it turns into for the current RAM and Java
+        ttk.Label(content, text="JVM Profile").pack(anchor='w', pady=(10, 0))
+        profile_row = tk.Frame(content, bg=COLORS['bg_dark'])
+        profile_row.pack(fill='x', pady=5)
+        self.profile_combo = ttk.Combobox(profile_row, values=JVM_PROFILES, state="readonly", width=20)
+        self.profile_combo.set(JVM_PROFILE)
+        self.profile_combo.pack(side='left')
+        self.profile_combo.bind('<<ComboboxSelected>>', lambda e: self.update_jvm_preview())
+        ttk.Button(profile_row, text="Preview command", command=self.show_command_preview).pack(side='left', padx=10)
+        self.jvm_label = ttk.Label(content, text="Detecting Java...", foreground=COLORS['text_dim'],
+                                   font=('Consolas', 8), wraplength=800)
+        self.jvm_label.pack(anchor='w')
+        self.java_ready = False
+        threading.Thread(target=self.probe_java, daemon=True).start()
+
         # Play button
         self.play_btn = ttk.Button(content, text="▶  PLAY", command=self.play)
         self.play_btn.pack(pady=30, ipadx=30, ipady=15)
@@ -282,27 +1466,79 @@ class CatMCLauncher:
 
     def update_ram_label(self, value):
         self.ram_label.config(text=f"{int(float(value))} GB")
+        self.update_jvm_preview()
+
+    # Worker thread: the Java probes run a JVM, so keep them off the Tk loop
+    def probe_java(self):
+        java_accepts(JAVA_BIN, *shenandoah_flags(java_major(JAVA_BIN)))
+        self.root.after(0, self.java_probed)
+
+    def java_probed(self):
+        self.java_ready = True
+        self.update_jvm_preview()
+
+    def update_jvm_preview(self):
+        if not self.java_ready:
+            return
+        ram_gb, profile = int(self.ram_scale.get()), self.profile_combo.get()
+        resolved = resolve_jvm_profile(profile, ram_gb, JAVA_BIN)
+        self.jvm_label.config(text=f"Java {java_major(JAVA_BIN) or '?'}, {resolved}: "
+                                   f"{' '.join(jvm_tuning_args(profile, ram_gb, JAVA_BIN))}")
+
+    # The exact command Play would run right now (classpath is partial until the version is installed)
+    def show_command_preview(self):
+        if not self.java_ready:
+            messagebox.showinfo("Preview", "Still detecting Java, try again in a moment.")
+            return
+        version = self.version_combo.get()
+        username = self.username_entry.get().strip() or "Player"
+        command = self._build_launch_args(version, username, int(self.ram_scale.get()), self.profile_combo.get())
+
+        win = tk.Toplevel(self.root)
+        win.title(f"Launch command - {version}")
+        win.geometry("800x300")
+        text = tk.Text(win, bg=COLORS['bg_input'], fg=COLORS['text'], font=('Consolas', 9), wrap='char', bd=0)
+        text.pack(fill='both', expand=True, padx=8, pady=8)
+        text.insert('1.0', format_command(command))
+        text.config(state='disabled')
 
     def load_versions(self):
-        try:
-            with urllib.request.urlopen(VERSION_MANIFEST_URL, timeout=30, context=SSL_CONTEXT) as resp:
-                data = json.loads(resp.read().decode())
-            versions = [v["id"] for v in data["versions"] if v["type"] == "release"]
-            self.version_combo["values"] = versions
-            # Auto-select latest release
-            self.version_combo.current(0)
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load versions: {e}")
-            self.version_combo["values"] = ["1.21.3", "1.20.6", "1.19.4"]
+        # Last cached list right away, the network refresh in the background
+        cache = self.download_manager.manifest_cache
+        cached = cache.cached()
+        if cached:
+            self.set_versions(cached)
+            startup_mark('cached_versions')
+
+        def refresh():
+            try:
+                data = cache.get()
+                self.root.after(0, lambda: self.set_versions(data))
+            except Exception as e:
+                if not cached:
+                    self.root.after(0, lambda err=e: self.versions_failed(err))
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def set_versions(self, data):
+        versions = [v["id"] for v in data["versions"] if v["type"] == "release"]
+        selected = self.version_combo.get()
+        self.version_combo["values"] = versions
+        # Auto-select latest release unless the user already picked one
+        if versions and selected not in versions:
             self.version_combo.current(0)
 
+    def versions_failed(self, error):
+        self.version_combo["values"] = ["1.21.3", "1.20.6", "1.19.4"]
+        self.version_combo.current(0)
+        messagebox.showerror("Error", f"Failed to load versions: {error}")
+
+    # Called from download threads: hand the update to the Tk loop instead of touching widgets here
     def update_status(self, text):
-        self.status_text.set(text)
-        self.root.update_idletasks()
+        self.root.after(0, self.status_text.set, text)
 
     def update_progress(self, value):
-        self.progress['value'] = value
-        self.root.update_idletasks()
+        self.root.after(0, self.progress.config, {'value': value})
 
     def play(self):
         version = self.version_combo.get()
@@ -312,41 +1548,42 @@ class CatMCLauncher:
             messagebox.showwarning("No Version", "Select a version first!")
             return
 
+        ram_gb, profile = int(self.ram_scale.get()), self.profile_combo.get()
         self.progress.start()
         self.update_status(f"Preparing {version}...")
 
         def launch_task():
+            TRACER.reset()
             try:
-                version_dir = MC_DIR / "versions" / version
-                jar_path = version_dir / f"{version}.jar"
-
-                if not jar_path.exists():
-                    self.update_status(f"Downloading {version}...")
-                    self.download_manager.download_version(version)
-
-                # Build launch args
-                natives_dir = version_dir / "natives"
-                classpath = self._build_classpath(version)
-
-                args = [
-                    "java",
-                    f"-Xmx{int(self.ram_scale.get())}G",
-                    f"-Xms1G",
-                    f"-Djava.library.path={natives_dir}",
-                    "-cp", classpath,
-                    "net.minecraft.client.main.Main",
-                    "--username", username,
-                    "--uuid", str(uuid.uuid3(uuid.NAMESPACE_DNS, f"OfflinePlayer:{username}")),
-                    "--accessToken", "0",
-                    "--userType", "legacy",
-                    "--version", version,
-                    "--gameDir", str(MC_DIR),
-                    "--assetsDir", str(MC_DIR / "assets"),
-                    "--assetIndex", version,
-                ]
-
-                self.update_status("Launching Minecraft...")
-                subprocess.run(args, check=True, cwd=str(MC_DIR))
+                with TRACER.span('play', version=version):
+                    version_dir = MC_DIR / "versions" / version
+                    jar_path = version_dir / f"{version}.jar"
+
+                    if not jar_path.exists() or not (version_dir / f"{version}.json").exists():
+                        self.update_status(f"Downloading {version}...")
+                        if not self.download_manager.download_version(version):
+                            raise RuntimeError(f"could not download {version}")
+                    # Missing libraries used to be left off the classpath silently; repair or fail now
+                    self.download_manager.check_classpath(version)
+
+                    with TRACER.span('classpath'):
+                        args = self._build_launch_args(version, username, ram_gb, profile)
+
+                    self.update_status("Launching Minecraft...")
+                    with TRACER.span('spawn_jvm'):
+                        process = subprocess.Popen(args, cwd=str(MC_DIR))
+            except Exception as e:
+                TRACER.save(f"play-{version}-failed")
+                self.update_status(f"Launch failed: {str(e)}")
+                self.progress.stop()
+                return
+
+            trace_path = TRACER.save(f"play-{version}")
+            if trace_path:
+                print(f"Launch trace: {trace_path}")
+            try:
+                if process.wait():
+                    raise subprocess.CalledProcessError(process.returncode, args)
                 self.update_status("Game closed")
             except Exception as e:
                 self.update_status(f"Launch failed: {str(e)}")
@@ -355,6 +1592,24 @@ class CatMCLauncher:
 
         threading.Thread(target=launch_task, daemon=True).start()
 
+    def _build_launch_args(self, version, username, ram_gb, profile):
+        natives_dir = MC_DIR / "versions" / version / "natives"
+        return [
+            JAVA_BIN,
+            *jvm_tuning_args(profile, ram_gb, JAVA_BIN),
+            f"-Djava.library.path={natives_dir}",
+            "-cp", self._build_classpath(version),
+            "net.minecraft.client.main.Main",
+            "--username", username,
+            "--uuid", str(uuid.uuid3(uuid.NAMESPACE_DNS, f"OfflinePlayer:{username}")),
+            "--accessToken", "0",
+            "--userType", "legacy",
+            "--version", version,
+            "--gameDir", str(MC_DIR),
+            "--assetsDir", str(MC_DIR / "assets"),
+            "--assetIndex", version,
+        ]
+
     def _build_classpath(self, version):
         version_json_path = MC_DIR / "versions" / version / f"{version}.json"
         if not version_json_path.exists():
@@ -374,6 +1629,11 @@ class CatMCLauncher:
         return ":".join(classpath)
 
 if __name__ == "__main__":
+    startup_mark('imports')
     root = tk.Tk()
+    startup_mark('tk_root')
     app = CatMCLauncher(root)
+    startup_mark('ui_built')
+    # Idle callbacks run once Tk has mapped and drawn the window
+    root.after_idle(lambda: (startup_mark('first_window'), report_startup()))
     root.mainloop()
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+CTLAUNCHER install benchmark - runs the launchers' install pipelines offline
+
+Starts a local stand-in for Mojang's servers (version manifest, version JSON,
+client jar, libraries with natives classifiers, asset index and objects) with
+configurable sizes, counts and injected latency, installs a synthetic version
+with each launcher into a fresh game dir and reports wall time, throughput,
+requests per second and peak RSS.
+
+    python ctlauncher_bench.py --launchers hdrv1,12.22 --assets 4000 --latency-ms 20 --warm
+    python ctlauncher_bench.py --output bench_output.txt   # append JSON results for later comparison
+
+Each install runs in its own child process so peak RSS is per launcher, with
+the shared library store disabled so every cold run really downloads.
+"""
+import argparse
+import functools
+import hashlib
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+import urllib.parse
+import zipfile
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+HERE = Path(__file__).resolve().parent
+LAUNCHERS = {
+    "hdrv1": "ctlauncherhdrv1.py",
+    "12.22": "ctlauncher12.22.254k.py",
+    "hdrv0": "ctlauncherhdrv0.py",
+}
+VERSION_ID = "bench-1.0"
+# Hard-coded Mojang hosts and the path prefix they live under on the stand-in server
+MOJANG_HOSTS = {
+    "launchermeta.mojang.com": "",
+    "piston-meta.mojang.com": "",
+    "resources.download.minecraft.net": "/resources",
+}
+NATIVE_CLASSIFIERS = {"linux": "natives-linux", "osx": "natives-macos", "windows": "natives-windows"}
+
+
+def sha1(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def build_files(base, args):
+    """Generate the synthetic version; returns {path: body} as served by the stand-in server"""
+    rnd = random.Random(args.seed)
+    files = {}
+
+    libraries = []
+    for i in range(args.libraries):
+        path = f"com/example/lib{i}/1.0/lib{i}-1.0.jar"
+        data = rnd.randbytes(int(args.library_kb * 1024))
+        files["/maven/" + path] = data
+        libraries.append({"name": f"com.example:lib{i}:1.0",
+                          "downloads": {"artifact": {"path": path, "url": f"{base}/maven/{path}",
+                                                     "sha1": sha1(data), "size": len(data)}}})
+
+    for i in range(args.natives):
+        classifiers = {}
+        for os_name, classifier in NATIVE_CLASSIFIERS.items():
+            ext = {"linux": "so", "osx": "dylib", "windows": "dll"}[os_name]
+            buf = io.BytesIO()
+            with zipfile.ZipFile(buf, "w") as z:
+                z.writestr(f"libnative{i}.{ext}", rnd.randbytes(int(args.library_kb * 1024)))
+                z.writestr("META-INF/MANIFEST.MF", "Manifest-Version: 1.0\n")
+            data = buf.getvalue()
+            path = f"com/example/native{i}/1.0/native{i}-1.0-{classifier}.jar"
+            files["/maven/" + path] = data
+            classifiers[classifier] = {"path": path, "url": f"{base}/maven/{path}", "sha1": sha1(data), "size": len(data)}
+        libraries.append({"name": f"com.example:native{i}:1.0", "natives": NATIVE_CLASSIFIERS,
+                          "downloads": {"classifiers": classifiers}})
+
+    objects = {}
+    for i in range(args.assets):
+        data = rnd.randbytes(int(args.asset_kb * 1024))
+        digest = sha1(data)
+        files[f"/resources/{digest[:2]}/{digest}"] = data
+        objects[f"minecraft/bench/object{i}"] = {"hash": digest, "size": len(data)}
+    index = json.dumps({"objects": objects}).encode()
+    files[f"/v1/packages/{sha1(index)}/bench.json"] = index
+
+    jar = rnd.randbytes(int(args.jar_mb * 1024 * 1024))
+    files[f"/v1/objects/{sha1(jar)}/client.jar"] = jar
+
+    version = {
+        "id": VERSION_ID,
+        "type": "release",
+        "mainClass": "net.minecraft.client.main.Main",
+        "assetIndex": {"id": "bench", "url": f"{base}/v1/packages/{sha1(index)}/bench.json",
+                       "sha1": sha1(index), "size": len(index), "totalSize": sum(o["size"] for o in objects.values())},
+        "downloads": {"client": {"url": f"{base}/v1/objects/{sha1(jar)}/client.jar", "sha1": sha1(jar), "size": len(jar)}},
+        "libraries": libraries,
+        "arguments": {"game": ["--username", "${auth_player_name}", "--version", "${version_name}"], "jvm": []},
+        "javaVersion": {"majorVersion": 17},
+    }
+    version_body = json.dumps(version).encode()
+    files[f"/v1/packages/{sha1(version_body)}/{VERSION_ID}.json"] = version_body
+    files["/mc/game/version_manifest_v2.json"] = json.dumps({
+        "latest": {"release": VERSION_ID, "snapshot": VERSION_ID},
+        "versions": [{"id": VERSION_ID, "type": "release", "sha1": sha1(version_body),
+                      "url": f"{base}/v1/packages/{sha1(version_body)}/{VERSION_ID}.json"}],
+    }).encode()
+    return files
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Keep-alive GET with ETag/If-None-Match and single Range support, like Mojang's CDN"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        data = server.files.get(urllib.parse.urlsplit(self.path).path)
+        status, headers, body = 200, {}, data or b""
+        if data is None:
+            status = 404
+        else:
+            etag = f'"{sha1(data)}"'
+            headers["ETag"] = etag
+            if self.headers.get("If-None-Match") == etag:
+                status, body = 304, b""
+            elif self.headers.get("Range", "").startswith("bytes="):
+                start = int(self.headers["Range"][6:].split("-")[0] or 0)
+                status, body = 206, data[start:]
+                headers["Content-Range"] = f"bytes {start}-{len(data) - 1}/{len(data)}"
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with server.lock:
+            server.requests += 1
+            server.bytes_sent += len(body)
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops SYNs when a launcher opens 16 connections at once,
+    # adding a 1 s retransmit that no real CDN would
+    request_queue_size = 128
+
+
+def start_server(args):
+    server = StandInServer(("127.0.0.1", 0), StandInHandler)
+    server.latency = args.latency_ms / 1000
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.bytes_sent = 0
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    server.files = build_files(base, args)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, base
+
+
+def load_launcher(name):
+    import importlib.util
+    spec = importlib.util.spec_from_file_location(f"bench_{name.replace('.', '_')}", HERE / LAUNCHERS[name])
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def redirect_mojang(module, base):
+    """Send a launcher's hard-coded Mojang URLs to the stand-in server"""
+    pool_open = module.HTTP_POOL.open
+
+    def open_local(url, *args, **kwargs):
+        parts = urllib.parse.urlsplit(url)
+        if parts.hostname in MOJANG_HOSTS:
+            url = base + MOJANG_HOSTS[parts.hostname] + parts.path
+        return pool_open(url, *args, **kwargs)
+
+    module.HTTP_POOL.open = open_local
+    if hasattr(module, "RESOURCES_URL"):
+        module.RESOURCES_URL = base + "/resources"
+
+
+class Quiet:
+    """Swallows any call, standing in for the Tk widgets hdrv0's install code pokes"""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def install(name, base, backend):
+    """Run one launcher's install pipeline for VERSION_ID in this process"""
+    module = load_launcher(name)
+    redirect_mojang(module, base)
+    if name == "hdrv1":
+        module.Installer(backend=backend).setup_version(VERSION_ID)
+    elif name == "12.22":
+        if not module.DownloadManager(module.MC_DIR, lambda text: None).download_version(VERSION_ID):
+            raise RuntimeError("download_version failed")
+    else:
+        # hdrv0 installs from CTLauncher methods; run them against a widget-less stand-in
+        module.GAME_DIR = Path(os.environ["CTLAUNCHER_GAME_DIR"])
+        launcher = types.SimpleNamespace(status=Quiet(), root=Quiet())
+        launcher.download_file = functools.partial(module.CTLauncher.download_file, launcher)
+        module.CTLauncher.setup_version(launcher, VERSION_ID)
+
+
+def peak_rss_mb():
+    # ru_maxrss survives exec on Linux, so it would report the parent's peak; VmHWM doesn't
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def child_main(name, base, backend):
+    started = time.perf_counter()
+    error = None
+    try:
+        install(name, base, backend)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    result = {"wall": time.perf_counter() - started, "rss_mb": peak_rss_mb(), "error": error}
+    print(json.dumps(result), flush=True)
+
+
+def run_one(server, base, name, game_dir, args):
+    """Install with one launcher in a child process; return its measurements"""
+    env = dict(os.environ, CTLAUNCHER_GAME_DIR=str(game_dir), CTLAUNCHER_STORE="")
+    with server.lock:
+        server.requests = server.bytes_sent = 0
+    cmd = [sys.executable, str(Path(__file__).resolve()), "--child", name, "--base", base, "--backend", args.backend]
+    proc = subprocess.run(cmd, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    try:
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+    except (IndexError, ValueError):
+        result = {"wall": None, "rss_mb": None, "error": f"child exited with {proc.returncode}"}
+    with server.lock:
+        result.update(requests=server.requests, bytes=server.bytes_sent)
+    wall = result["wall"] or 0
+    result["mb_per_s"] = round(result["bytes"] / wall / 1e6, 2) if wall else None
+    result["req_per_s"] = round(result["requests"] / wall, 1) if wall else None
+    result["wall"] = round(wall, 3)
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline install benchmark for the CTLAUNCHER launchers")
+    parser.add_argument("--launchers", default=",".join(LAUNCHERS), help="comma-separated subset of " + ", ".join(LAUNCHERS))
+    parser.add_argument("--libraries", type=int, default=40, help="plain library jars")
+    parser.add_argument("--natives", type=int, default=4, help="libraries with natives classifiers")
+    parser.add_argument("--library-kb", type=float, default=256)
+    parser.add_argument("--assets", type=int, default=2000, help="asset objects")
+    parser.add_argument("--asset-kb", type=float, default=4)
+    parser.add_argument("--jar-mb", type=float, default=20, help="client jar size")
+    parser.add_argument("--latency-ms", type=float, default=0, help="delay injected before every response")
+    parser.add_argument("--backend", choices=("asyncio", "threads"), default="asyncio", help="hdrv1 download backend")
+    parser.add_argument("--runs", type=int, default=1, help="cold installs per launcher")
+    parser.add_argument("--warm", action="store_true", help="also time a re-install into the same game dir")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="append one JSON line per result to this file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--base", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child_main(args.child, args.base, args.backend)
+        return 0
+
+    names = [name.strip() for name in args.launchers.split(",") if name.strip()]
+    unknown = [name for name in names if name not in LAUNCHERS]
+    if unknown:
+        parser.error(f"unknown launcher(s): {', '.join(unknown)}")
+
+    server, base = start_server(args)
+    total_mb = sum(len(body) for body in server.files.values()) / 1e6
+    print(f"Stand-in server {base}: {len(server.files)} files, {total_mb:.1f} MB, "
+          f"{args.latency_ms:g} ms latency", file=sys.stderr)
+
+    config = {k: v for k, v in vars(args).items() if k not in ("child", "base", "output", "launchers")}
+    revision = git_revision()
+    results = []
+    print(f"{'launcher':<8} {'pass':<5} {'wall s':>8} {'MB':>8} {'MB/s':>8} {'reqs':>6} {'req/s':>8} {'RSS MB':>7}  error")
+    for name in names:
+        for run in range(args.runs):
+            with tempfile.TemporaryDirectory(prefix="ctl-bench-") as game_dir:
+                passes = ["cold", "warm"] if args.warm else ["cold"]
+                for kind in passes:
+                    result = run_one(server, base, name, game_dir, args)
+                    result.update(launcher=name, run=run, kind=kind)
+                    results.append(result)
+                    print(f"{name:<8} {kind:<5} {result['wall']:>8.3f} {result['bytes'] / 1e6:>8.1f} "
+                          f"{result['mb_per_s'] or 0:>8.2f} {result['requests']:>6} {result['req_per_s'] or 0:>8.1f} "
+                          f"{result['rss_mb'] or 0:>7.1f}  {result['error'] or ''}", flush=True)
+    server.shutdown()
+
+    if args.output:
+        with open(args.output, "a") as f:
+            for result in results:
+                f.write(json.dumps({"at": round(time.time()), "revision": revision, "config": config, **result}) + "\n")
+    return 1 if any(result["error"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
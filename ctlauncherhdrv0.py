@@ -3,17 +3,31 @@
 CTLAUNCHER 1.0 [C] SAMSOFT 1999-2025 [MOJANG AB] [C]
 TLauncher 2025 Style - One File, Auto-Download & Launch
 """
+import time
+STARTUP_T0 = time.perf_counter()  # startup report baseline, before the heavy imports
+
 import tkinter as tk
 from tkinter import ttk, messagebox
 import json
 import urllib.request
+import urllib.parse
+import urllib.error
+import http.client
 import shutil
 import subprocess
 import zipfile
 import ssl
 import threading
 import sys
+import os
+import re
+import io
+import base64
+import queue
+import shlex
+from collections import OrderedDict
 from pathlib import Path
+from contextlib import contextmanager
 import uuid
 
 # SSL workaround for macOS/proxy issues
@@ -22,6 +36,259 @@ ssl._create_default_https_context = ssl._create_unverified_context
 GAME_DIR = Path.home() / ".minecraft"
 JAVA_BIN = "java"  # CHANGE TO JAVA 17+ IF NEEDED: e.g. "/opt/homebrew/opt/openjdk@17/bin/java"
 SKIN_SERVER = "https://mc-heads.net"
+MIRROR = os.environ.get("CTLAUNCHER_MIRROR") or None  # LAN mirror base URL (ctlauncherhdrv1.py mirror); unset goes direct
+MIRROR_HOSTS = ("launchermeta.mojang.com", "piston-meta.mojang.com", "piston-data.mojang.com",
+                "launcher.mojang.com", "libraries.minecraft.net", "resources.download.minecraft.net")  # Hosts a mirror caches
+HTTP_POOL_SIZE = 8  # Idle keep-alive connections kept per host
+SKIN_CACHE_TTL = 24 * 60 * 60  # Seconds a skin head on disk is used before refetching
+SKIN_MEMORY_SLOTS = 32  # Decoded skin heads kept in memory
+STARTUP_BUDGET_MS = 200  # Target for process start -> first drawn window
+JVM_PROFILES = ("auto", "g1-low-latency", "zgc", "shenandoah", "default")  # "auto" picks from heap size + Java version
+
+# Per-host pool of persistent HTTP(S) connections shared by all downloads
+class ConnectionPool:
+    REDIRECTS = (301, 302, 303, 307, 308)
+
+    def __init__(self, maxsize, timeout=30, context=None, mirror=None):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.context = context
+        self.mirror = mirror
+        self.lock = threading.Lock()
+        self.idle = {}
+
+    def _connect(self, key, timeout):
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self.context)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _acquire(self, key):
+        with self.lock:
+            conns = self.idle.get(key)
+            if conns:
+                return conns.pop()
+        return None
+
+    def _release(self, key, conn):
+        with self.lock:
+            conns = self.idle.setdefault(key, [])
+            if len(conns) < self.maxsize:
+                conns.append(conn)
+                return
+        conn.close()
+
+    def _request(self, key, path, headers, timeout):
+        # Retry once on a fresh connection if a kept-alive one went stale
+        conn = self._acquire(key)
+        if conn is not None:
+            try:
+                conn.timeout = timeout
+                if conn.sock:
+                    conn.sock.settimeout(timeout)
+                conn.request("GET", path, headers=headers)
+                resp = conn.getresponse()
+                return conn, resp
+            except (http.client.HTTPException, ConnectionError, OSError):
+                conn.close()
+
+        conn = self._connect(key, timeout)
+        try:
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+        except Exception:
+            conn.close()
+            raise
+        return conn, resp
+
+    # url as served by the LAN mirror, when one is set and caches that host
+    def rewrite(self, url):
+        parts = urllib.parse.urlsplit(url)
+        if not self.mirror or parts.hostname not in MIRROR_HOSTS:
+            return url
+        return f"{self.mirror.rstrip('/')}/{parts.netloc}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+
+    @contextmanager
+    def open(self, url, timeout=None, headers=None):
+        timeout = timeout or self.timeout
+        url = self.rewrite(url)
+        parts = urllib.parse.urlsplit(url)
+
+        # Proxied hosts go through urllib, which knows how to talk to the proxy
+        if parts.scheme in urllib.request.getproxies() and not urllib.request.proxy_bypass(parts.hostname):
+            req = urllib.request.Request(url, headers=headers or {})
+            with urllib.request.urlopen(req, timeout=timeout, context=self.context) as resp:
+                yield resp
+            return
+
+        for _ in range(5):
+            key = (parts.scheme, parts.hostname, parts.port)
+            path = parts.path or "/"
+            if parts.query:
+                path += "?" + parts.query
+            request_headers = {"User-Agent": "CTLauncher/1.0", "Accept-Encoding": "identity"}
+            request_headers.update(headers or {})
+
+            conn, resp = self._request(key, path, request_headers, timeout)
+            if resp.status in self.REDIRECTS and resp.getheader("Location"):
+                resp.read()
+                if resp.will_close:
+                    conn.close()
+                else:
+                    self._release(key, conn)
+                url = urllib.parse.urljoin(url, resp.getheader("Location"))
+                parts = urllib.parse.urlsplit(url)
+                continue
+            if resp.status >= 400:
+                conn.close()
+                raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, None)
+
+            try:
+                yield resp
+            except BaseException:
+                conn.close()
+                raise
+            # Only a fully consumed response leaves the connection reusable
+            if resp.isclosed() and not resp.will_close:
+                self._release(key, conn)
+            else:
+                conn.close()
+            return
+
+        raise urllib.error.URLError(f"Too many redirects: {url}")
+
+
+HTTP_POOL = ConnectionPool(HTTP_POOL_SIZE, mirror=MIRROR)
+
+# Skin head PNGs on disk under cache/skins, fetched by one background worker
+class SkinCache:
+    NAME_RE = re.compile(r"^[A-Za-z0-9_]{1,16}$")
+
+    def __init__(self, ttl=SKIN_CACHE_TTL):
+        self.ttl = ttl
+        self.requests = queue.Queue()
+        self.worker = None
+        self.lock = threading.Lock()
+
+    def get(self, username):
+        if not self.NAME_RE.match(username):
+            return None
+        path = GAME_DIR / "cache" / "skins" / f"{username.lower()}.png"
+        try:
+            if time.time() - path.stat().st_mtime < self.ttl:
+                return path.read_bytes()
+        except OSError:
+            pass
+        try:
+            with HTTP_POOL.open(f"{SKIN_SERVER}/head/{username}.png", timeout=3) as resp:
+                data = resp.read()
+        except (OSError, http.client.HTTPException):
+            # Offline: fall back to an expired head if there is one
+            try:
+                return path.read_bytes()
+            except OSError:
+                return None
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        return data
+
+    # callback(username, data) runs on the worker thread
+    def request(self, username, callback):
+        self.requests.put((username, callback))
+        with self.lock:
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._run, daemon=True)
+                self.worker.start()
+
+    def _run(self):
+        while True:
+            username, callback = self.requests.get()
+            # Skip names that were typed past while a fetch was running
+            while not self.requests.empty():
+                username, callback = self.requests.get_nowait()
+            try:
+                data = self.get(username)
+            except Exception:
+                data = None
+            callback(username, data)
+
+# Java version/feature probes, each run once per process
+JAVA_PROBES = {}
+
+# Feature release of a Java executable (8, 17, 21...), 0 if it won't run
+def java_major(java):
+    key = (java, "major")
+    if key not in JAVA_PROBES:
+        try:
+            out = subprocess.run([java, "-version"], capture_output=True, text=True, timeout=15).stderr
+        except (OSError, subprocess.SubprocessError):
+            out = ""
+        match = re.search(r'version "(?:1\.)?(\d+)', out)  # "17.0.9", "1.8.0_392"
+        JAVA_PROBES[key] = int(match.group(1)) if match else 0
+    return JAVA_PROBES[key]
+
+# Whether java starts with flags, e.g. a GC only some builds include
+def java_accepts(java, *flags):
+    key = (java, flags)
+    if key not in JAVA_PROBES:
+        try:
+            JAVA_PROBES[key] = subprocess.run([java, *flags, "-version"], capture_output=True, timeout=15).returncode == 0
+        except (OSError, subprocess.SubprocessError):
+            JAVA_PROBES[key] = False
+    return JAVA_PROBES[key]
+
+# Shenandoah is experimental before JDK 15 and missing from Oracle's builds
+def shenandoah_flags(major):
+    return ("-XX:+UnlockExperimentalVMOptions", "-XX:+UseShenandoahGC") if major < 15 else ("-XX:+UseShenandoahGC",)
+
+# Profile actually used for this heap and Java; unsupported choices fall back to G1
+def resolve_jvm_profile(profile, ram_gb, java):
+    major = java_major(java)
+    if profile == "auto":
+        return "zgc" if major >= 21 and ram_gb >= 8 else "g1-low-latency"  # generational ZGC on big heaps
+    if profile == "zgc" and major < 15:
+        return "g1-low-latency"
+    if profile == "shenandoah" and not java_accepts(java, *shenandoah_flags(major)):
+        return "g1-low-latency"
+    return profile if profile in JVM_PROFILES else "default"
+
+# Heap + GC flags for a profile, sized from the heap and core count
+def jvm_tuning_args(profile, ram_gb, java):
+    profile = resolve_jvm_profile(profile, ram_gb, java)
+    if profile == "default":
+        return [f"-Xmx{ram_gb}G", "-Xms1G"]
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    major = java_major(java)
+    # Fixed, pre-touched heap: no resize pauses or first-touch page faults mid-game
+    args = [f"-Xms{ram_gb}G", f"-Xmx{ram_gb}G", "-XX:+AlwaysPreTouch", "-XX:+DisableExplicitGC",
+            "-XX:+PerfDisableSharedMem", f"-XX:ParallelGCThreads={cpus}"]
+    if profile == "zgc":
+        return args + ["-XX:+UseZGC"] + (["-XX:+ZGenerational"] if 21 <= major < 23 else [])
+    args.append(f"-XX:ConcGCThreads={max(1, cpus // 4)}")
+    if profile == "shenandoah":
+        return args + list(shenandoah_flags(major))
+    large = ram_gb >= 12  # low-pause G1, after Aikar's flags
+    return args + [
+        "-XX:+UseG1GC", "-XX:+ParallelRefProcEnabled", "-XX:MaxGCPauseMillis=50",
+        "-XX:+UnlockExperimentalVMOptions",
+        f"-XX:G1NewSizePercent={40 if large else 30}", f"-XX:G1MaxNewSizePercent={50 if large else 40}",
+        f"-XX:G1HeapRegionSize={16 if large else 8}M", f"-XX:G1ReservePercent={15 if large else 20}",
+        "-XX:G1HeapWastePercent=5", "-XX:G1MixedGCCountTarget=4",
+        f"-XX:InitiatingHeapOccupancyPercent={20 if large else 15}",
+        "-XX:G1MixedGCLiveThresholdPercent=90", "-XX:G1RSetUpdatingPauseTimePercent=5",
+        "-XX:SurvivorRatio=32", "-XX:MaxTenuringThreshold=1",
+    ]
+
+# PNG bytes -> PhotoImage, Tk thread only
+def decode_skin(data):
+    try:
+        from PIL import Image, ImageTk
+    except ImportError:
+        return tk.PhotoImage(data=base64.b64encode(data))  # Tk 8.6+ reads PNG itself
+    img = Image.open(io.BytesIO(data)).resize((128, 128))
+    return ImageTk.PhotoImage(img)
 
 class CTLauncher:
     def __init__(self, root):
@@ -34,10 +301,18 @@ class CTLauncher:
         self.username = tk.StringVar(value="CatDev")
         self.version = tk.StringVar(value="1.20.1")
         self.ram = tk.IntVar(value=4)
+        self.jvm_profile = tk.StringVar(value="auto")
+        self.java_ready = False  # previews wait for the Java probe thread
+        self.skin_timer = None
+        self.skin_photo = None
+        self.skin_cache = SkinCache()
+        self.skin_images = OrderedDict()  # lowercased name -> PhotoImage, oldest first
 
         self.setup_theme()
         self.build_ui()
         self.load_versions()
+        self.update_skin_preview()
+        threading.Thread(target=self.probe_java, daemon=True).start()
 
     def setup_theme(self):
         style = ttk.Style()
@@ -80,7 +355,7 @@ class CTLauncher:
         ttk.Entry(user_frame, textvariable=self.username, width=30).pack(pady=5)
         self.skin_label = ttk.Label(user_frame, text="Skin Preview")
         self.skin_label.pack(pady=20)
-        self.username.trace_add("write", lambda *args: self.update_skin_preview())
+        self.username.trace_add("write", self.schedule_skin_update)
 
         # Version & RAM
         settings_frame = tk.Frame(content, bg="#0a0a0a")
@@ -93,6 +368,15 @@ class CTLauncher:
         self.ram_label = ttk.Label(settings_frame, text="4 GB")
         self.ram_label.pack(pady=5)
         self.ram.trace_add("write", self.update_ram_label)
+        ttk.Label(settings_frame, text="JVM Profile").pack(anchor="w", pady=(10, 0))
+        profile_combo = ttk.Combobox(settings_frame, textvariable=self.jvm_profile, values=JVM_PROFILES,
+                                     state="readonly", width=25)
+        profile_combo.pack(pady=5)
+        profile_combo.bind("<<ComboboxSelected>>", lambda e: self.update_jvm_preview())
+        self.jvm_label = ttk.Label(settings_frame, text="Detecting Java...", foreground="#888888",
+                                   font=("Consolas", 8), wraplength=300)
+        self.jvm_label.pack(anchor="w")
+        ttk.Button(settings_frame, text="Preview command", command=self.show_command_preview).pack(anchor="w", pady=5)
 
         # Play button
         play_btn = ttk.Button(content, text="START MINECRAFT", command=self.play, style="TButton")
@@ -106,37 +390,153 @@ class CTLauncher:
 
     def update_ram_label(self, *args):
         self.ram_label.config(text=f"{self.ram.get()} GB")
+        self.update_jvm_preview()
+
+    # Worker thread: probing runs a JVM or two
+    def probe_java(self):
+        java_accepts(JAVA_BIN, *shenandoah_flags(java_major(JAVA_BIN)))
+        self.root.after(0, self.java_probed)
+
+    def java_probed(self):
+        self.java_ready = True
+        self.update_jvm_preview()
+
+    # Profile the RAM/profile choice resolves to and its flags
+    def update_jvm_preview(self):
+        if not self.java_ready:
+            return
+        ram_gb, profile = self.ram.get(), self.jvm_profile.get()
+        flags = " ".join(jvm_tuning_args(profile, ram_gb, JAVA_BIN))
+        self.jvm_label.config(text=f"Java {java_major(JAVA_BIN) or '?'}, {resolve_jvm_profile(profile, ram_gb, JAVA_BIN)}: {flags}")
+
+    # Exact command Play would run; needs the version's JSON for the classpath
+    def show_command_preview(self):
+        version = self.version.get()
+        if not self.java_ready or not (GAME_DIR / "versions" / version / f"{version}.json").exists():
+            messagebox.showinfo("Preview", "Install the version (and wait for Java detection) to preview its command.")
+            return
+        command = self.launch_args(version, self.username.get().strip() or "Player", self.ram.get(), self.jvm_profile.get())
+        win = tk.Toplevel(self.root)
+        win.title(f"Launch command - {version}")
+        text = tk.Text(win, bg="#111111", fg="#cccccc", font=("Consolas", 9), wrap="char", bd=0, width=110, height=18)
+        text.pack(fill="both", expand=True, padx=8, pady=8)
+        text.insert("1.0", subprocess.list2cmdline(command) if sys.platform == "win32" else shlex.join(command))
+        text.config(state="disabled")
+
+    def launch_args(self, version, username, ram_gb, profile):
+        version_dir = GAME_DIR / "versions" / version
+        jar_path = version_dir / f"{version}.jar"
+        with open(version_dir / f"{version}.json") as f:
+            version_json = json.load(f)
+
+        natives_dir = version_dir / "natives"
+
+        # FIXED: Full ordered classpath from version JSON
+        classpath_parts = [str(jar_path)]
+        for lib in version_json["libraries"]:
+            if "downloads" in lib and "artifact" in lib["downloads"]:
+                lib_path = GAME_DIR / "libraries" / lib["downloads"]["artifact"]["path"]
+                if lib_path.exists():
+                    classpath_parts.append(str(lib_path))
+
+        classpath = ":".join(classpath_parts)
+
+        return [
+            JAVA_BIN,
+            *jvm_tuning_args(profile, ram_gb, JAVA_BIN),
+            "-Djava.library.path=" + str(natives_dir.resolve()),
+            "-cp", classpath,
+            "net.minecraft.client.main.Main",
+            "--username", username,
+            "--uuid", str(uuid.uuid3(uuid.NAMESPACE_DNS, f"OfflinePlayer:{username}")),
+            "--accessToken", "0",
+            "--userType", "legacy",
+            "--version", version,
+            "--gameDir", str(GAME_DIR.resolve()),
+            "--assetsDir", str((GAME_DIR / "assets").resolve()),
+            "--assetIndex", version_json["assetIndex"]["id"],
+        ]
+
+    def schedule_skin_update(self, *args):
+        if self.skin_timer:
+            self.root.after_cancel(self.skin_timer)
+            self.skin_timer = None
+        # Heads already in memory show at once; anything else waits for typing to pause
+        if not self.show_cached_skin(self.username.get().strip()):
+            self.skin_timer = self.root.after(500, self.update_skin_preview)
+
+    def show_cached_skin(self, username):
+        photo = self.skin_images.get(username.lower())
+        if photo is None:
+            return False
+        self.skin_images.move_to_end(username.lower())
+        self.skin_photo = photo
+        self.skin_label.config(image=photo, text="")
+        return True
 
     def update_skin_preview(self, *args):
-        try:
-            import requests
-            from PIL import Image, ImageTk
-            import io
-            url = f"{SKIN_SERVER}/head/{self.username.get()}.png"
-            resp = requests.get(url, timeout=3)
-            if resp.status_code == 200:
-                img = Image.open(io.BytesIO(resp.content)).resize((128, 128))
-                self.skin_photo = ImageTk.PhotoImage(img)
-                self.skin_label.config(image=self.skin_photo, text="")
-                return
-        except:
-            pass
-        self.skin_label.config(text="Skin Preview", image="")
+        self.skin_timer = None
+        username = self.username.get().strip()
+        if not username:
+            self.skin_label.config(text="Skin Preview", image="")
+            return
+        if not self.show_cached_skin(username):
+            self.skin_cache.request(username, lambda name, data: self.root.after(0, self.show_skin, name, data))
+
+    def show_skin(self, username, data):
+        photo = None
+        if data:
+            try:
+                photo = decode_skin(data)
+            except Exception:
+                pass
+        if photo is not None:
+            self.skin_images[username.lower()] = photo
+            # Assigning to an existing key keeps its old slot, so refreshed heads must move to the MRU end too
+            self.skin_images.move_to_end(username.lower())
+            while len(self.skin_images) > SKIN_MEMORY_SLOTS:
+                self.skin_images.popitem(last=False)
+        if username != self.username.get().strip():
+            return
+        if photo is None:
+            self.skin_label.config(text="Skin Preview", image="")
+        else:
+            self.skin_photo = photo
+            self.skin_label.config(image=photo, text="")
 
     def load_versions(self):
+        # Show the last downloaded manifest at once; the network refresh runs in the background
+        cache_path = GAME_DIR / "cache" / "version_manifest_v2.json"
         try:
-            url = "https://launchermeta.mojang.com/mc/game/version_manifest_v2.json"
-            with urllib.request.urlopen(url) as resp:
-                data = json.loads(resp.read().decode())
-            versions = [v["id"] for v in data["versions"] if v["type"] == "release"]
-            self.version_combo["values"] = versions
-        except:
+            with open(cache_path) as f:
+                self.set_versions(json.load(f))
+            startup_mark("cached_versions")
+        except (OSError, ValueError, KeyError):
             self.version_combo["values"] = ["1.20.1", "1.19.4"]
 
+        def refresh():
+            try:
+                url = "https://launchermeta.mojang.com/mc/game/version_manifest_v2.json"
+                with HTTP_POOL.open(url, timeout=10) as resp:
+                    body = resp.read()
+                data = json.loads(body.decode())
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = cache_path.with_suffix(".tmp")
+                tmp.write_bytes(body)
+                os.replace(tmp, cache_path)
+                self.root.after(0, lambda: self.set_versions(data))
+            except Exception:
+                pass  # keep the cached or built-in list
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def set_versions(self, data):
+        self.version_combo["values"] = [v["id"] for v in data["versions"] if v["type"] == "release"]
+
     def download_file(self, url: str, dest: Path):
         self.status.config(text=f"Downloading {url.split('/')[-1]}...")
         self.root.update()
-        with urllib.request.urlopen(url) as resp, open(dest, "wb") as f:
+        with HTTP_POOL.open(url) as resp, open(dest, "wb") as f:
             shutil.copyfileobj(resp, f)
 
     def setup_version(self, version_id: str):
@@ -144,13 +544,13 @@ class CTLauncher:
         version_dir.mkdir(parents=True, exist_ok=True)
 
         manifest_url = "https://launchermeta.mojang.com/mc/game/version_manifest_v2.json"
-        with urllib.request.urlopen(manifest_url) as resp:
+        with HTTP_POOL.open(manifest_url) as resp:
             manifest = json.loads(resp.read().decode())
         for v in manifest["versions"]:
             if v["id"] == version_id:
                 version_url = v["url"]
                 break
-        with urllib.request.urlopen(version_url) as resp:
+        with HTTP_POOL.open(version_url) as resp:
             version_json = json.loads(resp.read().decode())
 
         version_json_path = version_dir / f"{version_id}.json"
@@ -210,7 +610,7 @@ class CTLauncher:
             return
 
         ram_gb = self.ram.get()
-        max_ram = f"{ram_gb}G"
+        profile = self.jvm_profile.get()
 
         self.progress.start()
         self.status.config(text="Preparing...")
@@ -227,37 +627,7 @@ class CTLauncher:
                     self.root.after(0, lambda: self.status.config(text="Downloading game files..."))
                     self.setup_version(version)
 
-                with open(version_json_path) as f:
-                    version_json = json.load(f)
-
-                natives_dir = version_dir / "natives"
-
-                # FIXED: Full ordered classpath from version JSON
-                classpath_parts = [str(jar_path)]
-                for lib in version_json["libraries"]:
-                    if "downloads" in lib and "artifact" in lib["downloads"]:
-                        lib_path = GAME_DIR / "libraries" / lib["downloads"]["artifact"]["path"]
-                        if lib_path.exists():
-                            classpath_parts.append(str(lib_path))
-
-                classpath = ":".join(classpath_parts)
-
-                args = [
-                    JAVA_BIN,
-                    f"-Xmx{max_ram}",
-                    f"-Xms1G",
-                    "-Djava.library.path=" + str(natives_dir.resolve()),
-                    "-cp", classpath,
-                    "net.minecraft.client.main.Main",
-                    "--username", username,
-                    "--uuid", str(uuid.uuid3(uuid.NAMESPACE_DNS, f"OfflinePlayer:{username}")),
-                    "--accessToken", "0",
-                    "--userType", "legacy",
-                    "--version", version,
-                    "--gameDir", str(GAME_DIR.resolve()),
-                    "--assetsDir", str((GAME_DIR / "assets").resolve()),
-                    "--assetIndex", version_json["assetIndex"]["id"],
-                ]
+                args = self.launch_args(version, username, ram_gb, profile)
 
                 self.root.after(0, lambda: self.status.config(text="Launching Minecraft..."))
                 subprocess.run(args, check=True, cwd=str(GAME_DIR))
@@ -271,7 +641,30 @@ class CTLauncher:
 
         threading.Thread(target=launch_thread, daemon=True).start()
 
+STARTUP_MARKS = {}
+
+def startup_mark(name):
+    STARTUP_MARKS[name] = round((time.perf_counter() - STARTUP_T0) * 1000, 1)
+
+# Printed and appended to cache/startup.jsonl so time-to-first-window can be tracked
+def report_startup():
+    window_ms = STARTUP_MARKS.get("first_window", 0)
+    verdict = "OK" if window_ms <= STARTUP_BUDGET_MS else f"over the {STARTUP_BUDGET_MS} ms budget"
+    print("Startup: " + ", ".join(f"{name} {ms} ms" for name, ms in STARTUP_MARKS.items()) + f" ({verdict})")
+    try:
+        log_path = GAME_DIR / "cache" / "startup.jsonl"
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(log_path, "a") as f:
+            f.write(json.dumps({"at": round(time.time()), **STARTUP_MARKS}) + "\n")
+    except OSError:
+        pass
+
 if __name__ == "__main__":
+    startup_mark("imports")
     root = tk.Tk()
+    startup_mark("tk_root")
     app = CTLauncher(root)
+    startup_mark("ui_built")
+    # Idle callbacks run once Tk has mapped and drawn the window
+    root.after_idle(lambda: (startup_mark("first_window"), report_startup()))
     root.mainloop()
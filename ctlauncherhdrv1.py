@@ -3,11 +3,26 @@
 CTLAUNCHER 1.0 [C] SAMSOFT 1999-2025 [MOJANG AB] [C]
 TLauncher 2025 Style - One File, Auto-Download & Launch
 FIXED VERSION - All bugs resolved
+
+Headless: ctlauncherhdrv1.py [--game-dir DIR] [--store DIR] [--mirror URL] install|verify|launch|supervise VERSION...|java|mirror
 """
-import tkinter as tk
-from tkinter import ttk, messagebox
+import time
+STARTUP_T0 = time.perf_counter()  # Baseline for the startup report, taken before the heavy imports
+
+try:
+    import tkinter as tk
+    from tkinter import ttk, messagebox
+except ImportError:
+    # Headless images may lack Tk; the command-line mode doesn't need it
+    tk = ttk = messagebox = None
+import argparse
+import asyncio
 import json
 import urllib.request
+import urllib.parse
+import urllib.error
+import http.client
+import http.server
 import shutil
 import subprocess
 import zipfile
@@ -18,97 +33,2538 @@ import os
 import platform
 from pathlib import Path
 import uuid
+import hashlib
+import base64
+import queue
+import re
+import shlex
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# SSL workaround for macOS/proxy issues
+ssl._create_default_https_context = ssl._create_unverified_context
+
+GAME_DIR = Path(os.environ.get("CTLAUNCHER_GAME_DIR") or Path.home() / ".minecraft")
+# Host-wide SHA-1-addressed store that game dirs hardlink libraries/assets from; "" disables it
+SHARED_STORE = os.environ.get("CTLAUNCHER_STORE", str(Path.home() / ".ctlauncher" / "store"))
+# Base URL of a LAN mirror (the "mirror" command on another host) to fetch game files through; unset goes direct
+MIRROR = os.environ.get("CTLAUNCHER_MIRROR") or None
+# Hosts a mirror caches; anything else, like skins, is always fetched directly
+MIRROR_HOSTS = ("launchermeta.mojang.com", "piston-meta.mojang.com", "piston-data.mojang.com",
+                "launcher.mojang.com", "libraries.minecraft.net", "resources.download.minecraft.net")
+MIRROR_PORT = 8741
+SKIN_SERVER = "https://mc-heads.net"
+VERSION_MANIFEST_URL = "https://launchermeta.mojang.com/mc/game/version_manifest_v2.json"
+# Seconds a cached version manifest is trusted before it is revalidated
+MANIFEST_TTL = 10 * 60
+
+# Number of concurrent library/native downloads during setup
+DOWNLOAD_WORKERS = 8
+# Asset objects are small and latency-bound, so use more workers for them
+ASSET_WORKERS = 16
+RESOURCES_URL = "https://resources.download.minecraft.net"
+# Attempts per file; interrupted transfers resume from their .part file
+DOWNLOAD_RETRIES = 3
+# "asyncio" runs bulk downloads on one event loop, "threads" on a thread pool
+DOWNLOAD_BACKEND = "asyncio"
+# Download progress is pushed to the UI at most this many times a second
+PROGRESS_HZ = 20
+
+# Seconds a downloaded skin head is shown from disk before it is fetched again
+SKIN_CACHE_TTL = 24 * 60 * 60
+# Decoded skin heads kept in memory for instant account switching
+SKIN_MEMORY_SLOTS = 32
+
+# Target for time from process start to the first drawn window, in milliseconds
+STARTUP_BUDGET_MS = 200
+
+# Chrome-trace files of recent installs/launches kept under <game dir>/logs/traces
+TRACE_KEEP = 20
+
+# Game output is read from the pipe in chunks of this many bytes
+LOG_CHUNK = 64 * 1024
+# Lines of game output kept in memory and shown in the log panel
+LOG_RING_LINES = 5000
+# A game log file is rotated once it grows past this size; this many old files are kept
+LOG_FILE_MAX = 8 * 1024 * 1024
+LOG_KEEP = 5
+# How often the log panel picks up new lines, in milliseconds
+LOG_POLL_MS = 100
+
+# Seconds between starting supervised instances, so they don't all load at once
+LAUNCH_STAGGER = 2.0
+# First restart delay for a crashed instance in seconds; doubles per restart up to RESTART_BACKOFF_MAX
+RESTART_BACKOFF = 5.0
+RESTART_BACKOFF_MAX = 60.0
+# Seconds a stopped instance gets to exit before it is killed
+STOP_GRACE = 10.0
+
+# JVM performance profiles; "auto" picks one from the heap size and the Java version
+JVM_PROFILES = ("auto", "g1-low-latency", "zgc", "shenandoah", "default")
+JVM_PROFILE = "auto"
+
+# Per-version AppCDS archives (JDK 13+): the first clean exit dumps the loaded classes, later launches map them
+APPCDS = True
+# Log lines a client prints right before the title screen; their arrival is taken as time-to-main-menu
+MAIN_MENU_RE = re.compile(rb"Sound engine started|SoundSystem started")
+
+# Pre-launch check of the client jar and libraries: "quick" compares sizes, "full" hashes everything
+LAUNCH_VERIFY = "quick"
+
+# Bump when the launch plan layout changes so stale plans are rebuilt
+LAUNCH_PLAN_FORMAT = 3
+
+# FIX: Cross-platform classpath separator
+CLASSPATH_SEP = ";" if sys.platform == "win32" else ":"
+
+def java_candidates():
+    """Every java executable worth probing: JAVA_HOME, PATH, the usual install roots and Mojang's runtimes"""
+    exe = "java.exe" if sys.platform == "win32" else "java"
+    found = []
+    if os.environ.get("JAVA_HOME"):
+        found.append(Path(os.environ["JAVA_HOME"]) / "bin" / exe)
+    found += [Path(entry) / exe for entry in os.environ.get("PATH", "").split(os.pathsep) if entry]
+    if sys.platform == "darwin":
+        for root in (Path("/Library/Java/JavaVirtualMachines"), Path.home() / "Library/Java/JavaVirtualMachines"):
+            found += root.glob("*/Contents/Home/bin/java")
+        for root in (Path("/opt/homebrew/opt"), Path("/usr/local/opt")):
+            found += root.glob("openjdk*/bin/java")
+    elif sys.platform == "win32":
+        for base in {os.environ.get("PROGRAMFILES"), os.environ.get("PROGRAMFILES(X86)")} - {None}:
+            for vendor in ("Java", "Eclipse Adoptium", "Microsoft", "Zulu", "BellSoft", "Amazon Corretto"):
+                found += (Path(base) / vendor).glob(f"*/bin/{exe}")
+    else:  # Linux
+        for root in (Path("/usr/lib/jvm"), Path("/usr/lib64/jvm"), Path("/opt/java")):
+            found += root.glob("*/bin/java")
+    # Runtimes the official launcher downloaded: runtime/<component>/<platform>/<component>/...
+    found += GAME_DIR.glob(f"runtime/*/*/*/bin/{exe}")
+    found += GAME_DIR.glob("runtime/*/*/*/jre.bundle/Contents/Home/bin/java")
+    return found
+
+
+class JavaRuntimes:
+    """Finds installed JVMs and learns their version and architecture, running each binary once
+
+    Probe results are kept in cache/java_runtimes.json keyed by real path and checked against the
+    binary's (size, mtime), so later startups only stat files instead of starting JVMs.
+    """
+
+    PROPERTY_RE = re.compile(r"^\s*(java\.version|java\.specification\.version|java\.vendor|os\.arch) = (.*?)\s*$", re.M)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = None  # real path -> probe result, loaded on first use
+        self.found = None  # working runtimes from the last scan()
+
+    def _cache_path(self):
+        # Resolved late: --game-dir may change GAME_DIR after import
+        return GAME_DIR / "cache" / "java_runtimes.json"
+
+    def _load(self):
+        # Called with the lock held
+        if self.entries is None:
+            try:
+                with open(self._cache_path()) as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def _save(self):
+        # Called with the lock held
+        path = self._cache_path()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self.entries, indent=1))
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def _probe(self, path):
+        try:
+            out = subprocess.run([path, "-XshowSettings:properties", "-version"],
+                                 capture_output=True, text=True, timeout=15).stderr
+        except (OSError, subprocess.SubprocessError):
+            out = ""
+        props = dict(self.PROPERTY_RE.findall(out))
+        spec = props.get("java.specification.version", "")
+        try:
+            # "1.8" for Java 8, "17" from 9 on
+            major = int(spec[2:] if spec.startswith("1.") else spec)
+        except ValueError:
+            major = 0  # Not a working JVM; remembered so it isn't run again until it changes
+        return {"path": path, "major": major, "version": props.get("java.version"),
+                "vendor": props.get("java.vendor"), "arch": arch_name(props.get("os.arch", ""))}
+
+    def info(self, java, save=True):
+        """Probe result for one executable (a path, or a name looked up on PATH); None if there is none"""
+        resolved = shutil.which(str(java))
+        if not resolved:
+            return None
+        real = os.path.realpath(resolved)
+        stamp = file_stamp(real)
+        with self.lock:
+            self._load()
+            entry = self.entries.get(real)
+            if entry and entry.get("stamp") == stamp:
+                return entry
+        entry = self._probe(real)
+        entry["stamp"] = stamp
+        with self.lock:
+            self.entries[real] = entry
+            if save:
+                self._save()
+        return entry
+
+    def scan(self, refresh=False):
+        """All working JVMs on this machine; only new or changed binaries are probed, in parallel
+
+        refresh probes every binary again instead of trusting the cache.
+        """
+        with self.lock:
+            if self.found is not None and not refresh:
+                return self.found
+            if refresh:
+                self.entries = {}
+        paths = dict.fromkeys(os.path.realpath(p) for p in java_candidates() if os.path.isfile(p) and os.access(p, os.X_OK))
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            found = [entry for entry in pool.map(lambda p: self.info(p, save=False), paths) if entry and entry["major"]]
+        with self.lock:
+            # With no candidates nothing was probed, so the cache may not be loaded yet
+            self._load()
+            # Forget binaries that are gone so the cache doesn't grow forever
+            self.entries = {path: entry for path, entry in self.entries.items() if os.path.exists(path)}
+            self._save()
+            self.found = found
+        return found
+
+    def pick(self, major=None):
+        """Best runtime for a version wanting Java `major` (None: the newest), or None
+
+        The host's architecture wins first (natives are per-arch), then the exact major, then the
+        closest newer one; an older Java can't load the game's classes at all.
+        """
+        host = get_arch()
+        runtimes = self.scan()
+        if major is None:
+            return max(runtimes, key=lambda rt: (rt["arch"] == host, rt["major"]), default=None)
+        usable = [rt for rt in runtimes if rt["major"] >= major]
+        return min(usable, key=lambda rt: (rt["arch"] != host, rt["major"] - major), default=None)
+
+
+JAVA_RUNTIMES = JavaRuntimes()
+
+# Fixed Java executable; None lets JAVA_RUNTIMES pick one per version
+JAVA_BIN = None
+
+
+def java_for(major=None):
+    """Java to launch a version that wants `major` with (None: the newest found)"""
+    if JAVA_BIN is not None:
+        return JAVA_BIN
+    runtime = JAVA_RUNTIMES.pick(major)
+    if runtime is not None:
+        return runtime["path"]
+    found = sorted({rt["major"] for rt in JAVA_RUNTIMES.scan()})
+    if found and major:
+        # Fail here rather than after a JVM start and an UnsupportedClassVersionError
+        raise RuntimeError(f"This version needs Java {major} or newer, but only Java "
+                           f"{', '.join(map(str, found))} is installed")
+    return "java"
+
+
+def java_bin():
+    """Default Java (the newest found); discovery results are cached in cache/java_runtimes.json"""
+    return java_for(None)
+
+
+_JAVA_PROBES = {}
+
+
+def java_major(java):
+    """Feature release of a Java executable (8, 17, 21...), 0 if it won't run"""
+    info = JAVA_RUNTIMES.info(java)
+    return info["major"] if info else 0
+
+
+def java_accepts(java, *flags):
+    """Whether java starts with flags, e.g. a GC that only some builds include; probed once per process"""
+    key = (java, flags)
+    if key not in _JAVA_PROBES:
+        try:
+            result = subprocess.run([java, *flags, "-version"], capture_output=True, timeout=15)
+            _JAVA_PROBES[key] = result.returncode == 0
+        except (OSError, subprocess.SubprocessError):
+            _JAVA_PROBES[key] = False
+    return _JAVA_PROBES[key]
+
+
+def shenandoah_flags(major):
+    # Shenandoah is experimental before JDK 15 and missing from Oracle's builds entirely
+    return ("-XX:+UnlockExperimentalVMOptions", "-XX:+UseShenandoahGC") if major < 15 else ("-XX:+UseShenandoahGC",)
+
+
+def resolve_jvm_profile(profile, ram_gb, java):
+    """The profile that will actually be used with this heap and Java, falling back to G1"""
+    major = java_major(java)
+    if profile == "auto":
+        # Generational ZGC (21+) keeps pauses sub-millisecond once the heap is big enough to matter
+        return "zgc" if major >= 21 and ram_gb >= 8 else "g1-low-latency"
+    if profile == "zgc" and major < 15:
+        return "g1-low-latency"
+    if profile == "shenandoah" and not java_accepts(java, *shenandoah_flags(major)):
+        return "g1-low-latency"
+    return profile if profile in JVM_PROFILES else "default"
+
+
+def jvm_tuning_args(profile, ram_gb, java, cpus=None):
+    """Heap and GC flags for a profile, sized from the heap and the cores the game may use"""
+    profile = resolve_jvm_profile(profile, ram_gb, java)
+    if profile == "default":
+        return [f"-Xmx{ram_gb}G", "-Xms512M"]
+    if cpus is None:
+        cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    major = java_major(java)
+    # Fixed, pre-touched heap: no resize pauses and no page faults on first use mid-game
+    args = [f"-Xms{ram_gb}G", f"-Xmx{ram_gb}G", "-XX:+AlwaysPreTouch", "-XX:+DisableExplicitGC",
+            "-XX:+PerfDisableSharedMem", f"-XX:ParallelGCThreads={cpus}"]
+    if profile == "zgc":
+        args.append("-XX:+UseZGC")
+        if 21 <= major < 23:
+            args.append("-XX:+ZGenerational")  # The default from 23 on
+        return args
+    args.append(f"-XX:ConcGCThreads={max(1, cpus // 4)}")
+    if profile == "shenandoah":
+        return args + list(shenandoah_flags(major))
+    # Low-pause G1 (after Aikar's flags): big young gen, early mixed collections, short pause target
+    large = ram_gb >= 12
+    return args + [
+        "-XX:+UseG1GC", "-XX:+ParallelRefProcEnabled", "-XX:MaxGCPauseMillis=50",
+        "-XX:+UnlockExperimentalVMOptions",
+        f"-XX:G1NewSizePercent={40 if large else 30}", f"-XX:G1MaxNewSizePercent={50 if large else 40}",
+        f"-XX:G1HeapRegionSize={16 if large else 8}M", f"-XX:G1ReservePercent={15 if large else 20}",
+        "-XX:G1HeapWastePercent=5", "-XX:G1MixedGCCountTarget=4",
+        f"-XX:InitiatingHeapOccupancyPercent={20 if large else 15}",
+        "-XX:G1MixedGCLiveThresholdPercent=90", "-XX:G1RSetUpdatingPauseTimePercent=5",
+        "-XX:SurvivorRatio=32", "-XX:MaxTenuringThreshold=1",
+    ]
+
+
+def format_command(args):
+    """A command line as the user's shell would take it, for previews"""
+    return subprocess.list2cmdline(args) if sys.platform == "win32" else shlex.join(args)
+
+
+class CdsArchives:
+    """AppCDS archives per version and JVM under cache/cds, so later launches skip class loading/verification
+
+    A launch with no usable archive is the training run: -XX:ArchiveClassesAtExit dumps every class the
+    game loaded when it exits. The archive name is a hash of the launch plan's inputs (classpath jars and
+    their stamps) and the JVM binary, so a changed classpath or Java simply misses and trains again.
+    index.json lists the archives that were completely written.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+    def _dir(self):
+        return GAME_DIR / "cache" / "cds"
+
+    def _index(self):
+        try:
+            with open(self._dir() / "index.json") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def archive(self, version, plan, java):
+        """Archive path for this version + classpath + JVM (whether or not it exists yet)"""
+        real = os.path.realpath(shutil.which(java) or java)
+        key = hashlib.sha1(json.dumps([plan["inputs"], plan["jvm_args"], real, file_stamp(real)]).encode()).hexdigest()
+        safe = "".join(c if c.isalnum() or c in ".-_" else "_" for c in version)
+        return self._dir() / f"{safe}-{key[:16]}.jsa"
+
+    def args(self, version, plan, java, train=True):
+        """(JVM flags, mode) for a launch; mode is "on" (archive mapped), "dump" (training run) or "off"
+
+        train=False never dumps, for launches that may run side by side and would race on the file.
+        """
+        if not APPCDS or java_major(java) < 13:
+            return [], "off"
+        archive = self.archive(version, plan, java)
+        state = self._index().get(archive.name)
+        if state == "ready" and archive.exists():
+            return [f"-XX:SharedArchiveFile={archive}"], "on"
+        if state == "failed" or not train:
+            return [], "off"
+        self._dir().mkdir(parents=True, exist_ok=True)
+        # Archives of this version for an older classpath or JVM can never match again
+        prefix = archive.name.rsplit("-", 1)[0]
+        for old in self._dir().glob(f"{prefix}-*.jsa"):
+            if old != archive and old.name.rsplit("-", 1)[0] == prefix:
+                old.unlink(missing_ok=True)
+        return [f"-XX:ArchiveClassesAtExit={archive}"], "dump"
+
+    def finished(self, version, plan, java, mode, code):
+        """Record how a training run went once its JVM has exited"""
+        if mode != "dump":
+            return
+        archive = self.archive(version, plan, java)
+        if code == 0:
+            # A clean exit that left no archive means this JVM can't dump one (e.g. no base CDS archive)
+            state = "ready" if archive.exists() and archive.stat().st_size else "failed"
+        elif archive.exists():
+            archive.unlink(missing_ok=True)  # Killed mid-dump; try again next time
+            return
+        else:
+            return
+        with self.lock:
+            # Drop pruned archives; "failed" entries have no file but must stick
+            index = {name: value for name, value in self._index().items()
+                     if value == "failed" or (self._dir() / name).exists()}
+            index[archive.name] = state
+            tmp = self._dir() / "index.tmp"
+            tmp.write_text(json.dumps(index, indent=1))
+            os.replace(tmp, self._dir() / "index.json")
+
+    def record_menu_time(self, version, java, mode, seconds):
+        """Append a time-to-main-menu sample to logs/launch_times.jsonl; returns (median with CDS, without)"""
+        path = GAME_DIR / "logs" / "launch_times.jsonl"
+        sample = {"at": round(time.time()), "version": version, "java": java_major(java), "cds": mode,
+                  "menu_s": round(seconds, 2)}
+        with_cds, without = [], []
+        with self.lock:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with open(path, "a+") as f:
+                    f.seek(0)
+                    for line in f:
+                        try:
+                            past = json.loads(line)
+                        except ValueError:
+                            continue
+                        if past.get("version") == version:
+                            (with_cds if past.get("cds") == "on" else without).append(past["menu_s"])
+                    f.write(json.dumps(sample) + "\n")
+            except OSError:
+                pass
+        (with_cds if mode == "on" else without).append(sample["menu_s"])
+        median = lambda xs: sorted(xs)[len(xs) // 2] if xs else None
+        return median(with_cds), median(without)
+
+
+CDS_ARCHIVES = CdsArchives()
+
+
+STARTUP_MARKS = {}
+
+
+def startup_mark(name):
+    """Record how long after process start the named startup step finished"""
+    STARTUP_MARKS[name] = round((time.perf_counter() - STARTUP_T0) * 1000, 1)
+
+
+def report_startup():
+    """Print the startup timings and append them to cache/startup.jsonl so they can be tracked"""
+    window_ms = STARTUP_MARKS.get("first_window", 0)
+    verdict = "OK" if window_ms <= STARTUP_BUDGET_MS else f"over the {STARTUP_BUDGET_MS} ms budget"
+    steps = ", ".join(f"{name} {ms} ms" for name, ms in STARTUP_MARKS.items())
+    print(f"Startup: {steps} ({verdict})", file=sys.stderr)
+    try:
+        log_path = GAME_DIR / "cache" / "startup.jsonl"
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(log_path, "a") as f:
+            f.write(json.dumps({"at": round(time.time()), **STARTUP_MARKS}) + "\n")
+    except OSError:
+        pass
+
+
+def get_os_name():
+    """FIX: Get correct OS name for Minecraft library rules"""
+    if sys.platform == "win32":
+        return "windows"
+    elif sys.platform == "darwin":
+        return "osx"
+    else:
+        return "linux"
+
+
+def get_arch():
+    """Get system architecture"""
+    return arch_name(platform.machine())
+
+
+def arch_name(machine):
+    """x64/arm64/x86 for a platform.machine() or Java os.arch value"""
+    machine = machine.lower()
+    if machine in ("x86_64", "amd64"):
+        return "x64"
+    elif machine in ("aarch64", "arm64"):
+        return "arm64"
+    elif machine in ("i386", "i686", "x86"):
+        return "x86"
+    return machine
+
+
+def check_rules(rules):
+    """FIX: Properly evaluate Minecraft library rules"""
+    if not rules:
+        return True
+    
+    os_name = get_os_name()
+    arch = get_arch()
+    
+    # Default: disallow unless explicitly allowed
+    allowed = False
+    
+    for rule in rules:
+        action = rule.get("action", "allow")
+        matches = True
+        
+        if "os" in rule:
+            os_rule = rule["os"]
+            if "name" in os_rule and os_rule["name"] != os_name:
+                matches = False
+            if "arch" in os_rule and os_rule["arch"] != arch:
+                matches = False
+        
+        if matches:
+            allowed = (action == "allow")
+    
+    return allowed
+
+
+class ConnectionPool:
+    """Per-host pool of persistent HTTP(S) connections shared by all downloads"""
+
+    REDIRECTS = (301, 302, 303, 307, 308)
+
+    def __init__(self, maxsize, timeout=30, context=None, mirror=None):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.context = context
+        self.mirror = mirror
+        self.lock = threading.Lock()
+        self.idle = {}
+        self.opened = 0
+        self.reused = 0
+
+    def _connect(self, key, timeout):
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self.context)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _acquire(self, key):
+        with self.lock:
+            conns = self.idle.get(key)
+            if conns:
+                return conns.pop()
+        return None
+
+    def _release(self, key, conn):
+        with self.lock:
+            conns = self.idle.setdefault(key, [])
+            if len(conns) < self.maxsize:
+                conns.append(conn)
+                return
+        conn.close()
+
+    def _request(self, key, path, headers, timeout):
+        """Send a GET, retrying once on a fresh connection if a kept-alive one went stale"""
+        conn = self._acquire(key)
+        if conn is not None:
+            try:
+                conn.timeout = timeout
+                if conn.sock:
+                    conn.sock.settimeout(timeout)
+                conn.request("GET", path, headers=headers)
+                resp = conn.getresponse()
+                with self.lock:
+                    self.reused += 1
+                return conn, resp
+            except (http.client.HTTPException, ConnectionError, OSError):
+                conn.close()
+
+        conn = self._connect(key, timeout)
+        try:
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+        except Exception:
+            conn.close()
+            raise
+        with self.lock:
+            self.opened += 1
+        return conn, resp
+
+    def rewrite(self, url):
+        """url as served by the LAN mirror, when one is set and caches that host"""
+        parts = urllib.parse.urlsplit(url)
+        if not self.mirror or parts.hostname not in MIRROR_HOSTS:
+            return url
+        return f"{self.mirror.rstrip('/')}/{parts.netloc}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+
+    @contextmanager
+    def open(self, url, timeout=None, headers=None):
+        """GET url and yield the response; the connection is kept if the body was fully read"""
+        timeout = timeout or self.timeout
+        url = self.rewrite(url)
+        parts = urllib.parse.urlsplit(url)
+
+        # Proxied hosts go through urllib, which knows how to talk to the proxy
+        if parts.scheme in urllib.request.getproxies() and not urllib.request.proxy_bypass(parts.hostname):
+            req = urllib.request.Request(url, headers=headers or {})
+            with urllib.request.urlopen(req, timeout=timeout, context=self.context) as resp:
+                yield resp
+            return
+
+        for _ in range(5):
+            key = (parts.scheme, parts.hostname, parts.port)
+            path = parts.path or "/"
+            if parts.query:
+                path += "?" + parts.query
+            request_headers = {"User-Agent": "CTLauncher/1.0", "Accept-Encoding": "identity"}
+            request_headers.update(headers or {})
+
+            conn, resp = self._request(key, path, request_headers, timeout)
+            if resp.status in self.REDIRECTS and resp.getheader("Location"):
+                resp.read()
+                if resp.will_close:
+                    conn.close()
+                else:
+                    self._release(key, conn)
+                url = urllib.parse.urljoin(url, resp.getheader("Location"))
+                parts = urllib.parse.urlsplit(url)
+                continue
+            if resp.status >= 400:
+                conn.close()
+                raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, None)
+
+            try:
+                yield resp
+            except BaseException:
+                conn.close()
+                raise
+            # Only a fully consumed response leaves the connection reusable
+            if resp.isclosed() and not resp.will_close:
+                self._release(key, conn)
+            else:
+                conn.close()
+            return
+
+        raise urllib.error.URLError(f"Too many redirects: {url}")
+
+    def add_stats(self, opened, reused):
+        """Fold in connection counts from the asyncio backend, which keeps its own sockets"""
+        with self.lock:
+            self.opened += opened
+            self.reused += reused
+
+    def stats(self):
+        with self.lock:
+            return {"opened": self.opened, "reused": self.reused}
+
+    def requests(self):
+        """Requests sent so far, on new or reused connections"""
+        with self.lock:
+            return self.opened + self.reused
+
+
+# Shared by every download so asset/library requests reuse warm TLS connections
+HTTP_POOL = ConnectionPool(max(DOWNLOAD_WORKERS, ASSET_WORKERS), mirror=MIRROR)
+
+
+class ManifestCache:
+    """On-disk version manifest cache under GAME_DIR, revalidated with ETag/Last-Modified"""
+
+    def __init__(self, url=VERSION_MANIFEST_URL, ttl=MANIFEST_TTL):
+        self.url = url
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.data = None
+        self.meta = {}
+
+    def _paths(self):
+        cache_dir = GAME_DIR / "cache"
+        return cache_dir / "version_manifest_v2.json", cache_dir / "version_manifest_v2.meta.json"
+
+    def _load(self):
+        data_path, meta_path = self._paths()
+        try:
+            with open(data_path) as f:
+                self.data = json.load(f)
+            with open(meta_path) as f:
+                self.meta = json.load(f)
+        except (OSError, ValueError):
+            self.meta = {}
+
+    def _save(self, body=None):
+        data_path, meta_path = self._paths()
+        data_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so a crash never leaves a half-written cache
+        for path, content in ((data_path, body), (meta_path, json.dumps(self.meta).encode())):
+            if content is None:
+                continue
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(content)
+            os.replace(tmp, path)
+
+    def cached(self):
+        """Return the manifest on disk without touching the network, or None if there is none"""
+        with self.lock:
+            if self.data is None:
+                self._load()
+            return self.data
+
+    def get(self, timeout=10, force=False):
+        """Return the manifest, hitting the network only when the cached copy is stale"""
+        with self.lock:
+            if self.data is None:
+                self._load()
+            age = time.time() - self.meta.get("fetched_at", 0)
+            if self.data is not None and age < self.ttl and not force:
+                return self.data
+
+            headers = {}
+            if self.data is not None:
+                if self.meta.get("etag"):
+                    headers["If-None-Match"] = self.meta["etag"]
+                if self.meta.get("last_modified"):
+                    headers["If-Modified-Since"] = self.meta["last_modified"]
+
+            try:
+                with HTTP_POOL.open(self.url, timeout=timeout, headers=headers) as resp:
+                    body = resp.read()
+                    if resp.status == 304:
+                        self.meta["fetched_at"] = time.time()
+                        self._save()
+                        return self.data
+                    data = json.loads(body.decode())
+                    self.meta = {
+                        "etag": resp.headers.get("ETag"),
+                        "last_modified": resp.headers.get("Last-Modified"),
+                        "fetched_at": time.time(),
+                    }
+                self.data = data
+                self._save(body)
+                return self.data
+            except (OSError, ValueError, http.client.HTTPException) as e:
+                # Offline: keep working from whatever we cached last
+                if self.data is not None:
+                    print(f"Manifest refresh failed, using cached copy: {e}", file=sys.stderr)
+                    return self.data
+                raise
+
+
+MANIFEST_CACHE = ManifestCache()
+
+
+def sha1_file(path, chunk_size=1024 * 1024):
+    """SHA-1 of a file, read in fixed-size chunks"""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class IntegrityIndex:
+    """Persistent path -> (size, mtime, sha1) index so unchanged files are never re-hashed"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.path = None
+        self.entries = {}
+        self.dirty = False
+
+    def _key(self, path):
+        path = Path(path)
+        try:
+            return str(path.relative_to(GAME_DIR))
+        except ValueError:
+            return str(path)
+
+    def _ensure_loaded(self):
+        path = GAME_DIR / "cache" / "integrity.json"
+        if path == self.path:
+            return
+        self.path = path
+        self.dirty = False
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def record(self, path, sha1):
+        """Remember the hash of a file we just wrote or verified"""
+        st = os.stat(path)
+        with self.lock:
+            self._ensure_loaded()
+            self.entries[self._key(path)] = [st.st_size, st.st_mtime_ns, sha1]
+            self.dirty = True
+
+    def verify(self, path, sha1=None, size=None, rehash=False):
+        """True if path exists and matches sha1/size; hashes only new or modified files
+
+        rehash ignores the remembered hash, to catch corruption that kept size and mtime.
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        if size is not None and st.st_size != size:
+            return False
+        if not sha1:
+            return True
+
+        key = self._key(path)
+        with self.lock:
+            self._ensure_loaded()
+            entry = self.entries.get(key)
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns and not rehash:
+            return entry[2] == sha1
+
+        actual = sha1_file(path)
+        with self.lock:
+            self.entries[key] = [st.st_size, st.st_mtime_ns, actual]
+            self.dirty = True
+        return actual == sha1
+
+    def save(self):
+        with self.lock:
+            if not self.dirty or self.path is None:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w") as f:
+                json.dump(self.entries, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+            self.dirty = False
+
+
+INTEGRITY_INDEX = IntegrityIndex()
+
+
+_PATH_LOCKS = {}
+_PATH_LOCKS_GUARD = threading.Lock()
+
+
+def path_lock(path):
+    """Per-file lock so concurrent installs sharing a library don't write it twice"""
+    with _PATH_LOCKS_GUARD:
+        return _PATH_LOCKS.setdefault(str(path), threading.Lock())
+
+
+class Tracer:
+    """Records install/launch spans as Chrome-trace events (open in chrome://tracing or Perfetto)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Start a new trace; timestamps are relative to now"""
+        with self.lock:
+            self.events = []
+            self.lanes = {}
+            self.origin = time.perf_counter()
+
+    def _tid(self, lane):
+        # Called with the lock held; names each track once
+        if lane is None:
+            tid, lane = threading.get_native_id(), threading.current_thread().name
+        else:
+            tid = self.lanes.get(lane, {}).get("tid") or len(self.lanes) + 1
+        if lane not in self.lanes:
+            self.lanes[lane] = {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid,
+                                "args": {"name": lane}}
+        return tid
+
+    @contextmanager
+    def span(self, name, cat="phase", lane=None, **args):
+        """Time the with-block; the yielded dict becomes the span's args (bytes, requests, ...)
+
+        lane names a track for work that isn't tied to one OS thread, like asyncio downloads.
+        """
+        start = time.perf_counter()
+        try:
+            yield args
+        except BaseException as e:
+            args["error"] = repr(e)
+            raise
+        finally:
+            end = time.perf_counter()
+            with self.lock:
+                self.events.append({
+                    "name": name, "cat": cat, "ph": "X", "pid": os.getpid(), "tid": self._tid(lane),
+                    "ts": round((start - self.origin) * 1e6), "dur": round((end - start) * 1e6), "args": args,
+                })
+
+    def save(self, label):
+        """Write the trace to <game dir>/logs/traces and prune old ones; returns the path or None"""
+        with self.lock:
+            if not self.events:
+                return None
+            trace = {"traceEvents": list(self.lanes.values()) + self.events, "displayTimeUnit": "ms"}
+        trace_dir = GAME_DIR / "logs" / "traces"
+        safe = "".join(c if c.isalnum() or c in ".-_" else "_" for c in label)
+        path = trace_dir / f"{time.strftime('%Y%m%d-%H%M%S')}-{safe}.json"
+        try:
+            trace_dir.mkdir(parents=True, exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(trace, f, separators=(",", ":"))
+            for old in sorted(trace_dir.glob("*.json"))[:-TRACE_KEEP]:
+                old.unlink()
+        except OSError as e:
+            print(f"Could not write trace: {e}", file=sys.stderr)
+            return None
+        return path
+
+
+TRACER = Tracer()
+
+
+class ProgressTracker:
+    """Adds up bytes and files across concurrent transfers and reports them at a fixed rate
+
+    Transfers only bump counters under a lock; one ticker thread calls callback(snapshot)
+    at most PROGRESS_HZ times a second, and only when something changed.
+    """
+
+    RATE_WINDOW = 3.0  # Seconds of history behind the throughput figure
+
+    def __init__(self, callback=None, hz=PROGRESS_HZ):
+        self.callback = callback
+        self.interval = 1.0 / hz
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.ticker = None
+        self.received = 0
+        # Install-wide byte budget from the install plan; unlike the rest it survives begin()
+        self.plan_total = 0
+        self.plan_done = 0
+        self._reset(None, 0, 0)
+
+    def _reset(self, label, files, total_bytes):
+        self.label = label
+        self.files_total = files
+        self.files_done = 0
+        self.bytes_total = total_bytes
+        self.bytes_done = 0
+        self.in_flight = {}
+        self.samples = deque([(time.monotonic(), self.received)])
+        self.last = None
+
+    def plan(self, total_bytes):
+        """Track bytes against a whole install's planned total across phases; 0 turns it off"""
+        with self.lock:
+            self.plan_total = total_bytes
+            self.plan_done = 0
+
+    def begin(self, label, files, total_bytes=0):
+        """Start a phase of `files` transfers totalling `total_bytes` (0 if unknown)"""
+        with self.lock:
+            self._reset(label, files, total_bytes)
+        if self.callback and self.ticker is None:
+            self.stopped.clear()
+            self.ticker = threading.Thread(target=self._tick, daemon=True)
+            self.ticker.start()
+
+    def add_bytes(self, key, count):
+        with self.lock:
+            self.in_flight[key] = self.in_flight.get(key, 0) + count
+            self.bytes_done += count
+            self.plan_done += count
+            self.received += count
+
+    def rewind(self, key):
+        """Take back key's bytes when its transfer restarts from zero"""
+        with self.lock:
+            counted = self.in_flight.pop(key, 0)
+            self.bytes_done -= counted
+            self.plan_done -= counted
+
+    def file_done(self, key, size=None):
+        """Count a finished file; bytes it already had on disk (resumed, linked, verified) count too"""
+        with self.lock:
+            counted = self.in_flight.pop(key, 0)
+            self.files_done += 1
+            if size:
+                self.bytes_done += size - counted
+                self.plan_done += size - counted
+
+    def end(self):
+        """Stop the ticker and publish the final state of the phase"""
+        if self.ticker is not None:
+            self.stopped.set()
+            self.ticker.join()
+            self.ticker = None
+        self._publish()
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self.lock:
+            self.samples.append((now, self.received))
+            while len(self.samples) > 2 and now - self.samples[0][0] > self.RATE_WINDOW:
+                self.samples.popleft()
+            since, received = self.samples[0]
+            rate = (self.received - received) / (now - since) if now > since else 0.0
+            if self.bytes_total:
+                percent = min(100, int(self.bytes_done * 100 / self.bytes_total))
+            else:
+                percent = int(self.files_done * 100 / self.files_total) if self.files_total else 0
+            remaining = max(0, self.bytes_total - self.bytes_done)
+            return {
+                "label": self.label,
+                "files_done": self.files_done,
+                "files_total": self.files_total,
+                "bytes_done": self.bytes_done,
+                "bytes_total": self.bytes_total,
+                "percent": percent,
+                "rate": int(rate),
+                "eta": round(remaining / rate, 1) if rate and remaining else None,
+                "plan_bytes_done": min(self.plan_done, self.plan_total),
+                "plan_bytes_total": self.plan_total,
+            }
+
+    def _publish(self):
+        if not self.callback:
+            return
+        snap = self.snapshot()
+        state = (snap["label"], snap["files_done"], snap["bytes_done"])
+        if state == self.last:
+            return
+        self.last = state
+        self.callback(snap)
+
+    def _tick(self):
+        while not self.stopped.wait(self.interval):
+            self._publish()
+
+
+def format_progress(snap):
+    """One line for a progress snapshot, e.g. Assets 120/3000 - 4.2 MB/s - ETA 12s"""
+    text = f"{snap['label']} {snap['files_done']}/{snap['files_total']}"
+    # The install plan's total stays on screen for the whole install; otherwise this phase's
+    if snap.get("plan_bytes_total"):
+        text += f" - {snap['plan_bytes_done'] / 1e6:.1f}/{snap['plan_bytes_total'] / 1e6:.1f} MB"
+    elif snap["bytes_total"]:
+        text += f" - {snap['bytes_done'] / 1e6:.1f}/{snap['bytes_total'] / 1e6:.1f} MB"
+    if snap["rate"]:
+        text += f" - {snap['rate'] / 1e6:.1f} MB/s"
+    if snap["eta"] is not None:
+        text += f" - ETA {int(snap['eta'])}s"
+    return text
+
+
+def describe_install_plan(plan):
+    """One line for an install plan, e.g. 1.20.1: 3400 files (610.2 MB) to download, 12 from the shared store"""
+    if not plan["download_files"] and not plan["store_files"]:
+        return f"{plan['version']}: all {plan['present_files']} files already installed"
+    if plan["download_files"]:
+        text = f"{plan['version']}: {plan['download_files']} files ({plan['download_bytes'] / 1e6:.1f} MB) to download"
+    else:
+        text = f"{plan['version']}: nothing to download"
+    if plan["store_files"]:
+        text += f", {plan['store_files']} ({plan['store_bytes'] / 1e6:.1f} MB) from the shared store"
+    if plan["present_files"]:
+        text += f", {plan['present_files']} already installed"
+    return text
+
+
+class PartFile:
+    """Writes dest.part, resuming after bytes already on disk, and renames it into place once verified"""
+
+    def __init__(self, dest, size=None, progress=None):
+        self.dest = Path(dest)
+        self.path = self.dest.with_name(self.dest.name + ".part")
+        self.progress = progress
+        self.digest = hashlib.sha1()
+        self.offset = 0
+        self.written = 0  # Bytes received by this PartFile, as opposed to resumed from disk
+
+        try:
+            existing = self.path.stat().st_size
+        except OSError:
+            existing = 0
+        if size is not None and existing > size:
+            self.path.unlink()
+        elif existing:
+            # Re-hash what we already have so the final SHA-1 covers the whole file
+            with open(self.path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    self.digest.update(chunk)
+            self.offset = existing
+        self.f = open(self.path, "ab")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.f.close()
+        # Nothing received yet: don't leave empty .part files around
+        if not self.offset and self.path.exists():
+            self.discard()
+
+    def range_header(self):
+        return {"Range": f"bytes={self.offset}-"} if self.offset else {}
+
+    def accept(self, status, content_range):
+        """Check the response fits our Range request; restart from zero if the server sent the full body"""
+        if not self.offset:
+            return
+        if status != 206:
+            self.f.seek(0)
+            self.f.truncate()
+            self.digest = hashlib.sha1()
+            self.offset = 0
+            if self.progress:
+                self.progress.rewind(self.dest)
+        elif not (content_range or "").startswith(f"bytes {self.offset}-"):
+            raise ValueError(f"unexpected Content-Range {content_range!r} for {self.dest.name}")
+
+    def write(self, chunk):
+        self.f.write(chunk)
+        self.digest.update(chunk)
+        self.offset += len(chunk)
+        self.written += len(chunk)
+        if self.progress:
+            self.progress.add_bytes(self.dest, len(chunk))
+
+    def complete(self, sha1, size):
+        """True if the bytes on disk already make up the whole expected file"""
+        if size is not None:
+            return self.offset == size
+        return bool(sha1) and self.offset > 0 and self.digest.hexdigest() == sha1
+
+    def commit(self, sha1=None, size=None):
+        """Verify and atomically move the part file to dest; a bad file is discarded"""
+        self.f.close()
+        try:
+            if size is not None and self.offset != size:
+                raise ValueError(f"size mismatch for {self.dest.name}: {self.offset} != {size}")
+            if sha1 and self.digest.hexdigest() != sha1:
+                raise ValueError(f"SHA-1 mismatch for {self.dest.name}")
+        except ValueError:
+            self.discard()
+            raise
+        os.replace(self.path, self.dest)
+        return self.digest.hexdigest()
+
+    @staticmethod
+    def remove(dest):
+        """Drop dest's .part file, e.g. when its range is no longer valid"""
+        try:
+            Path(dest).with_name(Path(dest).name + ".part").unlink()
+        except OSError:
+            pass
+
+    def discard(self):
+        self.f.close()
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+
+def retryable(error):
+    """Network hiccups are worth another attempt; a 404 or a bad hash from the server is not"""
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code in (408, 416, 429) or error.code >= 500
+    return not isinstance(error, ValueError)
+
+
+class AsyncDownloader:
+    """Runs many downloads on one asyncio event loop, bounded by a semaphore instead of OS threads"""
+
+    WRITE_BATCH = 1024 * 1024  # Body bytes collected on the loop before one write+hash on the executor
+
+    def __init__(self, concurrency, timeout=30, progress=None):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.progress = progress
+        self.context = ssl._create_default_https_context()
+        self.idle = {}
+        self.opened = 0
+        self.reused = 0
+        self.executor = None
+
+    def run(self, jobs, on_done=None):
+        """Download (url, dest, sha1, size) jobs from the calling thread; return the ones that failed.
+
+        on_done(job, ok) runs on the event loop thread, so UI callbacks must post
+        themselves onto the Tk loop (e.g. via root.after) as the GUI status hook does.
+        """
+        return asyncio.run(self._run(jobs, on_done))
+
+    async def _run(self, jobs, on_done):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        lanes = list(range(self.concurrency, 0, -1))
+        failed = []
+
+        async def worker(job):
+            async with semaphore:
+                # One trace track per concurrent slot keeps the per-file spans from overlapping
+                lane = lanes.pop()
+                try:
+                    with TRACER.span(job[1].name, "file", lane=f"async download {lane}", url=job[0]) as span:
+                        ok = await self._download(*job, span)
+                finally:
+                    lanes.append(lane)
+            if not ok:
+                failed.append(job)
+            if on_done:
+                on_done(job, ok)
+
+        # Hashing, store links and lock waits run here; one thread per slot, so a slot never waits for another
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="async-download-io")
+        try:
+            await asyncio.gather(*(worker(job) for job in jobs))
+        finally:
+            self.executor.shutdown(wait=False)
+            for conns in self.idle.values():
+                for _, writer in conns:
+                    writer.close()
+            self.idle.clear()
+            HTTP_POOL.add_stats(self.opened, self.reused)
+        return failed
+
+    def _blocking(self, fn, *args):
+        """Run disk I/O or hashing off the event loop so other transfers keep streaming"""
+        return asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    @staticmethod
+    def _stored(dest, digest):
+        INTEGRITY_INDEX.record(dest, digest)
+        CONTENT_STORE.add(digest, dest)
+
+    async def _download(self, url, dest, sha1, size, span):
+        # Share the per-file lock with the thread backend; a contended one is waited for off the loop
+        lock = path_lock(dest)
+        if not lock.acquire(blocking=False):
+            acquiring = self._blocking(lock.acquire)
+            try:
+                await asyncio.shield(acquiring)
+            except asyncio.CancelledError:
+                # The executor thread still takes the lock; hand it straight back
+                acquiring.add_done_callback(lambda _: lock.release())
+                raise
+        try:
+            if sha1 and await self._blocking(INTEGRITY_INDEX.verify, dest, sha1, size):
+                span["source"] = "verified"
+                return True
+            if await self._blocking(CONTENT_STORE.fetch, sha1, dest, size):
+                await self._blocking(INTEGRITY_INDEX.record, dest, sha1)
+                span["source"] = "store"
+                return True
+            span.update(source="network", requests=0, bytes=0)
+            for attempt in range(DOWNLOAD_RETRIES):
+                resumed = False
+                try:
+                    # Opening a .part file re-hashes the prefix already on disk
+                    with await self._blocking(PartFile, dest, size, self.progress) as part:
+                        resumed = part.offset > 0
+                        if not part.complete(sha1, size):
+                            span["requests"] += 1
+                            try:
+                                await self._fetch(url, part)
+                            finally:
+                                span["bytes"] += part.written
+                        digest = await self._blocking(part.commit, sha1, size)
+                    await self._blocking(self._stored, dest, digest)
+                    return True
+                except Exception as e:
+                    print(f"Download error: {url}: {e!r}", file=sys.stderr)
+                    # A stale range can't be resumed; anything else keeps its .part for the next try
+                    if isinstance(e, urllib.error.HTTPError) and e.code == 416:
+                        PartFile.remove(dest)
+                    # A bad hash after resuming may be a corrupt local prefix, so start over once
+                    if not (retryable(e) or resumed) or attempt == DOWNLOAD_RETRIES - 1:
+                        return False
+                    await asyncio.sleep(attempt + 1)
+        finally:
+            lock.release()
+
+    async def _connect(self, key):
+        conns = self.idle.get(key)
+        if conns:
+            return conns.pop(), True
+        scheme, host, port = key
+        https = scheme == "https"
+        conn = await asyncio.wait_for(
+            asyncio.open_connection(host, port or (443 if https else 80), ssl=self.context if https else None),
+            self.timeout)
+        self.opened += 1
+        return conn, False
+
+    async def _fetch(self, url, part):
+        """GET url into a PartFile over a pooled keep-alive connection, following redirects"""
+        url = HTTP_POOL.rewrite(url)
+        for _ in range(5):
+            parts = urllib.parse.urlsplit(url)
+            key = (parts.scheme, parts.hostname, parts.port)
+            path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+            range_line = "".join(f"{k}: {v}\r\n" for k, v in part.range_header().items())
+            request = (f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\nUser-Agent: CTLauncher/1.0\r\n"
+                       f"Accept-Encoding: identity\r\n{range_line}\r\n").encode()
+
+            # A reused connection may have been closed by the server; retry once on a fresh one
+            for attempt in range(2):
+                (reader, writer), reused = await self._connect(key)
+                try:
+                    writer.write(request)
+                    await writer.drain()
+                    status_line = await asyncio.wait_for(reader.readline(), self.timeout)
+                    if not status_line:
+                        raise ConnectionResetError("connection closed before response")
+                    break
+                except (OSError, asyncio.IncompleteReadError):
+                    writer.close()
+                    if not reused or attempt:
+                        raise
+            if reused:
+                self.reused += 1
+
+            try:
+                status = int(status_line.split()[1])
+                headers = {}
+                while True:
+                    line = await asyncio.wait_for(reader.readline(), self.timeout)
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                ok = status in (200, 206)
+                if ok:
+                    part.accept(status, headers.get("content-range"))
+                if status in (204, 304):
+                    keep_alive = True
+                else:
+                    keep_alive = await self._read_body(reader, headers, part if ok else None)
+            except BaseException:
+                writer.close()
+                raise
+
+            if keep_alive and headers.get("connection", "").lower() != "close":
+                self.idle.setdefault(key, []).append((reader, writer))
+            else:
+                writer.close()
+
+            if status in ConnectionPool.REDIRECTS and "location" in headers:
+                url = urllib.parse.urljoin(url, headers["location"])
+                continue
+            if not ok:
+                raise urllib.error.HTTPError(url, status, "HTTP error", None, None)
+            return
+
+        raise urllib.error.URLError(f"Too many redirects: {url}")
+
+    async def _read_body(self, reader, headers, sink):
+        """Stream a response body to sink (or drop it); return whether the connection can be reused
+
+        sink.write (disk write + SHA-1) runs on the executor, WRITE_BATCH bytes at a time.
+        """
+        pending = bytearray()
+
+        async def flush():
+            if pending:
+                data = bytes(pending)
+                pending.clear()
+                await self._blocking(sink.write, data)
+
+        async def consume(chunk):
+            if sink is not None:
+                pending.extend(chunk)
+                if len(pending) >= self.WRITE_BATCH:
+                    await flush()
+
+        keep_alive = await self._read_chunks(reader, headers, consume)
+        await flush()
+        return keep_alive
+
+    async def _read_chunks(self, reader, headers, consume):
+        """Feed a response body to the async consume(chunk) as it arrives; return whether the connection can be reused"""
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size_line = await asyncio.wait_for(reader.readline(), self.timeout)
+                chunk_size = int(size_line.split(b";")[0].strip() or b"0", 16)
+                if chunk_size == 0:
+                    # Skip trailers up to the terminating blank line
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return True
+                await consume(await asyncio.wait_for(reader.readexactly(chunk_size), self.timeout))
+                await reader.readexactly(2)
+
+        if "content-length" in headers:
+            remaining = int(headers["content-length"])
+            while remaining:
+                chunk = await asyncio.wait_for(reader.read(min(remaining, 64 * 1024)), self.timeout)
+                if not chunk:
+                    raise asyncio.IncompleteReadError(b"", remaining)
+                await consume(chunk)
+                remaining -= len(chunk)
+            return True
+
+        # No length: the body runs until the server closes the connection
+        while True:
+            chunk = await asyncio.wait_for(reader.read(64 * 1024), self.timeout)
+            if not chunk:
+                return False
+            await consume(chunk)
+
+
+def clone_file(src, dst):
+    """Hardlink src to dst, falling back to a reflink and finally a plain copy"""
+    try:
+        os.link(src, dst)
+        return
+    except OSError:
+        pass
+    try:
+        import fcntl
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), 0x40049409, fsrc.fileno())  # FICLONE
+        return
+    except (ImportError, OSError):
+        pass
+    shutil.copyfile(src, dst)
+
+
+class ContentStore:
+    """Shared SHA-1-addressed copies of library jars and asset objects, one per host"""
+
+    def __init__(self, root):
+        self.root = Path(root).expanduser() if root else None
+
+    def object_path(self, sha1):
+        return self.root / sha1[:2] / sha1
+
+    def has(self, sha1, size=None):
+        """Whether fetch() can satisfy this object without the network"""
+        if not self.root or not sha1:
+            return False
+        try:
+            stored = self.object_path(sha1).stat().st_size
+        except OSError:
+            return False
+        return size is None or stored == size
+
+    def fetch(self, sha1, dest, size=None):
+        """Materialise a stored object at dest; False if the store doesn't have it"""
+        if not self.has(sha1, size):
+            return False
+        src = self.object_path(sha1)
+        tmp = dest.with_name(dest.name + ".link")
+        try:
+            if tmp.exists():
+                tmp.unlink()
+            clone_file(src, tmp)
+            os.replace(tmp, dest)
+        except OSError as e:
+            print(f"Shared store link failed for {dest.name}: {e}", file=sys.stderr)
+            if tmp.exists():
+                tmp.unlink()
+            return False
+        return True
+
+    def add(self, sha1, path):
+        """Hardlink a verified file into the store; skipped where links aren't possible"""
+        if not self.root or not sha1:
+            return
+        target = self.object_path(sha1)
+        if target.exists():
+            return
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            # A copy would double disk use, so only ever link into the store
+            os.link(path, target)
+        except OSError:
+            pass
+
+
+CONTENT_STORE = ContentStore(SHARED_STORE)
+
+
+class MirrorServer(http.server.ThreadingHTTPServer):
+    """Threaded server for LanMirror, with a listen backlog sized for many parallel downloads"""
+
+    daemon_threads = True
+    # The default backlog of 5 drops SYNs when a client opens 16 connections at once, and each
+    # dropped SYN costs a 1 s retransmit
+    request_queue_size = 128
+
+
+class LanMirror:
+    """Caching HTTP mirror of Mojang's download hosts for the other launchers on a LAN
+
+    Clients ask for /<host>/<path>. A miss is fetched from <host> once, with concurrent requests
+    for the same URL waiting on that one fetch, and kept SHA-1-addressed in a ContentStore, so
+    pointing it at the host's shared store serves everything this host already installed.
+    """
+
+    def __init__(self, root, scheme="https", ttl=MANIFEST_TTL):
+        self.store = ContentStore(root)
+        self.scheme = scheme
+        self.ttl = ttl
+        self.index_path = Path(root).expanduser() / "mirror_index.json"
+        self.incoming = Path(root).expanduser() / "incoming"
+        # Never rewritten, or a mirror configured as its own client would loop
+        self.upstream = ConnectionPool(max(DOWNLOAD_WORKERS, ASSET_WORKERS))
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "served_bytes": 0, "upstream_bytes": 0}
+        try:
+            with open(self.index_path) as f:
+                self.urls = json.load(f)
+        except (OSError, ValueError):
+            self.urls = {}
+
+    @staticmethod
+    def content_sha1(url):
+        """The SHA-1 an immutable URL names (asset objects, piston-data/-meta packages), else None"""
+        found = re.findall(r"/([0-9a-f]{40})(?=/|$)", urllib.parse.urlsplit(url).path)
+        return found[-1] if found else None
+
+    def cached(self, url, stale=False):
+        """(object path, content type) for url if the cache can answer it; stale=True ignores the TTL"""
+        sha1 = self.content_sha1(url)
+        entry = self.urls.get(url)
+        if entry is None:
+            return (self.store.object_path(sha1), None) if self.store.has(sha1) else None
+        if not self.store.has(entry["sha1"], entry["size"]):
+            return None
+        # Maven artifacts and hash-named files never change; manifests do
+        host = urllib.parse.urlsplit(url).hostname
+        if not (stale or sha1 or host == "libraries.minecraft.net" or time.time() - entry["fetched_at"] < self.ttl):
+            return None
+        return self.store.object_path(entry["sha1"]), entry.get("type")
+
+    def fill(self, url):
+        """Download url into the store once and return (object path, content type)"""
+        with path_lock("mirror:" + url):
+            hit = self.cached(url)
+            if hit:
+                with self.lock:
+                    self.stats["hits"] += 1
+                return hit
+            self.incoming.mkdir(parents=True, exist_ok=True)
+            tmp = self.incoming / f"{uuid.uuid4().hex}.part"
+            digest = hashlib.sha1()
+            try:
+                try:
+                    with self.upstream.open(url) as resp, open(tmp, "wb") as f:
+                        content_type = resp.headers.get("Content-Type")
+                        for chunk in iter(lambda: resp.read(1024 * 1024), b""):
+                            f.write(chunk)
+                            digest.update(chunk)
+                except (OSError, http.client.HTTPException) as e:
+                    # Upstream unreachable: an expired manifest beats no manifest
+                    stale = None if isinstance(e, urllib.error.HTTPError) else self.cached(url, stale=True)
+                    if stale is None:
+                        raise
+                    print(f"Mirror: {url} unreachable, serving cached copy: {e}", file=sys.stderr)
+                    return stale
+                sha1 = digest.hexdigest()
+                expected = self.content_sha1(url)
+                if expected and expected != sha1:
+                    raise ValueError(f"SHA-1 mismatch for {url}")
+                target = self.store.object_path(sha1)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp, target)
+            finally:
+                if tmp.exists():
+                    tmp.unlink()
+            size = target.stat().st_size
+            with self.lock:
+                self.stats["misses"] += 1
+                self.stats["upstream_bytes"] += size
+                # Hash-named URLs are found by their name, so only the rest need the index
+                if not expected:
+                    self.urls[url] = {"sha1": sha1, "size": size, "type": content_type, "fetched_at": time.time()}
+                    tmp_index = self.index_path.with_suffix(".tmp")
+                    with open(tmp_index, "w") as f:
+                        json.dump(self.urls, f)
+                    os.replace(tmp_index, self.index_path)
+            print(f"Mirror: cached {url} ({size} bytes)", file=sys.stderr)
+            return target, content_type
+
+    def handle(self, request):
+        """Answer one GET from a BaseHTTPRequestHandler, with single-range support for resumes"""
+        netloc, _, rest = request.path.lstrip("/").partition("/")
+        if urllib.parse.urlsplit(f"//{netloc}").hostname not in MIRROR_HOSTS:
+            request.send_error(404, "Not a mirrored host")
+            return
+        url = f"{self.scheme}://{netloc}/{rest}"
+        try:
+            hit = self.cached(url)
+            if hit:
+                with self.lock:
+                    self.stats["hits"] += 1
+            else:
+                hit = self.fill(url)
+        except urllib.error.HTTPError as e:
+            request.send_error(e.code)
+            return
+        except Exception as e:
+            print(f"Mirror: {url} failed: {e}", file=sys.stderr)
+            request.send_error(502, str(e))
+            return
+        path, content_type = hit
+
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            start, end = 0, size - 1
+            match = re.fullmatch(r"bytes=(\d+)-(\d*)", request.headers.get("Range", ""))
+            if match:
+                start = int(match.group(1))
+                end = min(int(match.group(2) or end), end)
+                if start > end:
+                    request.send_response(416)
+                    request.send_header("Content-Range", f"bytes */{size}")
+                    request.send_header("Content-Length", "0")
+                    request.end_headers()
+                    return
+                request.send_response(206)
+                request.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            else:
+                request.send_response(200)
+            request.send_header("Content-Type", content_type or "application/octet-stream")
+            request.send_header("Content-Length", str(end - start + 1))
+            request.end_headers()
+            request.wfile.flush()
+            # sendfile(2) where available: the bytes never pass through Python
+            if end >= start:
+                request.connection.sendfile(f, start, end - start + 1)
+        with self.lock:
+            self.stats["served_bytes"] += end - start + 1
+
+    def serve(self, bind="0.0.0.0", port=MIRROR_PORT):
+        """Build (but don't start) a threaded HTTP server for this mirror"""
+        mirror = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, which both download backends rely on
+            server_version = "CTLauncherMirror/1.0"
+
+            def do_GET(self):
+                try:
+                    mirror.handle(self)
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True
+
+            def log_message(self, format, *args):
+                pass
+
+        return MirrorServer((bind, port), Handler)
+
+
+def file_stamp(path):
+    """(size, mtime_ns) of a file, or None if it is missing"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+class Installer:
+    """Downloads, verifies and prepares versions; no Tk dependency so it also runs headless"""
+
+    def __init__(self, status_callback=None, progress_callback=None, workers=DOWNLOAD_WORKERS,
+                 backend=DOWNLOAD_BACKEND):
+        self.status_callback = status_callback or (lambda text: None)
+        # progress_callback(snapshot) gets ProgressTracker snapshots from its ticker thread
+        self.progress = ProgressTracker(progress_callback)
+        self.workers = workers
+        self.backend = backend
+
+    def download_file(self, url: str, dest: Path, sha1=None, size=None):
+        """FIX: Download with progress reporting and optional SHA-1/size check"""
+        with path_lock(dest), TRACER.span(Path(dest).name, "file", url=url) as span:
+            # A concurrent install of another version may have fetched this file while we waited
+            if sha1 and INTEGRITY_INDEX.verify(dest, sha1, size):
+                span["source"] = "verified"
+                return True
+            # Another game dir on this host already downloaded it
+            if CONTENT_STORE.fetch(sha1, dest, size):
+                INTEGRITY_INDEX.record(dest, sha1)
+                span["source"] = "store"
+                return True
+            span.update(source="network", requests=0, bytes=0)
+            return self._download_file(url, dest, sha1, size, span)
+
+    def _download_file(self, url: str, dest: Path, sha1, size, span):
+        for attempt in range(DOWNLOAD_RETRIES):
+            resumed = False
+            try:
+                with PartFile(dest, size, self.progress) as part:
+                    resumed = part.offset > 0
+                    if not part.complete(sha1, size):
+                        span["requests"] += 1
+                        try:
+                            with HTTP_POOL.open(url, timeout=30, headers=part.range_header()) as resp:
+                                part.accept(resp.status, resp.headers.get("Content-Range"))
+                                for chunk in iter(lambda: resp.read(64 * 1024), b""):
+                                    part.write(chunk)
+                        finally:
+                            span["bytes"] += part.written
+                    digest = part.commit(sha1, size)
+                INTEGRITY_INDEX.record(dest, digest)
+                CONTENT_STORE.add(digest, dest)
+                return True
+            except Exception as e:
+                print(f"Download error: {e}", file=sys.stderr)
+                # A stale range can't be resumed; anything else keeps its .part for the next try
+                if isinstance(e, urllib.error.HTTPError) and e.code == 416:
+                    PartFile.remove(dest)
+                # A bad hash after resuming may be a corrupt local prefix, so start over once
+                if not (retryable(e) or resumed) or attempt == DOWNLOAD_RETRIES - 1:
+                    return False
+                time.sleep(attempt + 1)
+
+    def download_many(self, jobs, label, workers=None):
+        """Download (url, dest, sha1, size) jobs concurrently, return the jobs that failed
+
+        Jobs start in the order given, so callers pass them largest first (plan_install does).
+        Progress goes through the ProgressTracker rather than a callback per file or chunk.
+        """
+        total = len(jobs)
+        if not total:
+            return []
+        workers = max(1, min(workers or self.workers, total))
+        self.status_callback(f"Downloading {label}...")
+        self.progress.begin(label, total, sum(job[3] or 0 for job in jobs))
+        try:
+            # The asyncio backend speaks HTTP itself, so proxied setups stay on urllib threads
+            if self.backend == "asyncio" and not urllib.request.getproxies():
+                def on_done(job, ok):
+                    self.progress.file_done(job[1], job[3])
+
+                return AsyncDownloader(workers, progress=self.progress).run(jobs, on_done)
+
+            failed = []
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(self.download_file, *job): job for job in jobs}
+                for future in as_completed(futures):
+                    job = futures[future]
+                    self.progress.file_done(job[1], job[3])
+                    if not future.result():
+                        failed.append(job)
+            return failed
+        finally:
+            self.progress.end()
+
+    def library_downloads(self, version_json):
+        """(url, path, sha1, size) for every library/natives file this OS needs, plus the natives jobs"""
+        libs_dir = GAME_DIR / "libraries"
+        os_name = get_os_name()
+        downloads = []
+        natives = []
+
+        for lib in version_json["libraries"]:
+            # FIX: Properly check rules
+            if "rules" in lib and not check_rules(lib["rules"]):
+                continue
+            if "downloads" not in lib:
+                continue
+
+            # Standard artifact
+            if "artifact" in lib["downloads"]:
+                artifact = lib["downloads"]["artifact"]
+                downloads.append((artifact["url"], libs_dir / artifact["path"], artifact.get("sha1"), artifact.get("size")))
+
+            # FIX: Natives handling with proper OS detection
+            if "natives" in lib:
+                # Handle arch substitution
+                native_key = lib["natives"].get(os_name, "")
+                if "${arch}" in native_key:
+                    native_key = native_key.replace("${arch}", "64" if get_arch() in ("x64", "arm64") else "32")
+
+                if native_key and "classifiers" in lib["downloads"]:
+                    native = lib["downloads"]["classifiers"].get(native_key)
+                    if native:
+                        job = (native["url"], libs_dir / native["path"], native.get("sha1"), native.get("size"))
+                        downloads.append(job)
+                        natives.append(job)
+
+        return downloads, natives
+
+    def extract_natives(self, natives, natives_dir: Path, force=()):
+        """Extract natives jars that changed since the last run, in parallel, tracked in .extracted.json
+
+        force: jar paths (str) to extract again even if they look unchanged, e.g. just repaired.
+        """
+        manifest_path = natives_dir / ".extracted.json"
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+
+        def jar_id(path, sha1):
+            # Fall back to size/mtime when the version JSON carries no hash
+            return sha1 or file_stamp(path)
+
+        changed = []
+        for _, jar_path, sha1, _ in natives:
+            entry = manifest.get(str(jar_path))
+            if (str(jar_path) not in force and entry and entry["sha1"] == jar_id(jar_path, sha1)
+                    and all((natives_dir / name).exists() for name in entry["files"])):
+                continue
+            changed.append((jar_path, sha1))
+        if not changed:
+            return
+
+        root = natives_dir.resolve()
+
+        def extract(jar_path):
+            files = []
+            try:
+                with zipfile.ZipFile(jar_path, "r") as z:
+                    for info in z.infolist():
+                        name = info.filename
+                        # Skip META-INF and directories
+                        if name.startswith("META-INF/") or info.is_dir():
+                            continue
+                        # Extract native libraries
+                        if not (name.endswith((".so", ".dll", ".dylib", ".jnilib")) or "/" not in name):
+                            continue
+                        target = (natives_dir / name).resolve()
+                        if root not in target.parents:
+                            continue  # refuse paths escaping natives_dir
+                        target.parent.mkdir(parents=True, exist_ok=True)
+                        # Large buffer: zipfile's default copy size makes big .so files slow
+                        with z.open(info) as src, open(target, "wb") as dst:
+                            shutil.copyfileobj(src, dst, 1024 * 1024)
+                        files.append(name)
+            except (zipfile.BadZipFile, OSError) as e:
+                print(f"Natives extraction failed for {jar_path.name}: {e}", file=sys.stderr)
+                return None
+            return files
+
+        self.status_callback(f"Extracting natives ({len(changed)} jars)...")
+        with ThreadPoolExecutor(max_workers=min(len(changed), os.cpu_count() or 1)) as pool:
+            results = list(pool.map(extract, [jar_path for jar_path, _ in changed]))
+
+        for (jar_path, sha1), files in zip(changed, results):
+            if files is None:
+                manifest.pop(str(jar_path), None)
+                continue
+            # Drop files the previous version of this jar produced but the new one doesn't
+            old = manifest.get(str(jar_path), {}).get("files", [])
+            for name in set(old) - set(files):
+                try:
+                    (natives_dir / name).unlink()
+                except OSError:
+                    pass
+            manifest[str(jar_path)] = {"sha1": jar_id(jar_path, sha1), "files": files}
+
+        tmp = manifest_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp, manifest_path)
+
+    def asset_downloads(self, asset_index):
+        """(url, path, sha1, size) for every distinct object in a parsed asset index"""
+        objects_dir = GAME_DIR / "assets" / "objects"
+        
+        # Objects are content-addressed, so one download covers every name sharing a hash
+        jobs = {}
+        for info in asset_index.get("objects", {}).values():
+            hash_val = info["hash"]
+            if hash_val in jobs:
+                continue
+            prefix = hash_val[:2]
+            jobs[hash_val] = (f"{RESOURCES_URL}/{prefix}/{hash_val}", objects_dir / prefix / hash_val, hash_val, info.get("size"))
+        return list(jobs.values())
+
+    @staticmethod
+    def has_asset(job):
+        # Objects are named by their SHA-1; each is hashed once, then trusted while size and mtime hold
+        return INTEGRITY_INDEX.verify(job[1], job[2], job[3])
+
+    def missing_assets(self, index_path: Path):
+        """Download jobs for asset objects that are absent or fail their size/SHA-1 check"""
+        with open(index_path) as f:
+            asset_index = json.load(f)
+        return [job for job in self.asset_downloads(asset_index) if not self.has_asset(job)]
+
+    def verify_version(self, version_id: str):
+        """Check an installed version against its version JSON without downloading; return broken paths"""
+        version_dir = GAME_DIR / "versions" / version_id
+        version_json_path = version_dir / f"{version_id}.json"
+        try:
+            with open(version_json_path) as f:
+                version_json = json.load(f)
+        except (OSError, ValueError):
+            return [str(version_json_path)]
+
+        client = version_json["downloads"]["client"]
+        asset_index = version_json["assetIndex"]
+        index_path = GAME_DIR / "assets" / "indexes" / f"{asset_index['id']}.json"
+        checks = [(None, version_dir / f"{version_id}.jar", client.get("sha1"), client.get("size")),
+                  (None, index_path, asset_index.get("sha1"), asset_index.get("size"))]
+        checks += self.library_downloads(version_json)[0]
+
+        try:
+            problems = [str(path) for _, path, sha1, size in checks if not INTEGRITY_INDEX.verify(path, sha1, size)]
+            if str(index_path) not in problems:
+                problems += [str(job[1]) for job in self.missing_assets(index_path)]
+        finally:
+            INTEGRITY_INDEX.save()
+        return problems
+
+    def classpath_files(self, version_id, version_json):
+        """(url, path, sha1, size) for everything the game loads code from: client jar, libraries, natives jars"""
+        client = version_json["downloads"]["client"]
+        jar = (client["url"], GAME_DIR / "versions" / version_id / f"{version_id}.jar", client.get("sha1"), client.get("size"))
+        return [jar] + self.library_downloads(version_json)[0]
+
+    def check_classpath(self, version_id, version_json, mode=LAUNCH_VERIFY):
+        """Pre-launch check of the client jar and libraries; broken or missing ones are re-downloaded in one batch
+
+        "quick" compares sizes with the version JSON; "full" re-hashes everything (SHA-1) on all cores.
+        Raises RuntimeError naming whatever could not be repaired, so a bad install fails here instead of
+        as a ClassNotFoundException after a JVM start.
+        """
+        files = self.classpath_files(version_id, version_json)
+        full = mode == "full"
+
+        def intact(job):
+            return INTEGRITY_INDEX.verify(job[1], job[2] if full else None, job[3], rehash=full)
+
+        with self.phase("verify_classpath", mode=mode, files=len(files)) as span:
+            if full:
+                self.status_callback(f"Verifying {len(files)} files...")
+                # hashlib drops the GIL while hashing, so threads spread over the cores
+                with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as pool:
+                    results = list(pool.map(intact, files))
+            else:
+                results = [intact(job) for job in files]
+            broken = sorted((job for job, ok in zip(files, results) if not ok), key=lambda job: job[3] or 0, reverse=True)
+            span["broken"] = len(broken)
+        if not broken:
+            return
+        print(f"Repairing {len(broken)} broken or missing files: "
+              f"{', '.join(Path(job[1]).name for job in broken[:5])}{' ...' if len(broken) > 5 else ''}", file=sys.stderr)
+        with self.phase("repair_classpath", files=len(broken)):
+            failed = self.download_many(broken, "repairs")
+        INTEGRITY_INDEX.save()
+        # The extracted .so/.dll files came from the broken jar, so a repaired natives jar is unpacked again
+        repaired = {str(job[1]) for job in broken} - {str(job[1]) for job in failed}
+        natives = [job for job in self.library_downloads(version_json)[1] if str(job[1]) in repaired]
+        if natives:
+            natives_dir = GAME_DIR / "versions" / version_id / "natives"
+            natives_dir.mkdir(parents=True, exist_ok=True)
+            with self.phase("natives", jars=len(natives)):
+                self.extract_natives(natives, natives_dir, force=repaired)
+        if failed:
+            raise RuntimeError(f"{len(failed)} game files are missing or corrupt and could not be re-downloaded:\n"
+                               + "\n".join(str(job[1]) for job in failed[:10]))
+
+    def setup_version(self, version_id: str):
+        """Download and setup a Minecraft version"""
+        try:
+            with self.phase("setup_version", version=version_id) as span:
+                try:
+                    return self._setup_version(version_id)
+                finally:
+                    # Connection reuse goes in the trace rather than on stderr
+                    stats = HTTP_POOL.stats()
+                    span.update(connections_opened=stats["opened"], connections_reused=stats["reused"])
+        finally:
+            # Persist hashes even if the install failed part way through
+            INTEGRITY_INDEX.save()
+
+    @contextmanager
+    def phase(self, name, **args):
+        """Trace span for one pipeline phase, with the bytes and HTTP requests it cost
+
+        Requests are counted on the shared pool, so concurrent installs see each other's.
+        """
+        received, requests = self.progress.received, HTTP_POOL.requests()
+        with TRACER.span(name, **args) as span:
+            try:
+                yield span
+            finally:
+                span["bytes"] = span.get("bytes", 0) + self.progress.received - received
+                span["requests"] = HTTP_POOL.requests() - requests
+
+    def fetch_version_json(self, version_id: str):
+        """Version JSON for version_id from Mojang; the manifest comes from the shared cache"""
+        # Get version manifest (shared cache, usually no network round trip)
+        with self.phase("manifest"):
+            manifest = MANIFEST_CACHE.get()
+        
+        # FIX: Handle version not found
+        version_url = None
+        for v in manifest["versions"]:
+            if v["id"] == version_id:
+                version_url = v["url"]
+                break
+        
+        if not version_url:
+            raise ValueError(f"Version {version_id} not found in manifest")
+        
+        with self.phase("version_json") as span:
+            with HTTP_POOL.open(version_url, timeout=10) as resp:
+                body = resp.read()
+            span["bytes"] = len(body)
+            return json.loads(body.decode())
+
+    def plan_install(self, version_id, version_json, save_index=True):
+        """Work out every file installing version_id still needs before any of them is fetched
+
+        Each file is either present (verified on disk), in the shared store (a link away) or
+        has to come over the network; the download lists are sorted largest first. The asset
+        index is needed to plan at all, so it is fetched here; save_index=False keeps it in
+        memory for a dry run.
+        """
+        asset_index = version_json["assetIndex"]
+        index_path = GAME_DIR / "assets" / "indexes" / f"{asset_index['id']}.json"
+        with self.phase("asset_index") as span:
+            if INTEGRITY_INDEX.verify(index_path, asset_index.get("sha1"), asset_index.get("size")):
+                with open(index_path, "rb") as f:
+                    body = f.read()
+            elif save_index:
+                self.status_callback("Downloading asset index...")
+                index_path.parent.mkdir(parents=True, exist_ok=True)
+                if not self.download_file(asset_index["url"], index_path, asset_index.get("sha1")):
+                    raise RuntimeError("Failed to download asset index")
+                with open(index_path, "rb") as f:
+                    body = f.read()
+            else:
+                with HTTP_POOL.open(asset_index["url"], timeout=30) as resp:
+                    body = resp.read()
+                span["bytes"] = len(body)
+                if asset_index.get("sha1") and hashlib.sha1(body).hexdigest() != asset_index["sha1"]:
+                    raise RuntimeError("Asset index failed its SHA-1 check")
+
+        with self.phase("plan") as span:
+            # The same jar can be listed twice (artifact and natives), so key by path
+            game_files = {job[1]: job for job in self.classpath_files(version_id, version_json)}
+            plan = {"version": version_id, "game_files": [], "assets": [], "present": [],
+                    "download_files": 0, "download_bytes": 0, "store_files": 0, "store_bytes": 0,
+                    "present_files": 0, "present_bytes": 0}
+            for kind, jobs, present in (
+                    ("game_files", game_files.values(), lambda job: INTEGRITY_INDEX.verify(job[1], job[2], job[3])),
+                    ("assets", self.asset_downloads(json.loads(body)), self.has_asset)):
+                for job in jobs:
+                    if present(job):
+                        source = "present"
+                        plan["present"].append(job)
+                    else:
+                        source = "store" if CONTENT_STORE.has(job[2], job[3]) else "download"
+                        plan[kind].append(job)
+                    plan[f"{source}_files"] += 1
+                    plan[f"{source}_bytes"] += job[3] or 0
+            # Largest first: a big jar started last would otherwise finish alone after every worker went idle
+            for kind in ("game_files", "assets"):
+                plan[kind].sort(key=lambda job: job[3] or 0, reverse=True)
+            span.update((key, plan[key]) for key in ("download_files", "download_bytes", "store_files", "present_files"))
+        return plan
+
+    def _setup_version(self, version_id: str):
+        version_dir = GAME_DIR / "versions" / version_id
+        version_dir.mkdir(parents=True, exist_ok=True)
+
+        version_json = self.fetch_version_json(version_id)
+        with open(version_dir / f"{version_id}.json", "w") as f:
+            json.dump(version_json, f, indent=2)
 
-# SSL workaround for macOS/proxy issues
-ssl._create_default_https_context = ssl._create_unverified_context
+        plan = self.plan_install(version_id, version_json)
+        self.status_callback(describe_install_plan(plan))
+        # Every progress line from here on shows "done/planned MB" for the whole install
+        self.progress.plan(plan["download_bytes"] + plan["store_bytes"])
+        try:
+            return self._install_planned(version_id, version_json, plan)
+        finally:
+            self.progress.plan(0)
 
-GAME_DIR = Path.home() / ".minecraft"
-SKIN_SERVER = "https://mc-heads.net"
+    def _install_planned(self, version_id, version_json, plan):
+        version_dir = GAME_DIR / "versions" / version_id
 
-# FIX: Cross-platform classpath separator
-CLASSPATH_SEP = ";" if sys.platform == "win32" else ":"
+        # Seed the shared store from libraries this game dir already has
+        libs_dir = GAME_DIR / "libraries"
+        for _, path, sha1, _ in plan["present"]:
+            if libs_dir in path.parents:
+                CONTENT_STORE.add(sha1, path)
+        for _, path, _, _ in plan["game_files"] + plan["assets"]:
+            path.parent.mkdir(parents=True, exist_ok=True)
 
-# FIX: Auto-detect Java path
-def find_java():
-    """Find Java executable, preferring Java 17+"""
-    candidates = []
-    if sys.platform == "darwin":
-        candidates = [
-            "/opt/homebrew/opt/openjdk@17/bin/java",
-            "/opt/homebrew/opt/openjdk/bin/java",
-            "/usr/local/opt/openjdk@17/bin/java",
-            "/Library/Java/JavaVirtualMachines/temurin-17.jdk/Contents/Home/bin/java",
-        ]
-    elif sys.platform == "win32":
-        candidates = [
-            Path(os.environ.get("JAVA_HOME", "")) / "bin" / "java.exe",
-            Path(os.environ.get("PROGRAMFILES", "")) / "Java" / "jdk-17" / "bin" / "java.exe",
-            Path(os.environ.get("PROGRAMFILES", "")) / "Eclipse Adoptium" / "jdk-17" / "bin" / "java.exe",
-        ]
-    else:  # Linux
-        candidates = [
-            "/usr/lib/jvm/java-17-openjdk/bin/java",
-            "/usr/lib/jvm/java-17-openjdk-amd64/bin/java",
-        ]
-    
-    for path in candidates:
-        if Path(path).exists():
-            return str(path)
-    
-    # Fallback to PATH
-    return "java"
+        # Client jar, libraries and natives jars in one largest-first batch
+        with self.phase("game_files", files=len(plan["game_files"])):
+            failed = self.download_many(plan["game_files"], "Game files")
+            if failed:
+                names = ", ".join(job[1].name for job in failed[:5])
+                raise RuntimeError(f"Failed to download {len(failed)} game files: {names}")
 
-JAVA_BIN = find_java()
+        natives_dir = version_dir / "natives"
+        natives_dir.mkdir(parents=True, exist_ok=True)
+        natives = self.library_downloads(version_json)[1]
+        with self.phase("natives", jars=len(natives)):
+            self.extract_natives(natives, natives_dir)
 
+        with self.phase("assets", files=len(plan["assets"])):
+            failed = self.download_many(plan["assets"], "Assets", workers=ASSET_WORKERS)
+            if failed:
+                raise RuntimeError(f"Failed to download {len(failed)} of {len(plan['assets'])} assets")
 
-def get_os_name():
-    """FIX: Get correct OS name for Minecraft library rules"""
-    if sys.platform == "win32":
-        return "windows"
-    elif sys.platform == "darwin":
-        return "osx"
-    else:
-        return "linux"
+        self.status_callback("Ready to launch!")
+        return version_json
 
+    def load_launch_plan(self, version):
+        """Return the cached launch plan for version if none of its inputs changed"""
+        plan_path = GAME_DIR / "versions" / version / "launch_plan.json"
+        try:
+            with open(plan_path) as f:
+                plan = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if plan.get("format") != LAUNCH_PLAN_FORMAT:
+            return None
+        for path, stamp in plan["inputs"]:
+            if file_stamp(path) != stamp:
+                return None
+        return plan
 
-def get_arch():
-    """Get system architecture"""
-    machine = platform.machine().lower()
-    if machine in ("x86_64", "amd64"):
-        return "x64"
-    elif machine in ("aarch64", "arm64"):
-        return "arm64"
-    elif machine in ("i386", "i686", "x86"):
-        return "x86"
-    return machine
+    def build_launch_plan(self, version, version_json):
+        """Resolve classpath and arguments for version and cache them in versions/<id>/"""
+        version_dir = GAME_DIR / "versions" / version
+        jar_path = version_dir / f"{version}.jar"
+        natives_dir = version_dir / "natives"
+        libs_dir = GAME_DIR / "libraries"
 
+        # Every file whose presence or contents affect the plan; missing ones are recorded too
+        inputs = [version_dir / f"{version}.json", jar_path]
 
-def check_rules(rules):
-    """FIX: Properly evaluate Minecraft library rules"""
-    if not rules:
-        return True
-    
-    os_name = get_os_name()
-    arch = get_arch()
-    
-    # Default: disallow unless explicitly allowed
-    allowed = False
-    
-    for rule in rules:
-        action = rule.get("action", "allow")
-        matches = True
+        # FIX: Build classpath with proper rule checking
+        classpath_parts = []
+        for lib in version_json["libraries"]:
+            if "rules" in lib and not check_rules(lib["rules"]):
+                continue
+            if "downloads" in lib and "artifact" in lib["downloads"]:
+                lib_path = libs_dir / lib["downloads"]["artifact"]["path"]
+                inputs.append(lib_path)
+                if lib_path.exists():
+                    classpath_parts.append(str(lib_path))
         
-        if "os" in rule:
-            os_rule = rule["os"]
-            if "name" in os_rule and os_rule["name"] != os_name:
-                matches = False
-            if "arch" in os_rule and os_rule["arch"] != arch:
-                matches = False
+        # Add main JAR last (some versions need this order)
+        classpath_parts.append(str(jar_path))
+
+        plan = {
+            "format": LAUNCH_PLAN_FORMAT,
+            "inputs": [[str(path), file_stamp(path)] for path in inputs],
+            # FIX: Get main class from version JSON
+            "main_class": version_json.get("mainClass", "net.minecraft.client.main.Main"),
+            # Versions before javaVersion was added to the JSON all run on Java 8
+            "java_major": version_json.get("javaVersion", {}).get("majorVersion", 8),
+            "jvm_args": [
+                f"-Djava.library.path={natives_dir.resolve()}",
+                "-Dminecraft.launcher.brand=CTLauncher",
+                "-Dminecraft.launcher.version=1.0",
+                # FIX: Use platform-appropriate separator
+                "-cp", CLASSPATH_SEP.join(classpath_parts),
+            ],
+            "game_args": [
+                "--username", "${auth_player_name}",
+                "--uuid", "${auth_uuid}",
+                "--accessToken", "0",
+                "--userType", "legacy",
+                "--version", version,
+                "--gameDir", str(GAME_DIR.resolve()),
+                "--assetsDir", str((GAME_DIR / "assets").resolve()),
+                "--assetIndex", version_json["assetIndex"]["id"],
+            ],
+        }
         
-        if matches:
-            allowed = (action == "allow")
-    
-    return allowed
+        # Add version type if present
+        if "type" in version_json:
+            plan["game_args"].extend(["--versionType", version_json["type"]])
+
+        plan_path = version_dir / "launch_plan.json"
+        tmp = plan_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(plan, f)
+        os.replace(tmp, plan_path)
+        return plan
+
+    def prepare_launch(self, version, verify=LAUNCH_VERIFY):
+        """Return a launch plan for version, installing, checking and repairing it first if needed
+
+        A cached plan is only written after its files passed check_classpath and is dropped when any of
+        them changes, so a warm "quick" launch needs no check at all; "full" re-hashes every time.
+        """
+        version_dir = GAME_DIR / "versions" / version
+        jar_path = version_dir / f"{version}.jar"
+        version_json_path = version_dir / f"{version}.json"
+
+        # Warm launches reuse the cached plan; anything changed rebuilds it
+        with self.phase("load_launch_plan") as span:
+            plan = self.load_launch_plan(version)
+            span["hit"] = plan is not None
+        if plan is not None and verify != "full":
+            return plan
+        # Auto-download everything if missing
+        if not jar_path.exists() or not version_json_path.exists():
+            self.status_callback("Downloading game files...")
+            version_json = self.setup_version(version)
+        else:
+            with open(version_json_path) as f:
+                version_json = json.load(f)
+        self.check_classpath(version, version_json, verify)
+        # A full check that repaired something has changed the inputs, which load_launch_plan notices
+        plan = self.load_launch_plan(version)
+        if plan is None:
+            with self.phase("build_launch_plan"):
+                plan = self.build_launch_plan(version, version_json)
+        return plan
+
+
+def build_launch_args(plan, username, ram_gb, game_dir=None, profile=JVM_PROFILE, cpus=None, extra_jvm_args=()):
+    """Fill a launch plan in with the player, heap size and JVM profile to get the final command line
+
+    game_dir points saves/options/logs elsewhere; versions, libraries and assets stay shared.
+    cpus is how many cores the game may use, for sizing GC threads (default: all available).
+    extra_jvm_args go in after the tuning flags (e.g. CDS_ARCHIVES.args()).
+    """
+    player_uuid = str(uuid.uuid3(uuid.NAMESPACE_DNS, f"OfflinePlayer:{username}"))
+    game_args = [arg.replace("${auth_player_name}", username).replace("${auth_uuid}", player_uuid)
+                 for arg in plan["game_args"]]
+    if game_dir is not None:
+        game_args[game_args.index("--gameDir") + 1] = str(Path(game_dir).resolve())
+    java = java_for(plan.get("java_major"))
+    return [java, *jvm_tuning_args(profile, ram_gb, java, cpus), *extra_jvm_args, *plan["jvm_args"],
+            plan["main_class"], *game_args]
+
+
+class GameLog:
+    """Drains a game's output pipe into a bounded ring buffer and rotated log files
+
+    The reader thread only reads big chunks, splits them and appends, so the game never
+    blocks on a full pipe; the UI collects whatever arrived since its last look with drain().
+    """
+
+    LEVELS = ("TRACE", "DEBUG", "INFO", "WARN", "ERROR", "FATAL")
+    LEVEL_RE = re.compile(rb"/(TRACE|DEBUG|INFO|WARN|ERROR|FATAL)\]")
+
+    def __init__(self, name, lines=LOG_RING_LINES, watch=None, on_watch=None, echo=None):
+        """watch: bytes regex; on_watch(text) is called from the reader thread for the first line matching it
+
+        echo: binary stream that also gets the raw output, e.g. sys.stderr.buffer for the headless mode.
+        """
+        self.lock = threading.Lock()
+        self.watch = watch
+        self.on_watch = on_watch
+        self.echo = echo
+        self.ring = deque(maxlen=lines)  # (level index, text) for every recent line
+        self.pending = deque(maxlen=lines)  # lines not yet taken by drain()
+        self.level = self.LEVELS.index("INFO")
+        safe = "".join(c if c.isalnum() or c in ".-_" else "_" for c in name)
+        self.path = GAME_DIR / "logs" / "launcher" / f"{safe}.log"
+        self.file = None
+        self.done = threading.Event()
+
+    def attach(self, stream):
+        """Start reading a binary, unbuffered pipe (Popen(..., stdout=PIPE, bufsize=0))"""
+        threading.Thread(target=self._read, args=(stream,), daemon=True, name="game log").start()
+
+    def _read(self, stream):
+        fd = stream.fileno()
+        tail = b""
+        self._open()
+        try:
+            while True:
+                chunk = os.read(fd, LOG_CHUNK)
+                if not chunk:
+                    break
+                self._write(chunk)
+                if self.echo:
+                    try:
+                        self.echo.write(chunk)
+                        self.echo.flush()
+                    except (OSError, ValueError):
+                        self.echo = None
+                *lines, tail = (tail + chunk).split(b"\n")
+                # A runaway line without newlines is cut rather than held forever
+                if len(tail) > LOG_CHUNK:
+                    lines.append(tail)
+                    tail = b""
+                if lines:
+                    self._add(lines)
+            if tail:
+                self._add([tail])
+        except OSError:
+            pass
+        finally:
+            stream.close()
+            if self.file:
+                self.file.close()
+            self.done.set()
+
+    def _add(self, lines):
+        batch = []
+        for raw in lines:
+            match = self.LEVEL_RE.search(raw, 0, 200)
+            # Untagged lines (stack traces, JVM output) belong with the line above
+            if match:
+                self.level = self.LEVELS.index(match.group(1).decode())
+            if self.watch and self.watch.search(raw):
+                self.watch = None
+                if self.on_watch:
+                    self.on_watch(raw.decode("utf-8", "replace"))
+            batch.append((self.level, raw.rstrip(b"\r").decode("utf-8", "replace")))
+        with self.lock:
+            self.ring.extend(batch)
+            self.pending.extend(batch)
+
+    def _rotate(self):
+        for n in range(LOG_KEEP - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.stem}.{n}.log")
+            if older.exists():
+                os.replace(older, self.path.with_name(f"{self.path.stem}.{n + 1}.log"))
+        if self.path.exists():
+            os.replace(self.path, self.path.with_name(f"{self.path.stem}.1.log"))
+
+    def _open(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._rotate()
+            self.file = open(self.path, "wb")
+        except OSError as e:
+            print(f"Game log file disabled: {e}", file=sys.stderr)
+            self.file = None
+
+    def _write(self, chunk):
+        if not self.file:
+            return
+        try:
+            self.file.write(chunk)
+            if self.file.tell() > LOG_FILE_MAX:
+                self.file.close()
+                self._open()
+        except OSError as e:
+            # A full disk costs us the log file, never the game
+            print(f"Game log file disabled: {e}", file=sys.stderr)
+            self.file = None
+
+    def drain(self):
+        """Lines that arrived since the last drain()/lines() call"""
+        with self.lock:
+            batch = list(self.pending)
+            self.pending.clear()
+        return batch
+
+    def lines(self):
+        """Everything still in the ring buffer; also marks it all as drained"""
+        with self.lock:
+            self.pending.clear()
+            return list(self.ring)
+
+
+def parse_cpus(spec):
+    """'0-3,6' -> {0, 1, 2, 3, 6}; raises ValueError for anything else"""
+    cpus = set()
+    for part in spec.split(","):
+        first, _, last = part.strip().partition("-")
+        try:
+            first, last = int(first), int(last or first)
+        except ValueError:
+            first, last = -1, -1
+        if first < 0 or last < first:
+            raise ValueError(f"Invalid CPU set {spec!r} (expected a list like 0-3,6)")
+        cpus.update(range(first, last + 1))
+    return cpus
+
+
+class SupervisedInstance:
+    """One offline client run by a LaunchSupervisor, and what it is doing now"""
+
+    def __init__(self, index, username, game_dir, ram_gb, cpus=None):
+        self.index = index
+        self.username = username
+        self.game_dir = Path(game_dir)
+        self.ram_gb = ram_gb
+        self.cpus = cpus
+        self.state = "waiting"
+        self.pid = None
+        self.code = None
+        self.restarts = 0
+        self.started = None
+
+    def status(self):
+        return {
+            "index": self.index, "username": self.username, "state": self.state, "pid": self.pid,
+            "code": self.code, "restarts": self.restarts, "game_dir": str(self.game_dir),
+            "uptime": round(time.monotonic() - self.started, 1) if self.started and self.state == "running" else None,
+        }
+
+
+class LaunchSupervisor:
+    """Starts many offline clients of one installed version and watches them from one asyncio loop
+
+    Instances start LAUNCH_STAGGER seconds apart. One that exits non-zero is restarted up to
+    `restarts` times with exponential backoff; a clean exit (the window was closed) is final.
+    Game output goes straight from the child to <instance dir>/logs/launcher-output.log.
+    report(status_dict) is called on every state change.
+    """
+
+    def __init__(self, plan, instances, stagger=LAUNCH_STAGGER, restarts=0, report=None, profile=JVM_PROFILE,
+                 version=None):
+        self.plan = plan
+        self.profile = profile
+        # A ready AppCDS archive is mapped by every instance (shared pages); instances never train one
+        self.cds_args = []
+        if version:
+            self.cds_args = CDS_ARCHIVES.args(version, plan, java_for(plan.get("java_major")), train=False)[0]
+        self.instances = instances
+        self.stagger = stagger
+        self.restarts = restarts
+        self.report = report or (lambda status: None)
+
+    def _set(self, inst, state, **changes):
+        inst.state = state
+        for name, value in changes.items():
+            setattr(inst, name, value)
+        self.report(inst.status())
+
+    async def _spawn(self, inst):
+        log_dir = inst.game_dir / "logs"
+        log_dir.mkdir(parents=True, exist_ok=True)
+        # The profile probes Java with a subprocess the first time, so keep it off the loop
+        args = await asyncio.to_thread(build_launch_args, self.plan, inst.username, inst.ram_gb, inst.game_dir,
+                                       self.profile, len(inst.cpus) if inst.cpus else None, self.cds_args)
+        preexec = None
+        if inst.cpus and hasattr(os, "sched_setaffinity"):
+            # Pinned in the child before exec so every JVM thread inherits the mask
+            preexec = lambda cpus=inst.cpus: os.sched_setaffinity(0, cpus)
+        with open(log_dir / "launcher-output.log", "ab") as out:
+            out.write(f"--- {time.strftime('%Y-%m-%d %H:%M:%S')} start #{inst.restarts + 1} ---\n".encode())
+            out.flush()
+            return await asyncio.create_subprocess_exec(
+                *args, cwd=str(inst.game_dir), stdin=subprocess.DEVNULL, stdout=out,
+                stderr=subprocess.STDOUT, preexec_fn=preexec)
+
+    async def _run(self, inst, delay):
+        process = None
+        try:
+            await asyncio.sleep(delay)
+            while True:
+                self._set(inst, "starting", code=None)
+                try:
+                    process = await self._spawn(inst)
+                except (OSError, subprocess.SubprocessError) as e:
+                    # SubprocessError: preexec_fn failed in the child, e.g. pinning to a CPU that is offline
+                    self._set(inst, "failed", pid=None, code=None)
+                    print(f"{inst.username}: could not start: {e}", file=sys.stderr)
+                    return
+                self._set(inst, "running", pid=process.pid, started=time.monotonic())
+                code = await process.wait()
+                process = None
+                if code == 0:
+                    self._set(inst, "exited", code=code)
+                    return
+                if inst.restarts >= self.restarts:
+                    self._set(inst, "failed", code=code)
+                    return
+                self._set(inst, "restarting", code=code)
+                await asyncio.sleep(min(RESTART_BACKOFF * 2 ** inst.restarts, RESTART_BACKOFF_MAX))
+                inst.restarts += 1
+        except asyncio.CancelledError:
+            # Stopping: give the game a chance to save before it is killed
+            if process is not None and process.returncode is None:
+                process.terminate()
+                try:
+                    await asyncio.wait_for(process.wait(), STOP_GRACE)
+                except asyncio.TimeoutError:
+                    process.kill()
+                    await process.wait()
+            self._set(inst, "stopped", code=process.returncode if process else inst.code)
+            raise
+
+    async def run(self):
+        """Run every instance to completion; cancelling this stops them all"""
+        await asyncio.gather(*(self._run(inst, n * self.stagger) for n, inst in enumerate(self.instances)))
+        return [inst.status() for inst in self.instances]
+
+
+class SkinCache:
+    """On-disk cache of skin head PNGs fetched by a single background worker"""
+
+    NAME_RE = re.compile(r"^[A-Za-z0-9_]{1,16}$")
+
+    def __init__(self, ttl=SKIN_CACHE_TTL):
+        self.ttl = ttl
+        self.requests = queue.Queue()
+        self.worker = None
+        self.lock = threading.Lock()
+
+    def _path(self, username):
+        return GAME_DIR / "cache" / "skins" / f"{username.lower()}.png"
+
+    def get(self, username):
+        """Return the head PNG bytes for username, or None if there is none to show"""
+        if not self.NAME_RE.match(username):
+            return None
+        path = self._path(username)
+        try:
+            if time.time() - path.stat().st_mtime < self.ttl:
+                return path.read_bytes()
+        except OSError:
+            pass
+
+        try:
+            with HTTP_POOL.open(f"{SKIN_SERVER}/head/{username}/128.png", timeout=5) as resp:
+                data = resp.read()
+        except (OSError, http.client.HTTPException):
+            # Offline: an expired head beats no head
+            try:
+                return path.read_bytes()
+            except OSError:
+                return None
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        return data
+
+    def request(self, username, callback):
+        """Look username up on the worker thread and call callback(username, data) from it"""
+        self.requests.put((username, callback))
+        with self.lock:
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._run, daemon=True)
+                self.worker.start()
+
+    def _run(self):
+        while True:
+            username, callback = self.requests.get()
+            # Only the newest name matters once typing has moved on
+            while not self.requests.empty():
+                username, callback = self.requests.get_nowait()
+            try:
+                data = self.get(username)
+            except Exception:
+                data = None
+            callback(username, data)
+
+
+def decode_skin(data):
+    """Turn head PNG bytes into a PhotoImage; must run on the Tk thread"""
+    try:
+        from PIL import Image, ImageTk
+    except ImportError:
+        # Tk 8.6+ reads PNG natively
+        return tk.PhotoImage(data=base64.b64encode(data))
+    import io
+    img = Image.open(io.BytesIO(data))
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+    return ImageTk.PhotoImage(img)
 
 
 class CTLauncher:
@@ -122,14 +2578,24 @@ class CTLauncher:
         self.username = tk.StringVar(value="CatDev")
         self.version = tk.StringVar(value="1.20.1")
         self.ram = tk.IntVar(value=4)
+        self.jvm_profile = tk.StringVar(value=JVM_PROFILE)
+        self.java_ready = False  # Set once the Java probe thread is done; previews wait for it
+        self.installer = Installer(self.set_status_async, self.set_progress_async)
         
         # FIX: Skin preview debounce timer
         self.skin_timer = None
         self.skin_photo = None  # Keep reference to prevent GC
+        self.skin_cache = SkinCache()
+        self.skin_images = OrderedDict()  # lowercased name -> PhotoImage, least recently shown first
+        self.game_log = None  # GameLog of the most recent launch
+        self.log_window = None
+        self.log_level = tk.StringVar(value="INFO")
 
         self.setup_theme()
         self.build_ui()
         self.load_versions()
+        # Probe for Java off the Tk thread so it's resolved by the time Play is pressed
+        threading.Thread(target=self.probe_java, daemon=True).start()
         
         # FIX: Initial skin load after UI is built
         self.root.after(500, self.update_skin_preview)
@@ -200,6 +2666,18 @@ class CTLauncher:
         self.ram_label = ttk.Label(settings_frame, text="4 GB")
         self.ram_label.pack(pady=5)
 
+        ttk.Label(settings_frame, text="JVM Profile").pack(anchor="w", pady=(10, 0))
+        profile_combo = ttk.Combobox(settings_frame, textvariable=self.jvm_profile, values=JVM_PROFILES,
+                                     state="readonly", width=25)
+        profile_combo.pack(pady=5)
+        profile_combo.bind("<<ComboboxSelected>>", lambda e: self.update_jvm_preview())
+        self.jvm_label = ttk.Label(settings_frame, text="Detecting Java...", foreground="#888888",
+                                   font=("Consolas", 8), wraplength=300)
+        self.jvm_label.pack(anchor="w")
+        tk.Button(settings_frame, text="Preview command", font=("Segoe UI", 9), fg="#bbbbbb", bg="#1e1e1e", bd=0,
+                  padx=10, pady=2, activebackground="#222222", activeforeground="#ffffff",
+                  command=self.show_command_preview).pack(anchor="w", pady=5)
+
         # Play button
         play_btn = ttk.Button(content, text="START MINECRAFT", command=self.play, style="TButton")
         play_btn.pack(pady=30, ipadx=40, ipady=15)
@@ -209,65 +2687,128 @@ class CTLauncher:
         self.status.pack(pady=5)
         self.progress = ttk.Progressbar(content, mode="determinate", length=500)
         self.progress.pack(pady=5)
+        tk.Button(content, text="Game Log", font=("Segoe UI", 10), fg="#bbbbbb", bg="#1e1e1e", bd=0,
+                  padx=12, pady=4, activebackground="#222222", activeforeground="#ffffff",
+                  command=self.show_log_panel).pack(pady=5)
 
     def update_ram_label(self, *args):
         # FIX: Convert float to int for clean display
         self.ram_label.config(text=f"{int(self.ram.get())} GB")
+        self.update_jvm_preview()
+
+    def probe_java(self):
+        """Worker thread: find Java and what it supports, then refresh the JVM preview"""
+        java = java_bin()
+        java_major(java)
+        java_accepts(java, *shenandoah_flags(java_major(java)))
+        self.root.after(0, self.java_probed)
+
+    def java_probed(self):
+        self.java_ready = True
+        self.update_jvm_preview()
+
+    def update_jvm_preview(self):
+        """Show which profile the slider/profile choice resolves to and its flags"""
+        if not self.java_ready:
+            return
+        java, ram_gb, profile = java_bin(), int(self.ram.get()), self.jvm_profile.get()
+        resolved = resolve_jvm_profile(profile, ram_gb, java)
+        self.jvm_label.config(text=f"Java {java_major(java) or '?'}, {resolved}: "
+                                   f"{' '.join(jvm_tuning_args(profile, ram_gb, java))}")
+
+    def show_command_preview(self):
+        """Window with the exact command Play would run (classpath included once the version is installed)"""
+        if not self.java_ready:
+            messagebox.showinfo("Preview", "Still detecting Java, try again in a moment.")
+            return
+        version, username = self.version.get(), self.username.get().strip() or "Player"
+        plan = self.installer.load_launch_plan(version) if version else None
+        cds_args = []
+        if plan is None:
+            # Not installed yet: show everything but the classpath, which is only known after install
+            plan = {"jvm_args": ["-cp", "<classpath after install>"], "main_class": "<main class>",
+                    "game_args": ["--username", "${auth_player_name}", "--version", version]}
+        else:
+            cds_args = CDS_ARCHIVES.args(version, plan, java_for(plan.get("java_major")), train=False)[0]
+        command = format_command(build_launch_args(plan, username, int(self.ram.get()), profile=self.jvm_profile.get(),
+                                                   extra_jvm_args=cds_args))
+
+        win = tk.Toplevel(self.root)
+        win.title(f"Launch command - {version}")
+        win.geometry("800x300")
+        text = tk.Text(win, bg="#111111", fg="#cccccc", font=("Consolas", 9), wrap="char", bd=0)
+        text.pack(fill="both", expand=True, padx=8, pady=8)
+        text.insert("1.0", command)
+        text.config(state="disabled")
 
     def schedule_skin_update(self, *args):
         """FIX: Debounce skin updates to avoid flooding requests"""
         if self.skin_timer:
             self.root.after_cancel(self.skin_timer)
+            self.skin_timer = None
+        # Names already decoded show immediately, no debounce needed
+        if self.show_cached_skin(self.username.get().strip()):
+            return
         self.skin_timer = self.root.after(500, self.update_skin_preview)
 
+    def show_cached_skin(self, username):
+        """Show username's head from the in-memory cache, if it is there"""
+        photo = self.skin_images.get(username.lower())
+        if photo is None:
+            return False
+        self.skin_images.move_to_end(username.lower())
+        self.skin_photo = photo
+        self.skin_label.config(image=photo, text="")
+        return True
+
     def update_skin_preview(self):
-        """FIX: Load skin in background thread to avoid UI freeze"""
+        """FIX: Load skin on the skin worker to avoid UI freeze"""
+        self.skin_timer = None
         username = self.username.get().strip()
         if not username:
             self.skin_label.config(text="Skin Preview", image="")
             return
-        
-        def load_skin():
+        if self.show_cached_skin(username):
+            return
+        self.skin_cache.request(username, lambda name, data: self.root.after(0, self.show_skin, name, data))
+
+    def show_skin(self, username, data):
+        """Decode a fetched head on the Tk thread, remember it and show it if still current"""
+        photo = None
+        if data:
             try:
-                # Try using PIL if available
-                try:
-                    from PIL import Image, ImageTk
-                    import io
-                except ImportError:
-                    # Fallback: just show text
-                    self.root.after(0, lambda: self.skin_label.config(text=f"[{username}]", image=""))
-                    return
-                
-                url = f"{SKIN_SERVER}/head/{username}/128.png"
-                with urllib.request.urlopen(url, timeout=5) as resp:
-                    data = resp.read()
-                
-                img = Image.open(io.BytesIO(data))
-                if img.mode != "RGBA":
-                    img = img.convert("RGBA")
-                
-                def update_ui():
-                    self.skin_photo = ImageTk.PhotoImage(img)
-                    self.skin_label.config(image=self.skin_photo, text="")
-                
-                self.root.after(0, update_ui)
-                
+                photo = decode_skin(data)
             except Exception:
-                self.root.after(0, lambda: self.skin_label.config(text=f"[{username}]", image=""))
-        
-        threading.Thread(target=load_skin, daemon=True).start()
+                photo = None
+        if photo is not None:
+            self.skin_images[username.lower()] = photo
+            self.skin_images.move_to_end(username.lower())
+            while len(self.skin_images) > SKIN_MEMORY_SLOTS:
+                self.skin_images.popitem(last=False)
+        # Typing may have moved on while this was being fetched
+        if username != self.username.get().strip():
+            return
+        if photo is None:
+            self.skin_label.config(text=f"[{username}]", image="")
+        else:
+            self.skin_photo = photo
+            self.skin_label.config(image=photo, text="")
 
     def load_versions(self):
-        """Load versions in background thread"""
+        """Show the last cached version list now and refresh it in a background thread"""
+        cached = MANIFEST_CACHE.cached()
+        if cached:
+            self.set_versions([v["id"] for v in cached["versions"] if v["type"] == "release"])
+            startup_mark("cached_versions")
+
         def load():
             try:
-                url = "https://launchermeta.mojang.com/mc/game/version_manifest_v2.json"
-                with urllib.request.urlopen(url, timeout=10) as resp:
-                    data = json.loads(resp.read().decode())
+                data = MANIFEST_CACHE.get()
                 versions = [v["id"] for v in data["versions"] if v["type"] == "release"]
                 self.root.after(0, lambda: self.set_versions(versions))
             except Exception:
-                self.root.after(0, lambda: self.set_versions(["1.21.4", "1.20.1", "1.19.4", "1.18.2"]))
+                if not cached:
+                    self.root.after(0, lambda: self.set_versions(["1.21.4", "1.20.1", "1.19.4", "1.18.2"]))
         
         threading.Thread(target=load, daemon=True).start()
     
@@ -276,162 +2817,103 @@ class CTLauncher:
         if self.version.get() not in versions and versions:
             self.version.set(versions[0])
 
-    def download_file(self, url: str, dest: Path, callback=None):
-        """FIX: Download with progress reporting"""
-        try:
-            with urllib.request.urlopen(url, timeout=30) as resp:
-                total = int(resp.headers.get('content-length', 0))
-                downloaded = 0
-                
-                with open(dest, "wb") as f:
-                    while True:
-                        chunk = resp.read(8192)
-                        if not chunk:
-                            break
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        
-                        if callback and total > 0:
-                            progress = int((downloaded / total) * 100)
-                            self.root.after(0, lambda p=progress: callback(p))
-            return True
-        except Exception as e:
-            print(f"Download error: {e}")
-            return False
+    def set_status_async(self, text):
+        """Status updates from worker threads go through the Tk event loop"""
+        self.root.after(0, lambda: self.status.config(text=text))
 
-    def setup_version(self, version_id: str, progress_callback=None):
-        """Download and setup a Minecraft version"""
-        version_dir = GAME_DIR / "versions" / version_id
-        version_dir.mkdir(parents=True, exist_ok=True)
+    def set_progress_async(self, snap):
+        """Download progress, already throttled to PROGRESS_HZ by the Installer's tracker"""
+        self.root.after(0, self.show_progress, snap)
 
-        # Get version manifest
-        manifest_url = "https://launchermeta.mojang.com/mc/game/version_manifest_v2.json"
-        with urllib.request.urlopen(manifest_url, timeout=10) as resp:
-            manifest = json.loads(resp.read().decode())
-        
-        # FIX: Handle version not found
-        version_url = None
-        for v in manifest["versions"]:
-            if v["id"] == version_id:
-                version_url = v["url"]
-                break
-        
-        if not version_url:
-            raise ValueError(f"Version {version_id} not found in manifest")
-        
-        with urllib.request.urlopen(version_url, timeout=10) as resp:
-            version_json = json.loads(resp.read().decode())
+    def show_progress(self, snap):
+        self.progress.stop()
+        self.progress.config(mode="determinate", value=snap["percent"])
+        self.status.config(text=format_progress(snap))
 
-        version_json_path = version_dir / f"{version_id}.json"
-        with open(version_json_path, "w") as f:
-            json.dump(version_json, f, indent=2)
+    def show_log_panel(self):
+        """Open (or raise) the game log window; it is filled in batches every LOG_POLL_MS"""
+        if self.log_window is not None:
+            self.log_window.lift()
+            return
+        win = self.log_window = tk.Toplevel(self.root)
+        win.title("Game Log")
+        win.geometry("900x450")
+        win.configure(bg="#0a0a0a")
+        win.protocol("WM_DELETE_WINDOW", self.close_log_panel)
 
-        # Download client JAR
-        jar_path = version_dir / f"{version_id}.jar"
-        if not jar_path.exists():
-            self.root.after(0, lambda: self.status.config(text=f"Downloading {version_id}.jar..."))
-            if not self.download_file(version_json["downloads"]["client"]["url"], jar_path, progress_callback):
-                raise RuntimeError("Failed to download client JAR")
+        bar = tk.Frame(win, bg="#0a0a0a")
+        bar.pack(fill="x", padx=8, pady=6)
+        ttk.Label(bar, text="Level").pack(side="left")
+        level = ttk.Combobox(bar, textvariable=self.log_level, values=GameLog.LEVELS[1:5], state="readonly", width=8)
+        level.pack(side="left", padx=6)
+        level.bind("<<ComboboxSelected>>", lambda e: self.refill_log())
+        self.log_path_label = ttk.Label(bar, text="", foreground="#888888")
+        self.log_path_label.pack(side="right")
 
-        libs_dir = GAME_DIR / "libraries"
-        libs_dir.mkdir(parents=True, exist_ok=True)
-        natives_dir = version_dir / "natives"
-        natives_dir.mkdir(parents=True, exist_ok=True)
+        frame = tk.Frame(win, bg="#0a0a0a")
+        frame.pack(fill="both", expand=True, padx=8, pady=(0, 8))
+        scroll = tk.Scrollbar(frame)
+        scroll.pack(side="right", fill="y")
+        self.log_text = tk.Text(frame, bg="#111111", fg="#cccccc", font=("Consolas", 9), wrap="none",
+                                bd=0, state="disabled", yscrollcommand=scroll.set)
+        self.log_text.pack(fill="both", expand=True)
+        scroll.config(command=self.log_text.yview)
+        for name, color in (("TRACE", "#666666"), ("DEBUG", "#888888"), ("INFO", "#cccccc"),
+                            ("WARN", "#ffb74d"), ("ERROR", "#ef5350"), ("FATAL", "#ef5350")):
+            self.log_text.tag_configure(name, foreground=color)
 
-        # Download libraries
-        os_name = get_os_name()
-        total_libs = len(version_json["libraries"])
-        
-        for i, lib in enumerate(version_json["libraries"]):
-            # FIX: Properly check rules
-            if "rules" in lib and not check_rules(lib["rules"]):
+        self.log_shown = None
+        self.poll_log()
+
+    def close_log_panel(self):
+        self.log_window.destroy()
+        self.log_window = None
+
+    def refill_log(self):
+        """Redraw the panel from the ring buffer, e.g. after the level filter changed"""
+        self.log_shown = self.game_log
+        self.log_text.config(state="normal")
+        self.log_text.delete("1.0", "end")
+        self.log_text.config(state="disabled")
+        if self.game_log:
+            self.log_path_label.config(text=str(self.game_log.path))
+            self.append_log(self.game_log.lines())
+
+    def append_log(self, batch):
+        """Insert a batch of (level, text) lines, one Tk call per run of same-level lines"""
+        minimum = GameLog.LEVELS.index(self.log_level.get())
+        runs = []
+        for level, text in batch:
+            if level < minimum:
                 continue
-            
-            lib_name = lib.get("name", "unknown")
-            self.root.after(0, lambda n=lib_name, idx=i, tot=total_libs: 
-                          self.status.config(text=f"Libraries ({idx+1}/{tot}): {n.split(':')[-1]}"))
-            
-            if "downloads" in lib:
-                # Standard artifact
-                if "artifact" in lib["downloads"]:
-                    artifact = lib["downloads"]["artifact"]
-                    path = libs_dir / artifact["path"]
-                    path.parent.mkdir(parents=True, exist_ok=True)
-                    if not path.exists():
-                        self.download_file(artifact["url"], path)
-                
-                # FIX: Natives handling with proper OS detection
-                if "natives" in lib:
-                    # Handle arch substitution
-                    native_key = lib["natives"].get(os_name, "")
-                    if "${arch}" in native_key:
-                        native_key = native_key.replace("${arch}", "64" if get_arch() in ("x64", "arm64") else "32")
-                    
-                    if native_key and "classifiers" in lib["downloads"]:
-                        native = lib["downloads"]["classifiers"].get(native_key)
-                        if native:
-                            native_path = libs_dir / native["path"]
-                            native_path.parent.mkdir(parents=True, exist_ok=True)
-                            if not native_path.exists():
-                                self.download_file(native["url"], native_path)
-                            
-                            # Extract natives
-                            try:
-                                with zipfile.ZipFile(native_path, "r") as z:
-                                    for file in z.namelist():
-                                        # Skip META-INF
-                                        if file.startswith("META-INF/"):
-                                            continue
-                                        # Extract native libraries
-                                        if file.endswith((".so", ".dll", ".dylib", ".jnilib")) or "/" not in file:
-                                            try:
-                                                z.extract(file, natives_dir)
-                                            except Exception:
-                                                pass
-                            except zipfile.BadZipFile:
-                                pass
-
-        # Download asset index
-        assets_dir = GAME_DIR / "assets"
-        index_id = version_json["assetIndex"]["id"]
-        index_path = assets_dir / "indexes" / f"{index_id}.json"
-        index_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        if not index_path.exists():
-            self.root.after(0, lambda: self.status.config(text="Downloading asset index..."))
-            self.download_file(version_json["assetIndex"]["url"], index_path)
-        
-        # FIX: Download actual assets (optional - can be slow)
-        # For a full launcher, uncomment this section
-        # self.download_assets(index_path)
+            if runs and runs[-1][0] == level:
+                runs[-1][1].append(text)
+            else:
+                runs.append((level, [text]))
+        if not runs:
+            return
+        at_bottom = self.log_text.yview()[1] >= 0.999
+        self.log_text.config(state="normal")
+        for level, texts in runs:
+            self.log_text.insert("end", "\n".join(texts) + "\n", GameLog.LEVELS[level])
+        lines = int(self.log_text.index("end-1c").split(".")[0])
+        if lines > LOG_RING_LINES:
+            self.log_text.delete("1.0", f"{lines - LOG_RING_LINES}.0")
+        self.log_text.config(state="disabled")
+        if at_bottom:
+            self.log_text.see("end")
 
-        self.root.after(0, lambda: self.status.config(text="Ready to launch!"))
-        return version_json
+    def poll_log(self):
+        if self.log_window is None:
+            return
+        if self.log_shown is not self.game_log:
+            self.refill_log()
+        elif self.game_log:
+            self.append_log(self.game_log.drain())
+        self.root.after(LOG_POLL_MS, self.poll_log)
 
-    def download_assets(self, index_path: Path):
-        """Download game assets (textures, sounds, etc.)"""
-        with open(index_path) as f:
-            asset_index = json.load(f)
-        
-        objects_dir = GAME_DIR / "assets" / "objects"
-        objects_dir.mkdir(parents=True, exist_ok=True)
-        
-        objects = asset_index.get("objects", {})
-        total = len(objects)
-        
-        for i, (name, info) in enumerate(objects.items()):
-            hash_val = info["hash"]
-            prefix = hash_val[:2]
-            asset_path = objects_dir / prefix / hash_val
-            
-            if not asset_path.exists():
-                asset_path.parent.mkdir(parents=True, exist_ok=True)
-                url = f"https://resources.download.minecraft.net/{prefix}/{hash_val}"
-                self.download_file(url, asset_path)
-            
-            if i % 50 == 0:
-                self.root.after(0, lambda idx=i, tot=total: 
-                              self.status.config(text=f"Assets ({idx}/{tot})"))
+    def setup_version(self, version_id: str):
+        return self.installer.setup_version(version_id)
 
     def play(self):
         username = self.username.get().strip()
@@ -450,7 +2932,7 @@ class CTLauncher:
             return
 
         ram_gb = int(self.ram.get())  # FIX: Ensure integer
-        max_ram = f"{ram_gb}G"
+        profile = self.jvm_profile.get()
 
         self.progress.config(mode="indeterminate")
         self.progress.start()
@@ -458,86 +2940,45 @@ class CTLauncher:
 
         def launch_thread():
             error_msg = None
+            TRACER.reset()
             try:
-                version_dir = GAME_DIR / "versions" / version
-                jar_path = version_dir / f"{version}.jar"
-                version_json_path = version_dir / f"{version}.json"
-
-                # Auto-download everything if missing
-                if not jar_path.exists() or not version_json_path.exists():
-                    self.root.after(0, lambda: self.status.config(text="Downloading game files..."))
-                    version_json = self.setup_version(version)
-                else:
-                    with open(version_json_path) as f:
-                        version_json = json.load(f)
-
-                natives_dir = version_dir / "natives"
-                libs_dir = GAME_DIR / "libraries"
-
-                # FIX: Build classpath with proper rule checking
-                classpath_parts = []
-                for lib in version_json["libraries"]:
-                    if "rules" in lib and not check_rules(lib["rules"]):
-                        continue
-                    if "downloads" in lib and "artifact" in lib["downloads"]:
-                        lib_path = libs_dir / lib["downloads"]["artifact"]["path"]
-                        if lib_path.exists():
-                            classpath_parts.append(str(lib_path))
-                
-                # Add main JAR last (some versions need this order)
-                classpath_parts.append(str(jar_path))
-                
-                # FIX: Use platform-appropriate separator
-                classpath = CLASSPATH_SEP.join(classpath_parts)
-
-                # FIX: Get main class from version JSON
-                main_class = version_json.get("mainClass", "net.minecraft.client.main.Main")
-
-                # Build launch arguments
-                args = [
-                    JAVA_BIN,
-                    f"-Xmx{max_ram}",
-                    f"-Xms512M",
-                    f"-Djava.library.path={natives_dir.resolve()}",
-                    "-Dminecraft.launcher.brand=CTLauncher",
-                    "-Dminecraft.launcher.version=1.0",
-                    "-cp", classpath,
-                    main_class,
-                    "--username", username,
-                    "--uuid", str(uuid.uuid3(uuid.NAMESPACE_DNS, f"OfflinePlayer:{username}")),
-                    "--accessToken", "0",
-                    "--userType", "legacy",
-                    "--version", version,
-                    "--gameDir", str(GAME_DIR.resolve()),
-                    "--assetsDir", str((GAME_DIR / "assets").resolve()),
-                    "--assetIndex", version_json["assetIndex"]["id"],
-                ]
-                
-                # Add version type if present
-                if "type" in version_json:
-                    args.extend(["--versionType", version_json["type"]])
+                with TRACER.span("play", version=version):
+                    plan = self.installer.prepare_launch(version)
+                    java = java_for(plan.get("java_major"))
+                    cds_args, cds_mode = CDS_ARCHIVES.args(version, plan, java)
+                    args = build_launch_args(plan, username, ram_gb, profile=profile, extra_jvm_args=cds_args)
 
-                self.root.after(0, lambda: self.status.config(text="Launching Minecraft..."))
-                self.root.after(0, self.progress.stop)
-                
-                # Launch Minecraft
-                process = subprocess.Popen(
-                    args,
-                    cwd=str(GAME_DIR),
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True
-                )
-                
-                # Monitor process (optional: show output in console)
-                for line in process.stdout:
-                    print(line, end="")
-                
-                process.wait()
+                    self.root.after(0, lambda: self.status.config(text="Launching Minecraft..."))
+                    self.root.after(0, self.progress.stop)
+
+                    # Launch Minecraft
+                    with TRACER.span("spawn_jvm", cds=cds_mode):
+                        spawned = time.monotonic()
+                        process = subprocess.Popen(
+                            args,
+                            cwd=str(GAME_DIR),
+                            stdout=subprocess.PIPE,
+                            stderr=subprocess.STDOUT,
+                            bufsize=0
+                        )
+                    # Game output goes to a ring buffer + log file; the log panel picks it up in batches
+                    game_log = GameLog(version, watch=MAIN_MENU_RE,
+                                       on_watch=lambda line: self.reached_menu(version, java, cds_mode, spawned))
+                    game_log.attach(process.stdout)
+                    self.game_log = game_log
+                trace_path = TRACER.save(f"play-{version}")
+                if trace_path:
+                    print(f"Launch trace: {trace_path}", file=sys.stderr)
+                print(f"Game log: {game_log.path}", file=sys.stderr)
+
+                code = process.wait()
+                game_log.done.wait(5)
+                CDS_ARCHIVES.finished(version, plan, java, cds_mode, code)
                 
             except Exception as e:
                 import traceback
                 error_msg = f"{e}\n\n{traceback.format_exc()}"
+                TRACER.save(f"play-{version}-failed")
             finally:
                 self.root.after(0, self.progress.stop)
                 self.root.after(0, lambda: self.status.config(text="Ready"))
@@ -546,8 +2987,286 @@ class CTLauncher:
 
         threading.Thread(target=launch_thread, daemon=True).start()
 
+    def reached_menu(self, version, java, cds_mode, spawned):
+        """Game log thread: the client got to its title screen; log the time and show the CDS gain"""
+        seconds = time.monotonic() - spawned
+        with_cds, without = CDS_ARCHIVES.record_menu_time(version, java, cds_mode, seconds)
+        text = f"Main menu in {seconds:.1f} s"
+        if cds_mode == "on" and without:
+            text += f" with CDS (median {without:.1f} s without)"
+        elif cds_mode == "dump":
+            text += " (building class data archive for next launch)"
+        print(text, file=sys.stderr)
+        self.set_status_async(text)
+
+
+_EMIT_LOCK = threading.Lock()
+
+
+def emit(event, **fields):
+    """Print one JSON progress line for headless callers"""
+    with _EMIT_LOCK:
+        print(json.dumps({"event": event, **fields}), flush=True)
+
+
+def cli_installer(version, workers=DOWNLOAD_WORKERS, backend=DOWNLOAD_BACKEND):
+    """Installer whose status/progress go to stdout as JSON lines"""
+    return Installer(lambda text: emit("status", version=version, message=text),
+                     lambda snap: emit("progress", version=version, **snap), workers, backend)
+
+
+def cli_install(args):
+    def dry_run(version):
+        installer = cli_installer(version, args.workers, args.backend)
+        try:
+            plan = installer.plan_install(version, installer.fetch_version_json(version), save_index=False)
+        except Exception as e:
+            emit("plan", version=version, ok=False, error=str(e))
+            return False
+        # Same order the install would fetch them in
+        for kind in ("game_files", "assets"):
+            for url, path, sha1, size in plan[kind]:
+                emit("planned", version=version, kind=kind, path=str(path), size=size, url=url,
+                     source="store" if CONTENT_STORE.has(sha1, size) else "download")
+        emit("plan", version=version, ok=True, summary=describe_install_plan(plan),
+             **{key: value for key, value in plan.items() if key.endswith(("_files", "_bytes")) and key != "game_files"})
+        return True
+
+    def install(version):
+        started = time.monotonic()
+        try:
+            cli_installer(version, args.workers, args.backend).setup_version(version)
+        except Exception as e:
+            emit("done", version=version, ok=False, error=str(e), seconds=round(time.monotonic() - started, 3))
+            return False
+        emit("done", version=version, ok=True, seconds=round(time.monotonic() - started, 3))
+        return True
+
+    versions = list(dict.fromkeys(args.versions))
+    if args.dry_run:
+        with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+            return 0 if all(pool.map(dry_run, versions)) else 1
+    TRACER.reset()
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        results = list(pool.map(install, versions))
+    trace_path = TRACER.save("install-" + "-".join(versions))
+    if trace_path:
+        emit("trace", path=str(trace_path))
+    return 0 if all(results) else 1
+
+
+def cli_verify(args):
+    def verify(version):
+        problems = cli_installer(version).verify_version(version)
+        emit("verified", version=version, ok=not problems, problems=problems)
+        return not problems
+
+    versions = list(dict.fromkeys(args.versions))
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        results = list(pool.map(verify, versions))
+    return 0 if all(results) else 1
+
+
+def cli_launch(args):
+    if not all(c.isalnum() or c == "_" for c in args.username):
+        emit("error", message="Username can only contain letters, numbers, and underscores!")
+        return 2
+    TRACER.reset()
+    try:
+        with TRACER.span("launch", version=args.version):
+            plan = cli_installer(args.version, args.workers, args.backend).prepare_launch(args.version, args.verify)
+            java = java_for(plan.get("java_major"))
+            cds_args, cds_mode = CDS_ARCHIVES.args(args.version, plan, java, train=not args.preview) if args.cds else ([], "off")
+            command = build_launch_args(plan, args.username, args.ram, profile=args.profile, extra_jvm_args=cds_args)
+            if args.preview:
+                emit("command", version=args.version, profile=resolve_jvm_profile(args.profile, args.ram, command[0]),
+                     java=java_major(command[0]), args=command, line=format_command(command))
+                return 0
+            def reached_menu(line):
+                seconds = time.monotonic() - spawned
+                with_cds, without = CDS_ARCHIVES.record_menu_time(args.version, java, cds_mode, seconds)
+                emit("menu", version=args.version, seconds=round(seconds, 2), cds=cds_mode,
+                     median_cds=with_cds, median_no_cds=without)
+
+            with TRACER.span("spawn_jvm", cds=cds_mode):
+                spawned = time.monotonic()
+                process = subprocess.Popen(command, cwd=str(GAME_DIR), stdout=subprocess.PIPE,
+                                           stderr=subprocess.STDOUT, bufsize=0)
+            # Game output is echoed to stderr so stdout stays machine-readable; the log watches for the menu
+            game_log = GameLog(args.version, watch=MAIN_MENU_RE, on_watch=reached_menu, echo=sys.stderr.buffer)
+            game_log.attach(process.stdout)
+    except Exception as e:
+        emit("error", version=args.version, message=str(e))
+        return 1
+    finally:
+        trace_path = TRACER.save(f"launch-{args.version}")
+        if trace_path:
+            emit("trace", path=str(trace_path))
+    emit("launched", version=args.version, pid=process.pid, cds=cds_mode, log=str(game_log.path))
+    code = process.wait()
+    game_log.done.wait(5)
+    CDS_ARCHIVES.finished(args.version, plan, java, cds_mode, code)
+    emit("exited", version=args.version, pid=process.pid, code=code)
+    return code
+
+
+def cli_supervise(args):
+    width = len(str(args.count))
+    usernames = [f"{args.prefix}{n:0{width}d}" for n in range(1, args.count + 1)]
+    bad = [name for name in usernames if len(name) > 16 or not all(c.isalnum() or c == "_" for c in name)]
+    if bad:
+        emit("error", message=f"Invalid generated username {bad[0]!r} (letters, digits, _; at most 16)")
+        return 2
+    instances_dir = args.instances_dir or GAME_DIR / "instances"
+    rams = args.ram or [1]
+    try:
+        cpus = [parse_cpus(spec) for spec in args.cpus or []]
+    except ValueError as e:
+        emit("error", message=str(e))
+        return 2
+    if cpus and not hasattr(os, "sched_setaffinity"):
+        emit("warning", message="CPU affinity is not supported on this platform; ignoring --cpus")
+    elif cpus:
+        # Pinning to a CPU outside our own mask fails in the child, after the install has run
+        usable = os.sched_getaffinity(0)
+        for spec, cpu_set in zip(args.cpus, cpus):
+            if not cpu_set <= usable:
+                missing = ",".join(map(str, sorted(cpu_set - usable)))
+                emit("error", message=f"--cpus {spec}: CPU {missing} is not available to this process")
+                return 2
+    instances = [
+        SupervisedInstance(n, name, instances_dir / name, rams[n % len(rams)], cpus[n % len(cpus)] if cpus else None)
+        for n, name in enumerate(usernames)
+    ]
+    try:
+        plan = cli_installer(args.version, args.workers, args.backend).prepare_launch(args.version)
+        # Pick and probe Java before the event loop starts, not in the middle of it
+        java_major(java_for(plan.get("java_major")))
+    except Exception as e:
+        emit("error", version=args.version, message=str(e))
+        return 1
+
+    supervisor = LaunchSupervisor(plan, instances, args.stagger, args.restarts,
+                                  lambda status: emit("instance", version=args.version, **status), args.profile,
+                                  args.version)
+    try:
+        results = asyncio.run(supervisor.run())
+    except KeyboardInterrupt:
+        results = [inst.status() for inst in instances]
+    emit("summary", version=args.version, instances=results)
+    return 0 if all(r["state"] == "exited" for r in results) else 1
+
+
+def cli_java(args):
+    runtimes = JAVA_RUNTIMES.scan(refresh=args.refresh)
+    if not runtimes:
+        emit("error", message="No Java runtimes found; install Java or point JAVA_HOME at one")
+    for runtime in sorted(runtimes, key=lambda rt: -rt["major"]):
+        emit("java", **{k: v for k, v in runtime.items() if k != "stamp"})
+    if args.major:
+        best = JAVA_RUNTIMES.pick(args.major)
+        emit("pick", major=args.major, path=best and best["path"])
+        return 0 if best else 1
+    return 0 if runtimes else 1
+
+
+def cli_mirror(args):
+    # Same store the installs on this host use (after --store), so the mirror serves what they fetched
+    root = args.dir or CONTENT_STORE.root or GAME_DIR / "cache" / "mirror"
+    mirror = LanMirror(root)
+    server = mirror.serve(args.bind, args.port)
+    emit("mirror", url=f"http://{args.bind}:{server.server_address[1]}", store=str(Path(root).expanduser()))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        emit("stopped", **mirror.stats)
+    return 0
+
+
+def cli_main(argv):
+    """Headless entry point: install, verify or launch versions without a Tk root"""
+    global GAME_DIR, CONTENT_STORE
+
+    parser = argparse.ArgumentParser(description="CTLauncher headless mode (JSON lines on stdout)")
+    parser.add_argument("--game-dir", type=Path, help=f"game directory (default {GAME_DIR})")
+    parser.add_argument("--store", help=f"shared library/asset store, '' to disable (default {SHARED_STORE})")
+    parser.add_argument("--mirror", help="fetch game files through this LAN mirror, e.g. http://10.0.0.5:8741")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("install", help="download and verify one or more versions")
+    p.add_argument("versions", nargs="+")
+    p.add_argument("--jobs", type=int, default=2, help="versions installed concurrently")
+    p.add_argument("--workers", type=int, default=DOWNLOAD_WORKERS, help="parallel downloads per version")
+    p.add_argument("--backend", choices=("asyncio", "threads"), default=DOWNLOAD_BACKEND)
+    p.add_argument("--dry-run", action="store_true",
+                   help="print what would be downloaded, largest first, without writing anything")
+    p.set_defaults(func=cli_install)
+
+    p = sub.add_parser("verify", help="check installed versions without downloading")
+    p.add_argument("versions", nargs="+")
+    p.add_argument("--jobs", type=int, default=2, help="versions verified concurrently")
+    p.set_defaults(func=cli_verify)
+
+    p = sub.add_parser("launch", help="install if needed, then start the game")
+    p.add_argument("version")
+    p.add_argument("--username", default="CatDev")
+    p.add_argument("--ram", type=int, default=4, help="max heap in GB")
+    p.add_argument("--profile", choices=JVM_PROFILES, default=JVM_PROFILE, help="JVM performance profile")
+    p.add_argument("--preview", action="store_true", help="print the final command line instead of launching")
+    p.add_argument("--no-cds", dest="cds", action="store_false", help="don't build or use an AppCDS archive")
+    p.add_argument("--verify", choices=("quick", "full"), default=LAUNCH_VERIFY,
+                   help="pre-launch check of the classpath: sizes only, or SHA-1 of every file")
+    p.add_argument("--workers", type=int, default=DOWNLOAD_WORKERS, help="parallel downloads")
+    p.add_argument("--backend", choices=("asyncio", "threads"), default=DOWNLOAD_BACKEND)
+    p.set_defaults(func=cli_launch)
+
+    p = sub.add_parser("supervise", help="run many offline clients of one version and restart crashed ones")
+    p.add_argument("version")
+    p.add_argument("--count", type=int, default=2, help="number of instances")
+    p.add_argument("--prefix", default="Bot", help="usernames are <prefix>1..<prefix>N")
+    p.add_argument("--instances-dir", type=Path, help="per-instance game dirs (default <game dir>/instances)")
+    p.add_argument("--stagger", type=float, default=LAUNCH_STAGGER, help="seconds between starts")
+    p.add_argument("--restarts", type=int, default=3, help="restarts allowed per instance after a crash")
+    p.add_argument("--ram", type=int, action="append", help="max heap in GB; repeat to cycle across instances")
+    p.add_argument("--cpus", action="append",
+                   help="CPU set like 0-3,6 to pin an instance to (Linux); repeat to cycle across instances")
+    p.add_argument("--profile", choices=JVM_PROFILES, default=JVM_PROFILE, help="JVM performance profile")
+    p.add_argument("--workers", type=int, default=DOWNLOAD_WORKERS, help="parallel downloads")
+    p.add_argument("--backend", choices=("asyncio", "threads"), default=DOWNLOAD_BACKEND)
+    p.set_defaults(func=cli_supervise)
+
+    p = sub.add_parser("java", help="list the Java runtimes found on this machine")
+    p.add_argument("--major", type=int, help="also show which runtime a version wanting this Java would get")
+    p.add_argument("--refresh", action="store_true", help="probe every runtime again, ignoring the cache")
+    p.set_defaults(func=cli_java)
+
+    p = sub.add_parser("mirror", help="serve a caching mirror of the game download hosts to other launchers")
+    p.add_argument("--bind", default="0.0.0.0")
+    p.add_argument("--port", type=int, default=MIRROR_PORT)
+    p.add_argument("--dir", help="where cached files live (default: the shared store)")
+    p.set_defaults(func=cli_mirror)
+
+    args = parser.parse_args(argv)
+    if args.game_dir:
+        GAME_DIR = args.game_dir.expanduser().resolve()
+    if args.store is not None:
+        CONTENT_STORE = ContentStore(args.store)
+    if args.mirror is not None:
+        HTTP_POOL.mirror = args.mirror or None
+    return args.func(args)
+
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(cli_main(sys.argv[1:]))
+    startup_mark("imports")
     root = tk.Tk()
+    startup_mark("tk_root")
     app = CTLauncher(root)
+    startup_mark("ui_built")
+    # Idle callbacks run after Tk has mapped and drawn the window
+    root.after_idle(lambda: (startup_mark("first_window"), report_startup()))
     root.mainloop()